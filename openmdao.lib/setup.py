@@ -103,6 +103,7 @@ Component, Driver, Variable and other plugins for OpenMDAO
       openmdao.lib.optproblems.branin.BraninProblem = openmdao.lib.optprobelems.branin:BraninProblem
       
       [openmdao.caserecorder]
+      openmdao.lib.casehandlers.arraycase.ArrayCaseRecorder = openmdao.lib.casehandlers.arraycase:ArrayCaseRecorder
       openmdao.lib.casehandlers.dumpcase.DumpCaseRecorder = openmdao.lib.casehandlers.dumpcase:DumpCaseRecorder
       openmdao.lib.casehandlers.listcase.ListCaseRecorder = openmdao.lib.casehandlers.listcase:ListCaseRecorder
       openmdao.lib.casehandlers.dbcase.DBCaseRecorder = openmdao.lib.casehandlers.dbcase:DBCaseRecorder
@@ -111,6 +112,7 @@ Component, Driver, Variable and other plugins for OpenMDAO
       openmdao.lib.casehandlers.caseset.CaseSet = openmdao.lib.casehandlers.caseset:CaseSet
 
       [openmdao.caseiterator]
+      openmdao.lib.casehandlers.arraycase.ArrayCaseIterator = openmdao.lib.casehandlers.arraycase:ArrayCaseIterator
       openmdao.lib.casehandlers.listcase.ListCaseIterator = openmdao.lib.casehandlers.listcase:ListCaseIterator
       openmdao.lib.casehandlers.dbcase.DBCaseIterator = openmdao.lib.casehandlers.dbcase:DBCaseIterator
       openmdao.lib.casehandlers.csvcase.CSVCaseIterator = openmdao.lib.casehandlers.csvcase:CSVCaseIterator
@@ -8,6 +8,8 @@ iterators, and case filters in the standard library.
 
 from openmdao.lib.casehandlers.caseset import CaseArray, CaseSet, caseiter_to_caseset
 
+from openmdao.lib.casehandlers.arraycase import ArrayCaseIterator, \
+                                                ArrayCaseRecorder
 from openmdao.lib.casehandlers.csvcase import CSVCaseIterator, CSVCaseRecorder
 from openmdao.lib.casehandlers.dbcase import DBCaseIterator, DBCaseRecorder, \
                                              case_db_to_dict
@@ -0,0 +1,382 @@
+"""A CaseRecorder and CaseIterator that store the cases in a directory of
+typed, contiguous columns, one per variable. Numeric values (including
+arrays) are stored as raw binary data so that a whole column can be read back
+with a single :class:`numpy.memmap`. Values that can't be stored as a numeric
+column are pickled.
+"""
+
+import os
+import json
+from cPickle import dump, load, HIGHEST_PROTOCOL
+
+import numpy
+
+# pylint: disable-msg=E0611,F0401
+from openmdao.main.interfaces import implements, ICaseRecorder, ICaseIterator
+from openmdao.main.case import Case
+
+_FORMAT_VERSION = 1
+_INDEX_FILE = 'index.json'
+_META_FILE = 'cases.pkl'
+
+
+def _read_pickles(fname):
+    """Return a list of all objects from a file containing a sequence
+    of pickled lists."""
+    objs = []
+    if os.path.exists(fname):
+        with open(fname, 'rb') as f:
+            while True:
+                try:
+                    objs.extend(load(f))
+                except EOFError:
+                    break
+    return objs
+
+
+class _Column(object):
+    """Buffers the values of a single variable and appends them to the
+    column's file in chunks.
+    """
+
+    def __init__(self, name, sense, fname, value=None, info=None):
+        self.name = str(name)
+        self.sense = str(sense)
+        self.fname = str(fname)
+        if info is None:
+            arr = numpy.asarray(value)
+            if arr.dtype.kind in 'biu':
+                # Stored as float so that later cases may hold floats.
+                self.dtype = numpy.dtype(float)
+                self.shape = arr.shape
+            elif arr.dtype.kind in 'fc':
+                self.dtype = arr.dtype
+                self.shape = arr.shape
+            else:
+                self.dtype = None
+                self.shape = None
+        else:
+            self.dtype = None if info['dtype'] is None \
+                                else numpy.dtype(info['dtype'])
+            self.shape = None if info['shape'] is None else tuple(info['shape'])
+        self._chunk = None
+        self._size = 0
+
+    @property
+    def is_array(self):
+        """True if this column is stored as raw numeric data."""
+        return self.dtype is not None
+
+    def info(self):
+        """Return the description of this column for the index."""
+        return {
+            'name': self.name,
+            'sense': self.sense,
+            'file': self.fname,
+            'dtype': None if self.dtype is None else self.dtype.str,
+            'shape': None if self.shape is None else list(self.shape),
+        }
+
+    def convert(self, value):
+        """Return `value` as it will be stored, raising ValueError if it
+        doesn't fit in this column."""
+        if not self.is_array:
+            return value
+        arr = numpy.asarray(value)
+        if arr.shape != self.shape:
+            raise ValueError("shape %s of value for '%s' doesn't match"
+                             " recorded shape %s"
+                             % (arr.shape, self.name, self.shape))
+        if not numpy.can_cast(arr.dtype, self.dtype):
+            raise ValueError("can't store value of type %s for '%s' in"
+                             " a column of type %s"
+                             % (arr.dtype, self.name, self.dtype))
+        return arr
+
+    def append(self, value, chunk_size):
+        """Add `value`, as returned by :meth:`convert`, to the current
+        chunk."""
+        if self.is_array:
+            if self._chunk is None:
+                self._chunk = numpy.empty((chunk_size,)+self.shape, self.dtype)
+            self._chunk[self._size] = value
+        else:
+            if self._chunk is None:
+                self._chunk = []
+            self._chunk.append(value)
+        self._size += 1
+
+    def write(self, dirname):
+        """Append the current chunk to our file."""
+        if self._size == 0:
+            return
+        with open(os.path.join(dirname, self.fname), 'ab') as f:
+            if self.is_array:
+                self._chunk[:self._size].tofile(f)
+            else:
+                dump(self._chunk, f, HIGHEST_PROTOCOL)
+                self._chunk = None
+        self._size = 0
+
+    def read(self, dirname, num_cases):
+        """Return the column's values. Numeric columns are returned as a
+        read-only :class:`numpy.memmap` with shape (num_cases,)+shape.
+        """
+        fname = os.path.join(dirname, self.fname)
+        if self.is_array:
+            if num_cases == 0:
+                return numpy.empty((0,)+self.shape, self.dtype)
+            return numpy.memmap(fname, dtype=self.dtype, mode='r',
+                                shape=(num_cases,)+self.shape)
+        return _read_pickles(fname)[:num_cases]
+
+
+def _read_index(dirname):
+    """Return the contents of the index file in `dirname`."""
+    with open(os.path.join(dirname, _INDEX_FILE), 'r') as f:
+        index = json.load(f)
+    if index.get('version') != _FORMAT_VERSION:
+        raise RuntimeError("unsupported case storage format version '%s' in %s"
+                           % (index.get('version'), dirname))
+    return index
+
+
+class ArrayCaseIterator(object):
+    """Returns Cases from a directory written by an :class:`ArrayCaseRecorder`.
+    Whole columns of data may also be retrieved without creating any Cases
+    by calling :meth:`get_column`.
+    """
+
+    implements(ICaseIterator)
+
+    def __init__(self, dirname='cases'):
+        self.dirname = dirname
+
+    @property
+    def dirname(self):
+        """The name of the directory containing the case data."""
+        return self._dirname
+
+    @dirname.setter
+    def dirname(self, value):
+        """Set the directory name and read its index."""
+        self._dirname = value
+        index = _read_index(value)
+        self.num_cases = index['num_cases']
+        self._columns = [_Column(c['name'], c['sense'], c['file'], info=c)
+                         for c in index['columns']]
+
+    def __len__(self):
+        return self.num_cases
+
+    def __iter__(self):
+        return self._next_case()
+
+    def get_names(self, iotype=None):
+        """Return the names of the recorded variables.
+
+        iotype: str or None
+            If 'in', only inputs are returned.
+            If 'out', only outputs are returned.
+            If None (the default), inputs and outputs are returned.
+        """
+        if iotype is None:
+            return [col.name for col in self._columns]
+        sense = iotype[0]
+        return [col.name for col in self._columns if col.sense == sense]
+
+    def get_column(self, name):
+        """Return all of the recorded values for variable `name`. Numeric
+        values are returned as a read-only :class:`numpy.memmap` whose first
+        index is the case number. Other values are returned as a list.
+        """
+        for col in self._columns:
+            if col.name == name:
+                return col.read(self._dirname, self.num_cases)
+        raise KeyError("no data for '%s' in %s" % (name, self._dirname))
+
+    def _next_case(self):
+        """ Generator which returns Cases one at a time. """
+        data = [(col, col.read(self._dirname, self.num_cases))
+                for col in self._columns]
+        meta = _read_pickles(os.path.join(self._dirname, _META_FILE))
+        for i in range(self.num_cases):
+            inputs = []
+            outputs = []
+            for col, values in data:
+                value = values[i]
+                if col.is_array:
+                    if col.shape:
+                        value = numpy.array(value)
+                    else:
+                        value = value.item()
+                if col.sense == 'i':
+                    inputs.append((col.name, value))
+                else:
+                    outputs.append((col.name, value))
+            label, case_uuid, parent_uuid, msg, retries, max_retries = meta[i]
+            yield Case(inputs=inputs, outputs=outputs, label=label,
+                       case_uuid=case_uuid, parent_uuid=parent_uuid,
+                       msg=msg, retries=retries, max_retries=max_retries)
+
+    def get_attributes(self, io_only=True):
+        """ We need a custom get_attributes because we aren't using Traits to
+        manage our changeable settings. This is unfortunate and should be
+        changed to something that automates this somehow."""
+
+        attrs = {}
+        attrs['type'] = type(self).__name__
+        variables = []
+
+        attr = {}
+        attr['name'] = "dirname"
+        attr['type'] = type(self.dirname).__name__
+        attr['value'] = str(self.dirname)
+        attr['connected'] = ''
+        attr['desc'] = 'Name of the directory containing the cases.'
+        variables.append(attr)
+
+        attrs["Inputs"] = variables
+        return attrs
+
+
+class ArrayCaseRecorder(object):
+    """Records Cases to a directory containing one file per variable.
+    Numeric values, including arrays, are stored contiguously so that they
+    can be read back in bulk via :meth:`ArrayCaseIterator.get_column`.
+    Integer and boolean values are stored as floats. All Cases must contain
+    the same variables, and each variable must have the same shape in every
+    Case.
+
+    dirname: str
+        Name of the directory to write to. It will be created if necessary.
+
+    chunk_size: int
+        Number of cases to buffer before writing them to disk.
+
+    append: bool
+        If True, add to the cases already in `dirname`.
+    """
+
+    implements(ICaseRecorder)
+
+    def __init__(self, dirname='cases', chunk_size=1000, append=False):
+        self.chunk_size = chunk_size
+        self._dirname = dirname
+        self._columns = None
+        self._meta = []
+        self._num_cases = 0
+        self._closed = False
+
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        if append and os.path.exists(os.path.join(dirname, _INDEX_FILE)):
+            index = _read_index(dirname)
+            self._num_cases = index['num_cases']
+            self._columns = [_Column(c['name'], c['sense'], c['file'], info=c)
+                             for c in index['columns']]
+        else:
+            self._remove_data()
+
+    @property
+    def dirname(self):
+        """The name of the directory containing the case data."""
+        return self._dirname
+
+    def _remove_data(self):
+        """Remove any existing case data from our directory."""
+        for fname in os.listdir(self._dirname):
+            if fname in (_INDEX_FILE, _META_FILE) or fname.endswith('.col'):
+                os.remove(os.path.join(self._dirname, fname))
+
+    def _write_index(self):
+        """Write the index file describing the stored columns."""
+        index = {
+            'version': _FORMAT_VERSION,
+            'num_cases': self._num_cases,
+            'columns': [col.info() for col in self._columns or []],
+        }
+        with open(os.path.join(self._dirname, _INDEX_FILE), 'w') as f:
+            json.dump(index, f, indent=1)
+
+    def startup(self):
+        """ Nothing needed for an array case."""
+        pass
+
+    def record(self, case):
+        """Buffer the given Case, writing the buffer to disk if it holds
+        `chunk_size` cases."""
+        if self._closed:
+            raise RuntimeError('Attempt to record on closed recorder')
+
+        items = [(name, 'i', value)
+                 for name, value in sorted(case.items(iotype='in'))]
+        items.extend([(name, 'o', value)
+                      for name, value in sorted(case.items(iotype='out'))])
+
+        if self._columns is None:
+            self._columns = [_Column(name, sense, 'var%d.col' % i, value)
+                             for i, (name, sense, value) in enumerate(items)]
+        if [(col.name, col.sense) for col in self._columns] != \
+           [(name, sense) for name, sense, value in items]:
+            raise RuntimeError("variables in case '%s' don't match the"
+                               " variables already recorded" % case.label)
+
+        # Check every value before storing any so that a bad value doesn't
+        # leave the columns out of step.
+        values = [col.convert(value)
+                  for col, (name, sense, value) in zip(self._columns, items)]
+        for col, value in zip(self._columns, values):
+            col.append(value, self.chunk_size)
+        self._meta.append((case.label, case.uuid, case.parent_uuid, case.msg,
+                           case.retries, case.max_retries))
+
+        if len(self._meta) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write any buffered cases to disk."""
+        if not self._meta:
+            return
+        for col in self._columns:
+            col.write(self._dirname)
+        with open(os.path.join(self._dirname, _META_FILE), 'ab') as f:
+            dump(self._meta, f, HIGHEST_PROTOCOL)
+        self._num_cases += len(self._meta)
+        self._meta = []
+        self._write_index()
+
+    def close(self):
+        """Write any buffered cases to disk. Note that a closed recorder
+        can't be recorded to."""
+        if not self._closed:
+            self.flush()
+            self._write_index()
+            self._closed = True
+
+    def get_iterator(self):
+        """Return an ArrayCaseIterator that points to our directory."""
+        self.flush()
+        self._write_index()
+        return ArrayCaseIterator(self._dirname)
+
+    def get_attributes(self, io_only=True):
+        """ We need a custom get_attributes because we aren't using Traits to
+        manage our changeable settings. This is unfortunate and should be
+        changed to something that automates this somehow."""
+
+        attrs = {}
+        attrs['type'] = type(self).__name__
+        variables = []
+
+        attr = {}
+        attr['name'] = "dirname"
+        attr['id'] = attr['name']
+        attr['type'] = type(self.dirname).__name__
+        attr['value'] = str(self.dirname)
+        attr['connected'] = ''
+        attr['desc'] = 'Name of the directory where the cases are recorded.'
+        variables.append(attr)
+
+        attrs["Inputs"] = variables
+        return attrs
@@ -51,6 +51,14 @@ class CaseArray(object):
         ca._split_idx = self._split_idx
         return ca
         
+    def select(self, indices):
+        """Return a new container holding the Cases at the given indices, in
+        the order given.
+        """
+        ca = self.copy()
+        ca._values = [self._values[i] for i in indices]
+        return ca
+
     def remove(self, case):
         """Remove the given Case from this CaseArray."""
         try:
@@ -115,6 +123,10 @@ class CaseArray(object):
         else:
             self._add_values(self._get_case_data(case))
     
+    def flush(self):
+        """Does nothing."""
+        return
+
     def close(self):
         """Does nothing."""
         return
@@ -250,6 +262,14 @@ class CaseSet(CaseArray):
             return False
         return values in self._tupset
     
+    def select(self, indices):
+        """Return a new CaseSet holding the Cases at the given indices, in
+        the order given.
+        """
+        cs = super(CaseSet, self).select(indices)
+        cs._tupset = set(cs._values)
+        return cs
+
     def _make_case_set(self, tupset):
         cs = CaseSet(parent_uuid=self._parent_uuid)
         cs._names = self._names[:]
@@ -338,6 +338,11 @@ class CSVCaseRecorder(object):
         
         self.csv_writer.writerow(data)
 
+    def flush(self):
+        """Flushes the file."""
+        if self.outfile is not None:
+            self.outfile.flush()
+
     def close(self):
         """Closes the file."""
 
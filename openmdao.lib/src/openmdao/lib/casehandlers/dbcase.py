@@ -3,8 +3,11 @@ DB (Python's sqlite.)
 """
 
 import sys
+import time
 import sqlite3
 import uuid
+from itertools import groupby
+from operator import itemgetter
 from cPickle import dumps, loads, HIGHEST_PROTOCOL, UnpicklingError
 from optparse import OptionParser
 
@@ -18,6 +21,9 @@ _casetable_attrs = set(['id', 'uuid', 'parent', 'label', 'msg', 'retries', \
                         'model_id', 'timeEnter'])
 _vartable_attrs = set(['var_id', 'name', 'case_id', 'sense', 'value'])
 
+# stored in the DB as PRAGMA user_version
+_SCHEMA_VERSION = 1
+
 def _query_split(query):
     """Return a tuple of lhs, relation, rhs after splitting on 
     a list of allowed operators.
@@ -31,15 +37,97 @@ def _query_split(query):
         raise ValueError("No allowable operator found in query '%s'" % query)
 
 
+def _create_indexes(connection):
+    """Create the indexes used to query the case tables (if they don't
+    already exist) and record the schema version of the DB.
+    """
+    connection.execute("create index if not exists casevars_case_id"
+                       " on casevars(case_id)")
+    connection.execute("create index if not exists casevars_name"
+                       " on casevars(name, case_id)")
+    connection.execute("PRAGMA user_version=%d" % _SCHEMA_VERSION)
+    connection.commit()
+
+
+def get_schema_version(dbname):
+    """Return the schema version of the specified case DB file. DBs
+    created before the schema was versioned (and indexed) have version 0.
+
+    dbname: str
+        The name of the sqlite DB file.
+    """
+    connection = sqlite3.connect(dbname)
+    try:
+        return connection.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def _py_value(name, value):
+    """Return the Python object stored as `value` for variable `name`."""
+    if isinstance(value, (float,int,long,str)):
+        return value
+    try:
+        return loads(str(value))
+    except UnpicklingError as err:
+        raise UnpicklingError("can't unpickle value '%s' from database: %s" %
+                              (name, str(err)))
+
+
+def _query_cases(connection, where=(), params=()):
+    """Generator that streams the results of a single query joining the
+    cases and casevars tables. `where` is a list of SQL expressions that are
+    ANDed together, and `params` contains the values for any '?' placeholders
+    in them. Returns a tuple of the form
+    (id, uuid, parent, label, msg, retries, [(name, sense, value), ...])
+    for each case having at least one selected variable.
+    """
+    sql = ["SELECT c.id, c.uuid, c.parent, c.label, c.msg, c.retries,",
+           "v.name, v.sense, v.value",
+           "FROM cases c JOIN casevars v ON v.case_id=c.id"]
+    if where:
+        sql.append("WHERE %s" % ' AND '.join(['(%s)' % w for w in where]))
+    sql.append("ORDER BY c.id, v.var_id")
+
+    cur = connection.cursor()
+    cur.execute(' '.join(sql), params)
+    for key, rows in groupby(cur, itemgetter(0, 1, 2, 3, 4, 5)):
+        yield key + ([(name, sense, _py_value(name, value))
+                      for _, _, _, _, _, _, name, sense, value in rows],)
+
+
+def _name_list_sql(varnames):
+    """Return a tuple of SQL selecting variables named in `varnames` and
+    the corresponding parameters."""
+    varnames = list(varnames)
+    return ("name IN (%s)" % ','.join(['?']*len(varnames)), varnames)
+
+
+def _db_value(value):
+    """Return `value` in a form suitable for storage in the casevars table.
+    Values other than floats, ints or strings are pickled.
+    """
+    if isinstance(value, (float,int,str)):
+        return value
+    if isinstance(value, TraitDictObject):
+        value = dict(value)
+    elif isinstance(value, TraitListObject):
+        value = list(value)
+    return sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL))
+
+
 class DBCaseIterator(object):
     """Pulls Cases from a relational DB (sqlite). It doesn't support
     general sql queries, but it does allow for a series of boolean
-    selectors, e.g., 'x<=y', that are ANDed together.
+    selectors, e.g., 'x<=y', that are ANDed together. If `varnames` is
+    given, only the named variables are retrieved. All selection is done
+    by a single SQL query whose results are streamed.
     """
     
     implements(ICaseIterator)
     
-    def __init__(self, dbfile=':memory:', selectors=None, connection=None):
+    def __init__(self, dbfile=':memory:', selectors=None, connection=None,
+                 varnames=None):
         if connection is not None:
             self._dbfile = dbfile
             self._connection = connection
@@ -47,6 +135,7 @@ class DBCaseIterator(object):
             self._connection = None
             self.dbfile = dbfile
         self.selectors = selectors
+        self.varnames = varnames
         self._connection.text_factory = sqlite3.OptimizedUnicode
 
     @property
@@ -70,47 +159,32 @@ class DBCaseIterator(object):
     def _next_case(self):
         """ Generator which returns Cases one at a time. """
         # figure out which selectors are for cases and which are for variables
-        sql = ["SELECT * FROM cases"]
+        where = []
+        params = []
         if self.selectors is not None:
             for sel in self.selectors:
-                rhs,rel,lhs = _query_split(sel)
-                if rhs in _casetable_attrs:
-                    if len(sql) == 1:
-                        sql.append("WHERE %s%s%s" % (rhs,rel,lhs))
-                    else:
-                        sql.append("AND %s%s%s" % (rhs,rel,lhs))
+                lhs,rel,rhs = _query_split(sel)
+                if lhs in _casetable_attrs:
+                    where.append("c.%s%s%s" % (lhs,rel,rhs))
+                elif lhs in _vartable_attrs:
+                    where.append("v.%s%s%s" % (lhs,rel,rhs))
+        if self.varnames is not None:
+            sql, names = _name_list_sql(self.varnames)
+            where.append('v.'+sql)
+            params.extend(names)
             
-        casecur = self._connection.cursor()
-        casecur.execute(' '.join(sql))
-          
-        sql = ['SELECT var_id,name,case_id,sense,value from casevars WHERE case_id=%s']
-        if self.selectors is not None:
-            for sel in self.selectors:
-                rhs,rel,lhs = _query_split(sel)
-                if rhs in _vartable_attrs:
-                    sql.append("AND %s%s%s" % (rhs,rel,lhs))
-        combined = ' '.join(sql)
-        varcur = self._connection.cursor()
-        
-        for cid,text_id,parent,label,msg,retries,model_id,timeEnter in casecur:
-            varcur.execute(combined % cid)
+        for cid,text_id,parent,label,msg,retries,variables in \
+                _query_cases(self._connection, where, params):
             inputs = []
             outputs = []
-            for var_id, vname, case_id, sense, value in varcur:
-                if not isinstance(value, (float,int,str)):
-                    try:
-                        value = loads(str(value))
-                    except UnpicklingError as err:
-                        raise UnpicklingError("can't unpickle value '%s' for case '%s' from database: %s" %
-                                              (vname, cname, str(err)))
+            for vname, sense, value in variables:
                 if sense=='i':
                     inputs.append((vname, value))
                 else:
                     outputs.append((vname, value))
-            if len(inputs) > 0 or len(outputs) > 0:
-                yield Case(inputs=inputs, outputs=outputs,
-                           retries=retries,msg=msg,label=label,
-                           case_uuid=text_id, parent_uuid=parent)
+            yield Case(inputs=inputs, outputs=outputs,
+                       retries=retries,msg=msg,label=label,
+                       case_uuid=text_id, parent_uuid=parent)
 
     def get_attributes(self, io_only=True):
         """ We need a custom get_attributes because we aren't using Traits to
@@ -145,13 +219,40 @@ class DBCaseIterator(object):
 class DBCaseRecorder(object):
     """Records Cases to a relational DB (sqlite). Values other than floats,
     ints or strings are pickled and are opaque to SQL queries.
+
+    By default every Case is committed as soon as it is recorded. For large
+    numbers of cases, set `chunk_size` and/or `flush_interval` so that cases
+    are buffered in memory and written with a single transaction per flush.
+    File-based databases use write-ahead logging so that readers don't block
+    the recorder.
+
+    dbfile: str
+        Name of the database file, or ``:memory:``.
+
+    model_id: str
+        Identifier stored with each case.
+
+    append: bool
+        If True, don't complain if the tables already exist.
+
+    chunk_size: int
+        Number of cases to buffer before writing them to the DB.
+
+    flush_interval: float
+        If > 0, buffered cases are written if this many seconds have passed
+        since the last flush, even if `chunk_size` hasn't been reached.
     """
     
     implements(ICaseRecorder)
     
-    def __init__(self, dbfile=':memory:', model_id='', append=False):
+    def __init__(self, dbfile=':memory:', model_id='', append=False,
+                 chunk_size=1, flush_interval=0.):
         self.dbfile = dbfile  # this creates the connection
         self.model_id = model_id
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.time()
         
         if append:
             exstr = 'if not exists'
@@ -178,6 +279,7 @@ class DBCaseRecorder(object):
          sense TEXT,
          value BLOB
          )""" % exstr)
+        _create_indexes(self._connection)
 
     @property
     def dbfile(self):
@@ -191,6 +293,9 @@ class DBCaseRecorder(object):
         """Set the DB file and connect to it."""
         self._dbfile = value
         self._connection = sqlite3.connect(value)
+        if value != ':memory:':
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
         self._iter_conn = sqlite3.connect(value)
     
     def startup(self):
@@ -198,49 +303,51 @@ class DBCaseRecorder(object):
         pass
         
     def record(self, case):
-        """Record the given Case."""
+        """Record the given Case. The case may be buffered until the next
+        :meth:`flush`."""
         if self._connection is None:
             raise RuntimeError('Attempt to record on closed recorder')
 
+        # Convert the values now, since the Case may be modified by the
+        # caller before we flush. Values are pickled if they're not one of
+        # the built-in types int, float, or str.
+        varrows = [(name, 'i', _db_value(value))
+                        for name, value in case.items(iotype='in')]
+        varrows.extend([(name, 'o', _db_value(value))
+                        for name, value in case.items(iotype='out')])
+        self._buffer.append(((case.uuid, case.parent_uuid, case.label,
+                              case.msg or '', case.retries), varrows))
+
+        if len(self._buffer) >= self.chunk_size or \
+           (self.flush_interval > 0 and
+            time.time() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write any buffered cases to the DB in a single transaction."""
+        self._last_flush = time.time()
+        if not self._buffer or self._connection is None:
+            return
+
         cur = self._connection.cursor()
-        
-        cur.execute("""insert into cases(id,uuid,parent,label,msg,retries,model_id,timeEnter) 
+        rows = []
+        for caseinfo, varrows in self._buffer:
+            cur.execute("""insert into cases(id,uuid,parent,label,msg,retries,model_id,timeEnter) 
                            values (?,?,?,?,?,?,?,DATETIME('NOW'))""", 
-                                     (None, case.uuid, case.parent_uuid, case.label,
-                                      case.msg or '', case.retries, 
-                                      self.model_id))
-        case_id = cur.lastrowid
-        # insert the inputs and outputs into the vars table.  Pickle them if they're not one of the
-        # built-in types int, float, or str.
-        
-        for name,value in case.items(iotype='in'):
-            if isinstance(value, (float,int,str)):
-                v = (None, name, case_id, 'i', value)
-            else:
-                if isinstance(value, TraitDictObject):
-                    value = dict(value)
-                elif isinstance(value, TraitListObject):
-                    value = list(value)
-                v = (None, name, case_id, 'i', 
-                     sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
-                        v)
-        for name,value in case.items(iotype='out'):
-            if isinstance(value, (float,int,str)):
-                v = (None, name, case_id, 'o', value)
-            else:
-                if isinstance(value, TraitDictObject):
-                    value = dict(value)
-                elif isinstance(value, TraitListObject):
-                    value = list(value)
-                v = (None, name, case_id, 'o', 
-                     sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
-                        v)
+                        (None,)+caseinfo+(self.model_id,))
+            case_id = cur.lastrowid
+            rows.extend([(None, name, case_id, sense, value)
+                             for name, sense, value in varrows])
+        # insert the inputs and outputs into the vars table.
+        cur.executemany("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
+                        rows)
         self._connection.commit()
+        self._buffer = []
     
     def close(self):
-        """Commit and close DB connection if not using ``:memory:``."""
+        """Flush any buffered cases, then commit and close DB connection if
+        not using ``:memory:``."""
+        self.flush()
         if self._connection is not None and self._dbfile != ':memory:':
             self._connection.commit()
             self._connection.close()
@@ -248,6 +355,7 @@ class DBCaseRecorder(object):
 
     def get_iterator(self):
         """Return a DBCaseIterator that points to our current DB."""
+        self.flush()
         return DBCaseIterator(dbfile=self._dbfile, connection=self._connection)
 
     def get_attributes(self, io_only=True):
@@ -286,9 +394,11 @@ def list_db_vars(dbname):
         The name of the sqlite DB file.
     """
     connection = sqlite3.connect(dbname)
+    connection.text_factory = sqlite3.OptimizedUnicode
     varcur = connection.cursor()
-    varcur.execute("SELECT name from casevars")
-    varnames = set([v for v in varcur])
+    varcur.execute("SELECT DISTINCT name from casevars")
+    varnames = set([v[0] for v in varcur])
+    connection.close()
     return varnames
 
 def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=False):
@@ -320,49 +430,24 @@ def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=Fa
         
     """
     connection = sqlite3.connect(dbname)
+    connection.text_factory = sqlite3.OptimizedUnicode
     vardict = dict([(name,[]) for name in varnames])
 
-    sql = ["SELECT id FROM cases"]
-    qlist = []
+    where = []
+    params = []
     if case_sql:
-        qlist.append(case_sql)
+        where.append(case_sql)
     if not include_errors:
-        qlist.append("msg = ''")
-            
-    if qlist:
-        sql.append("WHERE %s" % ' AND '.join(qlist))
-        
-    casecur = connection.cursor()
-    casecur.execute(' '.join(sql))
-    
-    sql = ["SELECT name, value from casevars WHERE case_id=%s"]
-    vars_added = False
-    for i,name in enumerate(vardict.keys()):
-        if i==0:
-            sql.append("AND (")
-        else:
-            sql.append("OR")
-        sql.append("name='%s'" % name)
-        vars_added = True
-    if vars_added: sql.append(")")
-    
+        where.append("msg = ''")
+    if vardict:
+        sql, names = _name_list_sql(vardict.keys())
+        where.append(sql)
+        params.extend(names)
     if var_sql:
-        sql.append(" AND %s" % var_sql)
-    combined = ' '.join(sql)
+        where.append(var_sql)
     
-    varcur = connection.cursor()
-    
-    for case_id in casecur:
-        casedict = {}
-        varcur.execute(combined % case_id)
-        for vname, value in varcur:
-            if not isinstance(value, (float,int,str)):
-                try:
-                    value = loads(str(value))
-                except UnpicklingError as err:
-                    raise UnpicklingError("can't unpickle value '%s' from database: %s" %
-                                          (vname, str(err)))
-            casedict[vname] = value
+    for case in _query_cases(connection, where, params):
+        casedict = dict([(vname, value) for vname, sense, value in case[-1]])
         
         if len(casedict) != len(vardict):
             continue   # case doesn't contain a complete set of specified vars, so skip it to avoid data mismatches
@@ -370,6 +455,7 @@ def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=Fa
         for name, value in casedict.items():
             vardict[name].append(value)
             
+    connection.close()
     return vardict
 
 
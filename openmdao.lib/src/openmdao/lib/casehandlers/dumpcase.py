@@ -32,6 +32,11 @@ class DumpCaseRecorder(object):
         if self.out:  # if self.out is None, just do nothing
             self.out.write(str(case))
 
+    def flush(self):
+        """Flushes `out` if it supports it."""
+        if self.out is not None and hasattr(self.out, 'flush'):
+            self.out.flush()
+
     def close(self):
         """Closes `out` unless it's ``sys.stdout`` or ``sys.stderr``.
         Note that a closed recorder will do nothing in :meth:`record`."""
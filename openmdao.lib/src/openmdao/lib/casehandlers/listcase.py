@@ -46,6 +46,10 @@ class ListCaseRecorder(object):
         """Store the case in our internal list."""
         self.cases.append(case)
 
+    def flush(self):
+        """Does nothing."""
+        return
+
     def close(self):
         """Does nothing."""
         return
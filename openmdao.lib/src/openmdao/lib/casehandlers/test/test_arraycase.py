@@ -0,0 +1,159 @@
+"""
+Test for ArrayCaseRecorder and ArrayCaseIterator.
+"""
+
+import unittest
+import tempfile
+import os
+import logging
+import shutil
+
+import numpy
+
+from openmdao.main.api import Assembly, Case, set_as_top
+from openmdao.test.execcomp import ExecComp
+from openmdao.lib.casehandlers.api import ArrayCaseIterator, \
+                                          ArrayCaseRecorder, ListCaseIterator
+from openmdao.lib.drivers.api import SimpleCaseIterDriver
+from openmdao.util.testutil import assert_raises
+from openmdao.util.fileutil import onerror
+
+
+class ArrayCaseRecorderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tdir = tempfile.mkdtemp()
+        self.dirname = os.path.join(self.tdir, 'cases')
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.tdir, onerror=onerror)
+        except OSError:
+            logging.error("problem removing directory %s" % self.tdir)
+
+    def _record(self, recorder, start, stop):
+        for i in range(start, stop):
+            inputs = [('comp1.x', float(i)), ('comp1.n', i),
+                      ('comp1.arr', numpy.arange(5.)+i)]
+            outputs = [('comp1.z', i*1.5), ('comp1.label', 'out%d' % i)]
+            recorder.record(Case(inputs=inputs, outputs=outputs,
+                                 label='case%s' % i))
+
+    def test_roundtrip(self):
+        recorder = ArrayCaseRecorder(self.dirname, chunk_size=3)
+        self._record(recorder, 0, 10)
+        recorder.close()
+
+        caseiter = ArrayCaseIterator(self.dirname)
+        self.assertEqual(len(caseiter), 10)
+        self.assertEqual(caseiter.get_names('in'),
+                         ['comp1.arr', 'comp1.n', 'comp1.x'])
+        self.assertEqual(caseiter.get_names('out'),
+                         ['comp1.label', 'comp1.z'])
+        for i, case in enumerate(caseiter):
+            self.assertEqual(case.label, 'case%s' % i)
+            self.assertEqual(case['comp1.x'], float(i))
+            self.assertEqual(case['comp1.n'], i)
+            self.assertTrue(all(case['comp1.arr'] == numpy.arange(5.)+i))
+            self.assertEqual(case['comp1.z'], i*1.5)
+            self.assertEqual(case['comp1.label'], 'out%d' % i)
+
+    def test_get_column(self):
+        recorder = ArrayCaseRecorder(self.dirname, chunk_size=4)
+        self._record(recorder, 0, 10)
+        caseiter = recorder.get_iterator()
+
+        arr = caseiter.get_column('comp1.arr')
+        self.assertTrue(isinstance(arr, numpy.memmap))
+        self.assertEqual(arr.shape, (10, 5))
+        self.assertTrue(numpy.all(arr[:, 0] == numpy.arange(10.)))
+        self.assertEqual(list(caseiter.get_column('comp1.n')), range(10))
+        self.assertEqual(caseiter.get_column('comp1.label'),
+                         ['out%d' % i for i in range(10)])
+        try:
+            caseiter.get_column('foo')
+        except KeyError as err:
+            self.assertEqual(str(err), '"no data for \'foo\' in %s"'
+                                       % self.dirname)
+        else:
+            self.fail('expected KeyError')
+        recorder.close()
+
+    def test_append(self):
+        recorder = ArrayCaseRecorder(self.dirname)
+        self._record(recorder, 0, 5)
+        recorder.close()
+        recorder = ArrayCaseRecorder(self.dirname, append=True)
+        self._record(recorder, 5, 8)
+        recorder.close()
+        caseiter = ArrayCaseIterator(self.dirname)
+        self.assertEqual(len(caseiter), 8)
+        self.assertEqual(list(caseiter.get_column('comp1.x')),
+                         [float(i) for i in range(8)])
+
+        # without append, old data is discarded.
+        recorder = ArrayCaseRecorder(self.dirname)
+        self._record(recorder, 0, 2)
+        recorder.close()
+        self.assertEqual(len(ArrayCaseIterator(self.dirname)), 2)
+
+    def test_mismatch(self):
+        recorder = ArrayCaseRecorder(self.dirname)
+        self._record(recorder, 0, 1)
+        case = Case(inputs=[('comp1.x', 1.)], label='bad')
+        assert_raises(self, 'recorder.record(case)', globals(), locals(),
+                      RuntimeError, "variables in case 'bad' don't match"
+                      " the variables already recorded")
+
+        case = Case(inputs=[('comp1.x', 1.), ('comp1.n', 1),
+                            ('comp1.arr', numpy.zeros(3))],
+                    outputs=[('comp1.z', 1.), ('comp1.label', '')])
+        assert_raises(self, 'recorder.record(case)', globals(), locals(),
+                      ValueError, "shape (3,) of value for 'comp1.arr'"
+                      " doesn't match recorded shape (5,)")
+
+        recorder.close()
+        assert_raises(self, 'recorder.record(case)', globals(), locals(),
+                      RuntimeError, 'Attempt to record on closed recorder')
+
+    def test_mismatch_later_column(self):
+        # A bad value in any column leaves all columns unchanged.
+        recorder = ArrayCaseRecorder(self.dirname)
+        recorder.record(Case(inputs=[('a', 1.0), ('b', 1)]))
+        case = Case(inputs=[('a', 2.0), ('b', numpy.zeros(2))])
+        assert_raises(self, 'recorder.record(case)', globals(), locals(),
+                      ValueError, "shape (2,) of value for 'b'"
+                      " doesn't match recorded shape ()")
+        case = Case(inputs=[('a', 2.0), ('b', 1.0+2.0j)])
+        assert_raises(self, 'recorder.record(case)', globals(), locals(),
+                      ValueError, "can't store value of type complex128"
+                      " for 'b' in a column of type float64")
+        recorder.record(Case(inputs=[('a', 3.0), ('b', 3)]))
+
+        # An int first value doesn't keep floats out.
+        recorder.record(Case(inputs=[('a', 4.0), ('b', 4.5)]))
+        recorder.close()
+
+        caseiter = ArrayCaseIterator(self.dirname)
+        self.assertEqual(len(caseiter), 3)
+        self.assertEqual(list(caseiter.get_column('a')), [1.0, 3.0, 4.0])
+        self.assertEqual(list(caseiter.get_column('b')), [1.0, 3.0, 4.5])
+
+    def test_driver(self):
+        top = set_as_top(Assembly())
+        driver = top.add('driver', SimpleCaseIterDriver())
+        top.add('comp1', ExecComp(exprs=['z=x+y']))
+        driver.workflow.add('comp1')
+        cases = [Case(inputs=[('comp1.x', float(i)), ('comp1.y', i*2.)],
+                      outputs=['comp1.z']) for i in range(10)]
+        driver.iterator = ListCaseIterator(cases)
+        driver.recorders = [ArrayCaseRecorder(self.dirname)]
+        top.run()
+
+        caseiter = ArrayCaseIterator(self.dirname)
+        self.assertTrue(numpy.all(caseiter.get_column('comp1.z') ==
+                                  numpy.arange(10.)*3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -176,6 +176,17 @@ class CaseSetTestCase(unittest.TestCase):
         for c1, c2 in zip(cs, cscopy):
             self.assertEqual(c1, c2)
 
+    def test_select(self):
+        cs = CaseSet()
+        for case in self.caselist:
+            cs.record(case)
+        sel = cs.select([4, 1, 0])
+        self.assertTrue(isinstance(sel, CaseSet))
+        self.assertEqual(len(sel), 3)
+        self.assertEqual(sel['comp1.b'], [12, 9, 8])
+        self.assertTrue(self.case2 in sel)
+        self.assertFalse(self.caselist[3] in sel)
+
     def test_set_ops(self):
         cs = CaseSet()
         cs2 = CaseSet()
@@ -8,12 +8,15 @@ import StringIO
 import os
 import logging
 import shutil
+import sqlite3
+import time
 
 from openmdao.main.api import Assembly, Case, set_as_top
 from openmdao.test.execcomp import ExecComp
 from openmdao.lib.casehandlers.api import DBCaseIterator, ListCaseIterator, \
                                           DBCaseRecorder, DumpCaseRecorder, \
                                           case_db_to_dict
+from openmdao.lib.casehandlers.dbcase import get_schema_version, list_db_vars
 from openmdao.lib.drivers.api import SimpleCaseIterDriver, CaseIteratorDriver
 from openmdao.main.uncertain_distributions import NormalDistribution
 from openmdao.main.datatypes.api import List, Dict
@@ -127,6 +130,44 @@ class DBCaseRecorderTestCase(unittest.TestCase):
                 self.assertTrue(value >= 0 and value < 3)
         self.assertEqual(count, 3)
 
+    def test_varnames(self):
+        recorder = DBCaseRecorder()
+        for i in range(10):
+            inputs = [('comp1.x', i), ('comp1.y', i*2.)]
+            outputs = [('comp1.z', i*1.5)]
+            recorder.record(Case(inputs=inputs, outputs=outputs, label='case%s' % i))
+        iterator = recorder.get_iterator()
+        iterator.varnames = ['comp1.y', 'comp1.z']
+        iterator.selectors = ["label>='case5'"]
+
+        cases = list(iterator)
+        self.assertEqual(len(cases), 5)
+        for i, case in enumerate(cases):
+            self.assertEqual(case.label, 'case%s' % (i+5))
+            self.assertEqual(case.keys(), ['comp1.y', 'comp1.z'])
+            self.assertEqual(case['comp1.z'], (i+5)*1.5)
+
+    def test_schema(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            dfile = os.path.join(tmpdir, 'junk.db')
+            recorder = DBCaseRecorder(dfile)
+            recorder.record(Case(inputs=[('comp1.x', 1), ('comp1.y', 2)]))
+            recorder.close()
+            self.assertEqual(get_schema_version(dfile), 1)
+            self.assertEqual(list_db_vars(dfile), set(['comp1.x', 'comp1.y']))
+
+            connection = sqlite3.connect(dfile)
+            cur = connection.execute("EXPLAIN QUERY PLAN SELECT value FROM"
+                                     " casevars WHERE name='comp1.x'")
+            self.assertTrue('casevars_name' in str(cur.fetchall()))
+            connection.close()
+        finally:
+            try:
+                shutil.rmtree(tmpdir, onerror=onerror)
+            except OSError:
+                logging.error("problem removing directory %s" % tmpdir)
+
     def test_tables_already_exist(self):
         dbdir = tempfile.mkdtemp()
         dbname = os.path.join(dbdir, 'junk_dbfile')
@@ -241,6 +282,45 @@ class DBCaseRecorderTestCase(unittest.TestCase):
             except OSError:
                 logging.error("problem removing directory %s" % tmpdir)
 
+    def test_buffered(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            dfile = os.path.join(tmpdir, 'junk.db')
+            recorder = DBCaseRecorder(dfile, chunk_size=4)
+            for i in range(10):
+                inputs = [('comp1.x', i), ('comp1.y', i*2.)]
+                outputs = [('comp1.z', i*1.5), ('comp1.arr', [i, i+1])]
+                recorder.record(Case(inputs=inputs, outputs=outputs,
+                                     label='case%s' % i))
+                # only full chunks have been written so far
+                self.assertEqual(len(list(DBCaseIterator(dfile))),
+                                 ((i+1)//4)*4)
+            recorder.flush()
+            self.assertEqual(len(list(DBCaseIterator(dfile))), 10)
+
+            recorder.record(Case(inputs=[('comp1.x', 10)], label='case10'))
+            recorder.close()
+            cases = list(DBCaseIterator(dfile))
+            self.assertEqual(len(cases), 11)
+            for i, case in enumerate(cases[:10]):
+                self.assertEqual(case.label, 'case%s' % i)
+                self.assertEqual(case['comp1.z'], i*1.5)
+                self.assertEqual(case['comp1.arr'], [i, i+1])
+        finally:
+            try:
+                shutil.rmtree(tmpdir, onerror=onerror)
+            except OSError:
+                logging.error("problem removing directory %s" % tmpdir)
+
+    def test_flush_interval(self):
+        recorder = DBCaseRecorder(chunk_size=1000, flush_interval=1.e-6)
+        recorder.record(Case(inputs=[('comp1.x', 1)]))
+        time.sleep(0.01)
+        recorder.record(Case(inputs=[('comp1.x', 2)]))
+        self.assertEqual(recorder._buffer, [])
+        cur = recorder._connection.execute("SELECT count(*) FROM cases")
+        self.assertEqual(cur.fetchone()[0], 2)
+
 
 class NestedCaseTestCase(unittest.TestCase):
 
@@ -3,19 +3,16 @@
 import logging
 
 try:
-    from numpy import exp, pi, array, isnan, diag, random
+    from numpy import exp, pi, array, asarray, isnan, random, errstate
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 _check=['numpy']
 try:
-    from math import erf
+    # Unlike math.erf, this one works on whole arrays.
+    from scipy.special import erf
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
-    try:
-        from scipy.special import erf
-    except ImportError as err:
-        logging.warn("In %s: %r" % (__file__, err))
-        _check.append('scipy')
+    _check.append('scipy')
 
 from openmdao.lib.datatypes.api import Slot, Enum, Float, Array, Event, Int
 
@@ -74,117 +71,113 @@ class MultiObjExpectedImprovement(Component):
         y_star = array(y_star)[array([i[0] for i in y_star]).argsort()]
         return y_star
 
-    def _2obj_PI(self, mu, sigma):
-        """Calculates the multi-objective probability of improvement
-        for a new point with two responses. Takes as input a
-        pareto frontier, mean and sigma of new point."""
+    def _2obj_terms(self, mu, sigma):
+        """Returns the normal cumulative distribution and the partial
+        expectation of each response of each candidate point, evaluated
+        at each point of the pareto frontier. Both have shape
+        (candidates, pareto points, 2)."""
 
-        y_star = self.y_star
+        mu = mu[:, None, :]
+        sigma = sigma[:, None, :]
+        z = (self.y_star[None, :, :]-mu)/sigma
+        cdf = 0.5+0.5*erf(z/2**0.5)
+        pdf = exp(-0.5*z**2)/(2*pi)**0.5
+        return cdf, mu*cdf-sigma*pdf
 
-        PI1 = (0.5+0.5*erf((1/(2**0.5))*((y_star[0][0]-mu[0])/sigma[0])))
-        PI3 = (1-(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0]))))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))
+    def _2obj_PI(self, cdf):
+        """Calculates the multi-objective probability of improvement
+        for new points with two responses, given the cumulative
+        distributions from :meth:`_2obj_terms`."""
 
-        PI2 = 0
-        if len(y_star)>1:
-            for i in range(len(y_star) - 1):
-                PI2=PI2+((0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))\
-                -(0.5+0.5*erf((1/(2**0.5))*((y_star[i][0]-mu[0])/sigma[0]))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))
-        mcpi = PI1 + PI2 + PI3
-        return mcpi
+        PI1 = cdf[:, 0, 0]
+        PI2 = ((cdf[:, 1:, 0]-cdf[:, :-1, 0])*cdf[:, 1:, 1]).sum(axis=1)
+        PI3 = (1-cdf[:, -1, 0])*cdf[:, -1, 1]
+        return PI1 + PI2 + PI3
 
-    def _2obj_EI(self, mu, sigma):
+    def _2obj_EI(self, cdf, ybar, PI):
         """Calculates the multi-criteria expected improvement
-        for a new point with two responses. Takes as input a
-        pareto frontier, mean and sigma of new point."""
-
-        y_star = self.y_star
-        ybar11 = mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[0][0]-mu[0])/sigma[0])))\
-        -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[0][0]-mu[0])**2/sigma[0]**2))
-        ybar13 = (mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0])))\
-        -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[-1][0]-mu[0])**2/sigma[0]**2)))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))
-
-        ybar12 = 0
-        if len(y_star) > 1:
-            for i in range(len(y_star) - 1):
-                ybar12 = ybar12+((mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))\
-                -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i+1][0]-mu[0])**2/sigma[0]**2)))\
-                -(mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i][0]-mu[0])/sigma[0])))\
-                -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i][0]-mu[0])**2/sigma[0]**2))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))
-
-        ybar1 = (ybar11+ybar12+ybar13)/self.PI
-
-        ybar21 = mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[0][1]-mu[1])/sigma[1])))\
-        -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[0][1]-mu[1])**2/sigma[1]**2))
-        ybar23 = (mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))\
-        -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[-1][1]-mu[1])**2/sigma[1]**2)))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0])))
-
-        ybar22 = 0
-        if len(y_star)>1:
-            for i in range(len(y_star) - 1):
-                ybar22 = ybar22+((mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))\
-                -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i+1][1]-mu[1])**2/sigma[1]**2)))\
-                -(mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i][1]-mu[1])/sigma[1])))\
-                -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i][1]-mu[1])**2/sigma[1]**2))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))
-
-        ybar2 = (ybar21+ybar22+ybar23)/self.PI
-        dists = [((ybar1-point[0])**2+(ybar2-point[1])**2)**0.5 for point in y_star]
-        mcei = self.PI*min(dists)
-        if isnan(mcei):
-            mcei = 0
+        for new points with two responses, given the terms from
+        :meth:`_2obj_terms` and the probabilities of improvement."""
+
+        with errstate(divide='ignore', invalid='ignore'):
+            ybar1 = (ybar[:, 0, 0]
+                     +((ybar[:, 1:, 0]-ybar[:, :-1, 0])*cdf[:, 1:, 1]).sum(axis=1)
+                     +ybar[:, -1, 0]*cdf[:, -1, 1])/PI
+            ybar2 = (ybar[:, 0, 1]
+                     +((ybar[:, 1:, 1]-ybar[:, :-1, 1])*cdf[:, 1:, 0]).sum(axis=1)
+                     +ybar[:, -1, 1]*cdf[:, -1, 0])/PI
+
+            y_star = self.y_star
+            dists = ((ybar1[:, None]-y_star[None, :, 0])**2
+                     +(ybar2[:, None]-y_star[None, :, 1])**2)**0.5
+            mcei = PI*dists.min(axis=1)
+        mcei[isnan(mcei)] = 0
         return mcei
 
-    def _dom(self, a, b):
-        """determines if a completely dominates b
-       returns True is if does
-    """
-        comp = [c1 < c2 for c1, c2 in zip(a, b)]
-        if sum(comp) == len(self.criteria):
-            return True
-        return False
-
     def _nobj_PI(self, mu, sigma):
-        cov = diag(array(sigma)**2)
-        rands = random.multivariate_normal(mu, cov, self.n)
-        num = 0  # number of cases that dominate the current Pareto set
-
-        for random_sample in rands:
-            for par_point in self.y_star:
-                #par_point = [p[2] for p in par_point.outputs]
-                if self._dom(par_point, random_sample):
-                    num = num + 1
-                    break
-        pi = (self.n-num)/float(self.n)
-        return pi
+        """Estimates the probability of improvement of new points by
+        checking whether Monte Carlo samples of their responses are
+        dominated by any point of the pareto frontier."""
 
-    def execute(self):
-        """ Calculates the expected improvement or
-        probability of improvement of a candidate
-        point given by a normal distribution.
+        y_star = self.y_star
+        pi = []
+        for m, s in zip(mu, sigma):
+            rands = m+s*random.standard_normal((self.n, len(m)))
+            # number of samples that are dominated by the current Pareto set
+            num = (y_star[None, :, :] < rands[:, None, :]).all(axis=2)\
+                  .any(axis=1).sum()
+            pi.append((self.n-num)/float(self.n))
+        return array(pi)
+
+    def calc_batch(self, mu, sigma):
+        """Calculates the probability of improvement and, if calc_switch
+        is 'EI', the expected improvement of many candidate points at once.
+
+        mu: 2D array-like
+            Each row holds the predicted means of the criteria at one point.
+
+        sigma: 2D array-like
+            Each row holds the predicted standard deviations of the criteria
+            at one point.
+
+        Returns a tuple of 1D arrays (PI, EI). EI is None if calc_switch
+        is 'PI'.
         """
-        mu = [objective.mu for objective in self.predicted_values]
-        sig = [objective.sigma for objective in self.predicted_values]
+        mu = asarray(mu, dtype=float)
+        sigma = asarray(sigma, dtype=float)
 
-        if self.y_star == None:
+        if self.y_star is None:
             self.y_star = self.get_y_star()
 
         n_objs = len(self.criteria)
 
         if n_objs == 2:
             """biobjective optimization"""
-            self.PI = self._2obj_PI(mu, sig)
+            cdf, ybar = self._2obj_terms(mu, sigma)
+            PI = self._2obj_PI(cdf)
+            EI = None
             if self.calc_switch == 'EI':
                 """execute EI calculations"""
-                self.EI = self._2obj_EI(mu, sig)
-        if n_objs > 2:
-            """n objective optimization"""
-            self.PI = self._nobj_PI(mu, sig)
-            if self.calc_switch == 'EI':
-                """execute EI calculations"""
-                self.raise_exception("EI calculations not supported"
-                                        " for more than 2 objectives", ValueError)
+                EI = self._2obj_EI(cdf, ybar, PI)
+            return PI, EI
+
+        """n objective optimization"""
+        if self.calc_switch == 'EI':
+            """execute EI calculations"""
+            self.raise_exception("EI calculations not supported"
+                                    " for more than 2 objectives", ValueError)
+        return self._nobj_PI(mu, sigma), None
+
+    def execute(self):
+        """ Calculates the expected improvement or
+        probability of improvement of a candidate
+        point given by a normal distribution.
+        """
+        mu = [objective.mu for objective in self.predicted_values]
+        sig = [objective.sigma for objective in self.predicted_values]
+
+        if len(self.criteria) >= 2:
+            PI, EI = self.calc_batch([mu], [sig])
+            self.PI = PI[0]
+            if EI is not None:
+                self.EI = EI[0]
@@ -35,6 +35,9 @@ class ExternalCode(Component):
     STDOUT   = shellproc.STDOUT
     DEV_NULL = shellproc.DEV_NULL
 
+    # Most of the time is spent waiting on the external process.
+    releases_gil = True
+
     # pylint: disable-msg=E1101
     command = List(Str, desc='The command to be executed.')
     env_vars = Dict({}, iotype='in',
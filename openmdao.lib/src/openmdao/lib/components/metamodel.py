@@ -20,6 +20,8 @@
 
 from copy import deepcopy, copy
 
+from numpy import array, empty, nonzero
+
 from enthought.traits.trait_base import not_none
 from enthought.traits.has_traits import _clone_trait
 
@@ -47,6 +49,43 @@ def check_model_only_one_level_vartree(model_node):
     return True
 
 
+class _History(object):
+    """Training history kept in a preallocated array whose capacity is
+    doubled as needed, so adding an entry doesn't copy the whole history.
+    The shape of each entry is set by the first entry appended.
+    """
+
+    def __init__(self, capacity=16):
+        self._capacity = capacity
+        self._data = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, idx):
+        return self.data[idx]
+
+    @property
+    def data(self):
+        """Array containing the entries appended so far."""
+        if self._data is None:
+            return empty(0)
+        return self._data[:self._size]
+
+    def append(self, value):
+        """Add `value` to the end of the history."""
+        value = array(value, dtype=float)
+        if self._data is None:
+            self._data = empty((self._capacity,)+value.shape)
+        elif self._size == len(self._data):
+            data = empty((2*len(self._data),)+self._data.shape[1:])
+            data[:self._size] = self._data
+            self._data = data
+        self._data[self._size] = value
+        self._size += 1
+
+
 class MetaModel(Component):
 
     # pylint: disable-msg=E1101
@@ -83,6 +122,12 @@ class MetaModel(Component):
     recorder = Slot(ICaseRecorder,
                     desc='Records training cases')
 
+    incremental_training = Bool(False, iotype="in",
+                                desc="If True, surrogates that have an "
+                                "update() method are updated with just the "
+                                "new training points instead of being "
+                                "retrained on all of the training data.")
+
     # when fired, the next execution will train the metamodel
     train_next = Event(desc='Train metamodel on next execution')
 
@@ -95,8 +140,9 @@ class MetaModel(Component):
         self._surrogate_output_names = None
         self._surrogate_overrides = set()  # keeps track of which sur_<name> slots are full
         self._training_data = {}
-        self._training_input_history = []
+        self._training_input_history = _History()
         self._const_inputs = {}  # dict of constant training inputs indices and their values
+        self._num_trained = 0  # number of training points the surrogates have seen
         self._train = False
         self._new_train_data = False
         self._failed_training_msgs = []
@@ -117,13 +163,14 @@ class MetaModel(Component):
         self._new_train_data = True
 
     def _reset_training_data_fired(self):
-        self._training_input_history = []
+        self._training_input_history = _History()
         self._const_inputs = {}
         self._failed_training_msgs = []
+        self._num_trained = 0
 
         # remove output history from training_data
         for name in self._training_data:
-            self._training_data[name] = []
+            self._training_data[name] = _History()
 
     def _warm_start_data_changed(self, oldval, newval):
         self.reset_training_data = True
@@ -228,9 +275,9 @@ class MetaModel(Component):
                 self.update_outputs_from_model()
                 case_outputs = []
 
-                for name, output_history in self._training_data.items():
+                for name in self._training_data:
                     case_outputs.append(('.'.join([self.name, name]),
-                                         output_history[-1]))
+                                         self.model.get(name)))
                 # save the case, making sure to add out name to the local input name since
                 # this Case is scoped to our parent Assembly
                 case_inputs = [('.'.join([self.name, name]), val) for name, val in zip(self.surrogate_input_names(),
@@ -253,33 +300,40 @@ class MetaModel(Component):
                                          RuntimeError)
 
                 # figure out if we have any constant training inputs
-                tcases = self._training_input_history
-                in_hist = tcases[0][:]
-                # start off assuming every input is constant
-                idxlist = range(len(in_hist))
-                self._const_inputs = dict(zip(idxlist, in_hist))
-                for i in idxlist:
-                    val = in_hist[i]
-                    for case in range(1, len(tcases)):
-                        if val != tcases[case][i]:
-                            del self._const_inputs[i]
-                            break
-
-                if len(self._const_inputs) == len(in_hist):
+                tcases = self._training_input_history.data
+                const = (tcases == tcases[0]).all(axis=0)
+                old_const = self._const_inputs
+                self._const_inputs = dict([(i, tcases[0, i])
+                                           for i in nonzero(const)[0]])
+
+                if len(self._const_inputs) == len(const):
                     self.raise_exception("ERROR: all training inputs are constant.")
                 elif len(self._const_inputs) > 0:
                     # some inputs are constant, so we have to remove them from the training set
-                    training_input_history = []
-                    for inputs in self._training_input_history:
-                        training_input_history.append([val for i, val in enumerate(inputs)
-                                                       if i not in self._const_inputs])
+                    training_input_history = tcases[:, ~const]
                 else:
-                    training_input_history = self._training_input_history
+                    training_input_history = tcases
+
+                # if we've only added points since the last training, the
+                # surrogates can just be updated with the new ones.
+                ntrain = len(tcases)
+                incremental = self.incremental_training and \
+                              0 < self._num_trained < ntrain and \
+                              set(old_const) == set(self._const_inputs)
+
                 for name, output_history in self._training_data.items():
                     surrogate = self._get_surrogate(name)
-                    if surrogate is not None:
-                        surrogate.train(training_input_history, output_history)
+                    if surrogate is None:
+                        continue
+                    if incremental and hasattr(surrogate, 'update'):
+                        for i in range(self._num_trained, ntrain):
+                            surrogate.update(training_input_history[i],
+                                             output_history[i])
+                    else:
+                        surrogate.train(training_input_history,
+                                        output_history.data)
 
+                self._num_trained = ntrain
                 self._new_train_data = False
 
             inputs = []
@@ -404,9 +458,11 @@ class MetaModel(Component):
                     self._default_surrogate_copies[varname] = deepcopy(self.default_surrogate)
                 if varname in self._surrogate_overrides:
                     self._surrogate_overrides.remove(varname)
+                self._num_trained = 0
             else:
                 self._surrogate_overrides.add(varname)
                 self._add_var_for_surrogate(self.surrogates[varname], varname)
+                self._num_trained = 0
                 if name in self._default_surrogate_copies:
                     del self._default_surrogate_copies[name]
 
@@ -500,7 +556,7 @@ class MetaModel(Component):
                 model_vartree_node = self.model.get(vartreename)
                 metamodel_vartree_node.add_trait(subvarname, _clone_trait(model_vartree_node.trait(subvarname)))
 
-        self._training_data[name] = []
+        self._training_data[name] = _History()
 
     def _remove_input(self, name):
         """Removes the specified input variable.
@@ -665,6 +721,7 @@ class MetaModel(Component):
                     surrogate = deepcopy(self.default_surrogate)
                     self._default_surrogate_copies[name] = surrogate
                     self._add_var_for_surrogate(surrogate, name)
+            self._num_trained = 0
 
         self.config_changed()
 
@@ -674,6 +731,7 @@ class MetaModel(Component):
 
         for name in self._default_surrogate_copies:
             self._default_surrogate_copies[name] = deepcopy(self.default_surrogate)
+        self._num_trained = 0
 
     def _eligible(self, name):
         """Return True if the named trait is not excluded from the public interface based
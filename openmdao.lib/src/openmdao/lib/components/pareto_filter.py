@@ -1,13 +1,139 @@
 """ Pareto Filter -- finds non-dominated cases. """
 
+from bisect import bisect_left, bisect_right
+
+from numpy import asarray, empty, lexsort, unique, vstack
+
 # pylint: disable-msg=E0611,F0401
-from openmdao.main.datatypes.api import Slot, List, Str
+from openmdao.main.datatypes.api import Slot, List, Str, Array
 from openmdao.lib.casehandlers.api import CaseSet, caseiter_to_caseset
 
 from openmdao.main.component import Component
 from openmdao.main.interfaces import ICaseIterator
 
 
+def pareto_ranks(points):
+    """Returns the Pareto rank of each row of the 2D array `points`, where
+    each column holds one criterion and smaller values are better. Rank 0 is
+    the set of non-dominated points, rank 1 is the set of points that are
+    non-dominated once rank 0 is removed, and so on. Identical points are not
+    considered to dominate each other, so they always have the same rank.
+
+    Sorting takes O(n log n) time for two criteria and O(n log^2 n) for three.
+    With more criteria, each point is compared against whole fronts.
+    """
+    points = asarray(points, dtype=float)
+    if points.ndim == 1:
+        points = points.reshape(-1, 1)
+    n, k = points.shape
+    ranks = empty(n, dtype=int)
+    if n == 0:
+        return ranks
+
+    if k == 1:
+        ranks[:] = unique(points[:, 0], return_inverse=True)[1]
+        return ranks
+
+    # Sorting lexicographically means that a point can only be dominated by
+    # the points before it. Each point is placed in the first front that
+    # doesn't dominate it. If a front dominates a point, so do all of the
+    # fronts before it, so that front is found by bisection.
+    order = lexsort(points.T[::-1])
+    if k == 2:
+        fronts = _MinFronts()
+    elif k == 3:
+        fronts = _StaircaseFronts()
+    else:
+        fronts = _ArrayFronts(k-1)
+
+    prev = None
+    rank = 0
+    for i, point in enumerate(points[order].tolist()):
+        # identical points don't dominate each other
+        if point != prev:
+            # the first criterion of the earlier points is never larger, so
+            # only the other criteria need to be compared
+            rest = point[1:]
+            lo, hi = 0, len(fronts)
+            while lo < hi:
+                mid = (lo+hi)//2
+                if fronts.dominates(mid, rest):
+                    lo = mid+1
+                else:
+                    hi = mid
+            rank = lo
+            fronts.add(rank, rest)
+            prev = point
+        ranks[order[i]] = rank
+    return ranks
+
+
+class _MinFronts(list):
+    """The fronts of points with one remaining criterion. Only the smallest
+    value in each front matters."""
+
+    def dominates(self, rank, point):
+        """True if a point in front `rank` dominates `point`."""
+        return self[rank] <= point[0]
+
+    def add(self, rank, point):
+        """Add `point` to front `rank`."""
+        if rank == len(self):
+            self.append(point[0])
+        else:
+            self[rank] = point[0]
+
+
+class _StaircaseFronts(list):
+    """The fronts of points with two remaining criteria. Each front only
+    keeps its points that are non-dominated in those criteria, sorted by
+    increasing first criterion (and so decreasing second criterion)."""
+
+    def dominates(self, rank, point):
+        """True if a point in front `rank` dominates `point`."""
+        ys, zs = self[rank]
+        j = bisect_right(ys, point[0]) - 1
+        return j >= 0 and zs[j] <= point[1]
+
+    def add(self, rank, point):
+        """Add `point` to front `rank`, removing the points it dominates."""
+        if rank == len(self):
+            self.append(([], []))
+        ys, zs = self[rank]
+        y, z = point
+        start = end = bisect_left(ys, y)
+        while end < len(zs) and zs[end] >= z:
+            end += 1
+        ys[start:end] = [y]
+        zs[start:end] = [z]
+
+
+class _ArrayFronts(list):
+    """The fronts of points with any number of remaining criteria. Each
+    front is stored in an array that grows as needed."""
+
+    def __init__(self, ncriteria):
+        super(_ArrayFronts, self).__init__()
+        self._ncriteria = ncriteria
+        self._sizes = []
+
+    def dominates(self, rank, point):
+        """True if a point in front `rank` dominates `point`."""
+        front = self[rank][:self._sizes[rank]]
+        return (front <= point).all(axis=1).any()
+
+    def add(self, rank, point):
+        """Add `point` to front `rank`."""
+        if rank == len(self):
+            self.append(empty((16, self._ncriteria)))
+            self._sizes.append(0)
+        size = self._sizes[rank]
+        if size == len(self[rank]):
+            self[rank] = vstack([self[rank], empty(self[rank].shape)])
+        self[rank][size] = point
+        self._sizes[rank] = size+1
+
+
 class ParetoFilter(Component):
     """Takes a set of cases and filters out the subset of cases which are
     pareto optimal. Assumes that smaller values for model responses are
@@ -32,18 +158,9 @@ class ParetoFilter(Component):
                         desc="Resulting collection of pareto optimal cases.", copy="shallow")
     dominated_set = Slot(CaseSet, iotype="out",
                            desc="Resulting collection of dominated cases.", copy="shallow")
-
-    def _is_dominated(self, y1, y2):
-        """Tests to see if the point y1 is dominated by the point y2.
-        True if y1 is dominated by y2, False otherwise.
-        """
-        if y1 == y2:
-            return False
-        for a, b in zip(y1, y2):
-            if a < b:
-                return False
-
-        return True
+    dominated_ranks = Array(iotype="out", dtype=int,
+                            desc="Pareto rank of each case in dominated_set. "
+                                 "Cases in pareto_set have rank 0.")
 
     def execute(self):
         """Finds and removes pareto optimal points in the given case set.
@@ -58,12 +175,10 @@ class ParetoFilter(Component):
             else:
                 case_sets.append(ci)
 
-        y_list = []
         if len(case_sets) > 1:
             case_set = case_sets[0].union(*case_sets[1:])
         else:
             case_set = case_sets[0]
-        criteria_count = len(self.criteria)
 
         try:
             # need to transpose the list of outputs
@@ -72,21 +187,10 @@ class ParetoFilter(Component):
             self.raise_exception('no cases provided had all of the outputs '
                  'matching the provided criteria, %s' % self.criteria, ValueError)
 
-        y_temp = list(y_list)
-
-        self.dominated_set = CaseSet()
-        self.pareto_set = CaseSet()  # TODO: need a way to copy casesets
-
-        for point1, case in zip(y_list, iter(case_set)):
-            dominated = False
-            for point2 in y_temp:
-                if self._is_dominated(point1, point2):
-                    self.dominated_set.record(case)
-                    y_temp.remove(point1)
-                    dominated = True
-                    break
-            if not dominated:
-                self.pareto_set.record(case)
+        ranks = pareto_ranks(y_list)
+        self.pareto_set = case_set.select((ranks == 0).nonzero()[0])
+        self.dominated_set = case_set.select((ranks > 0).nonzero()[0])
+        self.dominated_ranks = ranks[ranks > 0]
 
 if __name__ == "__main__":  # pragma: no cover
 
@@ -24,6 +24,33 @@ class MultiObjExpectedImprovementTests(unittest.TestCase):
         self.assertAlmostEqual([5.0],ei.EI,1)
         self.assertEqual(0.5,ei.PI,6)
 
+    def test_calc_batch(self):
+        ei = MultiObjExpectedImprovement()
+        bests = CaseSet()
+        list_of_cases = [Case(outputs=[("y1",1),("y2",10)]),Case(outputs=[("y1",2),("y2",5)]),
+                         Case(outputs=[("y1",4),("y2",1)])]
+        for case in list_of_cases:
+            bests.record(case)
+        ei.best_cases = bests
+        ei.criteria = ["y1","y2"]
+        ei.calc_switch = "EI"
+        mu = [[1,0],[3,3],[5,5]]
+        sigma = [[1,1],[.5,2],[.1,.1]]
+        PI, EI = ei.calc_batch(mu, sigma)
+        self.assertEqual((3,), PI.shape)
+        self.assertEqual((3,), EI.shape)
+        # Values from the original point-by-point formulas.
+        expected_PI = [0.9748284125529368, 0.17419155476612658, 0.]
+        expected_EI = [2.582318670010442, 0.6090362609750358, 0.]
+        for i in range(3):
+            self.assertAlmostEqual(expected_PI[i], PI[i], 10)
+            self.assertAlmostEqual(expected_EI[i], EI[i], 10)
+
+        ei.calc_switch = "PI"
+        PI2, EI2 = ei.calc_batch(mu, sigma)
+        self.assertEqual(None, EI2)
+        self.assertTrue((PI == PI2).all())
+
     def test_ei_nobj(self):
         ei = MultiObjExpectedImprovement()
         bests = CaseSet()
@@ -434,6 +434,50 @@ class MetaModelTestCase(unittest.TestCase):
         self.assertEqual(metamodel2.c.getvalue(), simple.c)
         self.assertEqual(metamodel2.d.getvalue(), simple.d)        
         
+    def test_incremental_training(self):
+        asm = set_as_top(Assembly())
+        mm1 = asm.add('mm1', MetaModel())
+        mm1.default_surrogate = KrigingSurrogate()
+        mm1.model = Simple()
+        mm2 = asm.add('mm2', MetaModel())
+        mm2.default_surrogate = KrigingSurrogate()
+        mm2.model = Simple()
+        mm2.incremental_training = True
+
+        def train(points):
+            for a, b in points:
+                for mm in (mm1, mm2):
+                    mm.a = a
+                    mm.b = b
+                    mm.train_next = True
+                    mm.run()
+            for mm in (mm1, mm2):
+                mm.a = 6.
+                mm.b = 3.
+                mm.run()
+
+        train([(1.,2.),(3.,5.),(4.,1.5)])
+        self.assertEqual(mm2._num_trained, 3)
+
+        # mm2's surrogates are only updated with the new points
+        thetas = mm2._default_surrogate_copies['c'].thetas.copy()
+        train([(2.,7.),(6.,3.)])
+        self.assertEqual(mm2._num_trained, 5)
+        self.assertEqual(list(mm2._default_surrogate_copies['c'].thetas),
+                         list(thetas))
+        self.assertEqual(mm2._default_surrogate_copies['c'].n, 5)
+        # both interpolate the training data
+        assert_rel_error(self, mm2.c.mu, 9., 0.0001)
+        assert_rel_error(self, mm1.c.mu, 9., 0.0001)
+
+        # replacing the surrogate forces a full retrain
+        mm2.default_surrogate = KrigingSurrogate()
+        self.assertEqual(mm2._num_trained, 0)
+        train([(5.,5.)])
+        self.assertEqual(mm2._num_trained, 6)
+        self.assertEqual(mm2._default_surrogate_copies['c'].n, 6)
+        self.assertEqual(mm2.c.mu, mm1.c.mu)
+
     def test_default_execute(self):
         metamodel = MetaModel()
         metamodel.name = 'meta'
@@ -555,7 +599,7 @@ class MetaModelTestCase(unittest.TestCase):
         s.mm.reset_training_data = True
         self.assertEqual(len(s.mm._training_input_history), 0)
         for name in s.mm._training_data:
-            self.assertEqual(s.mm._training_data[name],[])
+            self.assertEqual(len(s.mm._training_data[name]), 0)
 
         #all meta model inputs should remain at their current values
         self.assertEqual(s.mm.x, 10)
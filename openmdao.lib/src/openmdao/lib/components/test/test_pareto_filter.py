@@ -2,7 +2,7 @@
 
 import unittest
 
-from openmdao.lib.components.pareto_filter import ParetoFilter
+from openmdao.lib.components.pareto_filter import ParetoFilter, pareto_ranks
 from openmdao.lib.casehandlers.api import ListCaseIterator
 from openmdao.main.case import Case
 
@@ -62,6 +62,19 @@ class ParetoFilterTests(unittest.TestCase):
         self.assertEqual((2,1),y_p)
         self.assertEqual((1, 2, 2, 3, 3, 3),x_dom)
         self.assertEqual((3, 2, 3, 1, 2, 3),y_dom)
+        self.assertEqual([1, 1, 2, 1, 2, 3],list(pf.dominated_ranks))
+
+    def test_ranks(self):
+        self.assertEqual([2, 0, 1, 0],list(pareto_ranks([3, 1, 2, 1])))
+
+        y = [(1,3),(2,2),(3,1),(2,3),(1,3),(3,3),(4,0),(2,4)]
+        self.assertEqual([0, 0, 0, 1, 0, 2, 0, 2],list(pareto_ranks(y)))
+
+        y = [(1,2,3),(3,2,1),(2,2,2),(2,3,3),(3,3,3),(1,2,3),(0,4,4),(2,2,2.5)]
+        self.assertEqual([0, 0, 0, 2, 3, 0, 0, 1],list(pareto_ranks(y)))
+
+        y = [(1,2,3,4),(4,3,2,1),(2,2,3,4),(4,4,4,4),(1,1,1,5)]
+        self.assertEqual([0, 0, 1, 2, 0],list(pareto_ranks(y)))
         
     def test_bad_case_set(self): 
         pf = ParetoFilter()
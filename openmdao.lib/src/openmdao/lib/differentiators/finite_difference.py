@@ -9,8 +9,10 @@ from itertools import product
 
 from openmdao.main.numpy_fallback import array
 
-from openmdao.lib.datatypes.api import Enum, Float
+from openmdao.lib.datatypes.api import Bool, Dict, Enum, Float
+from openmdao.lib.drivers.caseiterdriver import CaseIterDriverBase
 from openmdao.main.api import Container
+from openmdao.main.case import Case
 from openmdao.main.interfaces import implements, IDifferentiator
 from openmdao.main.container import find_name
 
@@ -25,6 +27,12 @@ def diff_1st_fwrdbwrd(fp, fm, eps):
     
     return (fp - fm)/eps
 
+def diff_1st_complex_step(fp, f0, eps):
+    """Evaluates a first order complex step derivative. The baseline value
+    isn't needed."""
+    
+    return fp.imag/eps
+
 def diff_2nd_xx(fp, f0, fm, eps):
     """Evaluates an on-diagonal 2nd derivative term."""
     
@@ -35,6 +43,31 @@ def diff_2nd_xy(fpp, fpm, fmp, fmm, eps1, eps2):
     
     return (fpp - fpm - fmp + fmm)/(4.0*eps1*eps2)
 
+def _constraint_value(constraint, lhs, rhs):
+    """Returns the value of a constraint given the values of its left and
+    right hand sides. The value is negative when the constraint is
+    satisfied."""
+    
+    lhs = (lhs + constraint.adder)*constraint.scaler
+    rhs = (rhs + constraint.adder)*constraint.scaler
+    if '>' in constraint.comparator:
+        return rhs-lhs
+    else:
+        return lhs-rhs
+
+
+class _PointDriver(CaseIterDriverBase):
+    """Evaluates a set of cases concurrently for :class:`FiniteDifference`,
+    using a replicate of the workflow of the driver being differentiated."""
+    
+    def __init__(self, cases):
+        super(_PointDriver, self).__init__()
+        self._cases = cases
+        
+    def get_case_iterator(self):
+        """Returns a new iterator over the Case set."""
+        return iter(self._cases)
+
 
 class FiniteDifference(Container):
     """ Differentiates a driver's workflow using the Finite Difference with
@@ -44,12 +77,21 @@ class FiniteDifference(Container):
     implements(IDifferentiator)
     
     # pylint: disable-msg=E1101
-    form = Enum("central", ["central", "forward", "backward"], iotype='in', \
-                desc="Finite difference form (central, forward, backward).")
+    form = Enum("central", ["central", "forward", "backward", "complex_step"],
+                iotype='in', desc="Finite difference form (central, " + \
+                "forward, backward, complex_step). The complex_step form " + \
+                "requires a workflow that can be run with complex inputs.")
     
     default_stepsize = Float(1.0e-6, iotype='in', desc='Default finite ' + \
                              'difference step size.')
     
+    sequential = Bool(True, iotype='in', desc='If False, the finite ' + \
+                      'difference points are evaluated concurrently on ' + \
+                      'servers obtained from the ResourceAllocationManager.')
+    
+    extra_resources = Dict(iotype='in', desc='Extra resource requirements ' + \
+                           'for concurrent evaluation (unusual).')
+    
     def __init__(self):
         
         super(FiniteDifference, self).__init__()
@@ -168,8 +210,12 @@ class FiniteDifference(Container):
         # For Forward or Backward diff, we want to save the baseline
         # objective and constraints. These are also needed for the
         # on-diagonal Hessian terms, so we will save them in the class
-        # later.
-        base_data = self._run_point(base_param)
+        # later. When running concurrently, the baseline is run along
+        # with the other points. For complex step, the baseline is run
+        # last.
+        complex_step = self.form == 'complex_step'
+        if self.sequential and not complex_step:
+            base_data = self._run_point(base_param)
         
         # Set up problem based on Finite Difference type
         if self.form == 'central':
@@ -178,9 +224,12 @@ class FiniteDifference(Container):
         elif self.form == 'forward':
             deltas = [1, 0]
             func = diff_1st_fwrdbwrd
-        else:
+        elif self.form == 'backward':
             deltas = [0, -1]
             func = diff_1st_fwrdbwrd
+        else:
+            deltas = [1j, 0]
+            func = diff_1st_complex_step
 
         self.gradient_case = OrderedDict()
 
@@ -197,13 +246,29 @@ class FiniteDifference(Container):
             self.gradient_case[param] = pcase
             
         # Run all "cases".
-        # TODO - Integrate OpenMDAO's concurrent processing capability once it
-        # is formalized. This operation is inherently paralellizable.
+        pcases = [pcase for case in self.gradient_case.values()
+                        for ipcase, pcase in enumerate(case)
+                        if deltas[ipcase]]
+        if complex_step:
+            # Complex steps are always run locally. Running the baseline
+            # afterwards returns the model to a real state.
+            self._parent.set_complex_step(True)
+            try:
+                for pcase in pcases:
+                    pcase['data'] = self._run_point(pcase['param'])
+            finally:
+                self._parent.set_complex_step(False)
+            base_data = self._run_point(base_param)
+        elif self.sequential:
+            self._run_cases(pcases)
+        else:
+            base_case = { 'param': base_param }
+            self._run_cases([base_case] + pcases)
+            base_data = base_case['data']
+            
         for key, case in self.gradient_case.iteritems():
             for ipcase, pcase in enumerate(case):
-                if deltas[ipcase]:
-                    pcase['data'] = self._run_point(pcase['param'])
-                else:
+                if not deltas[ipcase]:
                     pcase['data'] = base_data
                 
         
@@ -274,7 +339,7 @@ class FiniteDifference(Container):
             for key, item in self._parent.get_parameters().iteritems():
                 base_param[key] = item.evaluate()
                     
-            base_data = self._run_point(base_param)
+            base_data = None
             
         # Assemble input data
         # Cases : ondiag [fp, fm]
@@ -313,8 +378,10 @@ class FiniteDifference(Container):
             self.hessian_offdiag_case[param1] = offdiag
             
         # Run all "cases".
-        # TODO - Integrate OpenMDAO's concurrent processing capability once it
-        # is formalized. This operation is inherently paralellizable.
+        pcases = []
+        if base_data is None:
+            base_case = { 'param': base_param }
+            pcases.append(base_case)
         
         # We don't need to re-run on-diag cases if the gradients were
         # calculated with Central Difference.
@@ -328,15 +395,16 @@ class FiniteDifference(Container):
                     pcase['data'] = gradient_ipcase['data'] 
         else:
             for case in self.hessian_ondiag_case.values():
-                for pcase in case:
-                    data = self._run_point(pcase['param'])
-                    pcase['data'] = data
+                pcases.extend(case)
 
         # Off-diag cases must always be run.
         for cases in self.hessian_offdiag_case.values():
             for case in cases.values():
-                for pcase in case:
-                    pcase['data'] = self._run_point(pcase['param'])
+                pcases.extend(case)
+                
+        self._run_cases(pcases)
+        if base_data is None:
+            base_data = base_case['data']
 
                     
         # Calculate Hessians - On Diagonal
@@ -376,11 +444,67 @@ class FiniteDifference(Container):
                         self.hessian[key1][key2][name]
                     
     
+    def _get_constraints(self):
+        """Returns a list of the (name, constraint) pairs that are needed."""
+        
+        constraints = []
+        if self.ineqconst_names:
+            constraints.extend(self._parent.get_ineq_constraints().items())
+        if self.eqconst_names:
+            constraints.extend(self._parent.get_eq_constraints().items())
+        return constraints
+    
+    def _run_cases(self, pcases):
+        """Runs the model at the point given by each case's 'param' entry and
+        saves the results in its 'data' entry. If `sequential` is False, the
+        points are evaluated concurrently."""
+        
+        if self.sequential or len(pcases) < 2:
+            for pcase in pcases:
+                pcase['data'] = self._run_point(pcase['param'])
+            return
+        
+        outputs = set([item.text for item in 
+                       self._parent.get_objectives().values()])
+        for key, item in self._get_constraints():
+            outputs.update([item.lhs.text, item.rhs.text])
+        outputs = sorted(outputs)
+        
+        cases = []
+        for pcase in pcases:
+            dvals = [float(val) for val in pcase['param'].values()]
+            cases.append(self._parent.set_parameters(dvals,
+                                                     Case(outputs=outputs)))
+            
+        # The point driver runs a replicate of our parent's workflow. It
+        # isn't added to the assembly, so it isn't saved with the model.
+        driver = _PointDriver(cases)
+        driver.parent = self._parent.parent
+        driver.name = '%s_fd' % self._parent.name
+        driver.workflow.add(self._parent.workflow.get_names())
+        driver.sequential = False
+        driver.reload_model = False
+        driver.extra_resources = self.extra_resources
+        driver.execute()
+        
+        for pcase, case in zip(pcases, cases):
+            if case.msg:
+                self.raise_exception('Error evaluating case %s: %s'
+                                     % (case.uuid, case.msg), RuntimeError)
+            data = {}
+            for key, item in self._parent.get_objectives().iteritems():
+                data[key] = case[item.text]
+            for key, item in self._get_constraints():
+                data[key] = _constraint_value(item, case[item.lhs.text],
+                                              case[item.rhs.text])
+            pcase['data'] = data
+            
     def _run_point(self, data_param):
         """Runs the model at a single point and captures the results. Note that 
         some differences require the baseline point."""
 
-        dvals = [float(val) for val in data_param.values()]
+        dvals = [val if isinstance(val, complex) else float(val)
+                 for val in data_param.values()]
         
         self._parent.set_parameters(dvals)
 
@@ -393,23 +517,11 @@ class FiniteDifference(Container):
         for key, item in self._parent.get_objectives().iteritems():
             data[key] = item.evaluate(self._parent.parent)
 
-        # Get Inequality Constraints
-        if self.ineqconst_names:
-            for key, item in self._parent.get_ineq_constraints().iteritems():
-                val = item.evaluate(self._parent.parent)
-                if '>' in val[2]:
-                    data[key] = val[1]-val[0]
-                else:
-                    data[key] = val[0]-val[1]
-        
-        # Get Equality Constraints
-        if self.eqconst_names:
-            for key, item in self._parent.get_eq_constraints().iteritems():
-                val = item.evaluate(self._parent.parent)
-                if '>' in val[2]:
-                    data[key] = val[1]-val[0]
-                else:
-                    data[key] = val[0]-val[1]
+        # Get Constraints
+        scope = self._parent.parent
+        for key, item in self._get_constraints():
+            data[key] = _constraint_value(item, item.lhs.evaluate(scope),
+                                          item.rhs.evaluate(scope))
         
         return data
                     
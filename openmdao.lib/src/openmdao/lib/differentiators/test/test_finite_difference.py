@@ -183,6 +183,61 @@ class FiniteDifferenceTestCase(unittest.TestCase):
         #assert_rel_error(self, hess[0][1], 4.0, .001)
         #assert_rel_error(self, hess[1][0], 4.0, .001)
         
+    def test_complex_step(self):
+        
+        self.model.driver.differentiator.form = 'complex_step'
+        # no subtraction is involved, so the step can be tiny
+        for param in self.model.driver.get_parameters().values():
+            param.fd_step = 1.e-20
+        self.model.comp.x = 1.0
+        self.model.comp.u = 1.0
+        self.model.run()
+        self.model.driver.differentiator.calc_gradient()
+        
+        # complex step derivatives are exact for this model
+        fd = self.model.driver.differentiator
+        self.assertAlmostEqual(fd.get_derivative('comp.y', wrt='comp.x'), 6.0, places=10)
+        self.assertAlmostEqual(fd.get_derivative('comp.y', wrt='comp.u'), 13.0, places=10)
+        self.assertAlmostEqual(fd.get_derivative('comp.v', wrt='comp.x'), 3.0, places=10)
+        self.assertAlmostEqual(fd.get_derivative('comp.v', wrt='comp.u'), 2.0, places=10)
+        self.assertAlmostEqual(fd.get_derivative('Con1', wrt='comp.x'), 7.0, places=10)
+        self.assertAlmostEqual(fd.get_derivative('Con1', wrt='comp.u'), 15.0, places=10)
+        self.assertAlmostEqual(fd.get_derivative('ConE', wrt='comp.u'), 16.0, places=10)
+        
+        # the model is left in a real state at the baseline point
+        self.assertEqual(self.model.comp.x, 1.0)
+        self.assertEqual(self.model.comp.y, 8.0)
+        self.assertTrue(isinstance(self.model.comp.v, float))
+        self.assertEqual(fd.base_data['comp.y'], 8.0)
+        
+        try:
+            self.model.comp.x = 1.0+1e-20j
+        except ValueError:
+            pass
+        else:
+            self.fail('ValueError expected')
+        
+    def test_concurrent(self):
+        
+        fd = self.model.driver.differentiator
+        for form in ('central', 'forward'):
+            fd.form = form
+            results = []
+            for sequential in (True, False):
+                fd.sequential = sequential
+                self.model.comp.x = 1.0
+                self.model.comp.u = 1.0
+                self.model.run()
+                fd.calc_gradient()
+                fd.calc_hessian(reuse_first=True)
+                results.append((repr(fd.gradient), repr(fd.hessian)))
+                
+            # The points were evaluated remotely, so the local model is
+            # still at the baseline point.
+            self.assertEqual(self.model.comp.x, 1.0)
+            self.assertEqual(self.model.comp.u, 1.0)
+            self.assertEqual(results[0], results[1])
+        
     def test_reset_state(self):
         
         self.model.driver.form = 'central'
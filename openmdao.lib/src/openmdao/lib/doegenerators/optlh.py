@@ -18,12 +18,13 @@
 # <http://www.gnu.org/licenses/>.
 
 import logging
-from random import randint, shuffle
+import sys
+from multiprocessing import Pool
+from random import randint, shuffle, seed as seed_random
 
 # pylint: disable-msg=E0611,F0401
 try:
-    from numpy import array, size, sum, floor, zeros
-    from numpy.linalg import norm
+    from numpy import array, floor, zeros, ones, arange, newaxis, ix_
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
@@ -84,34 +85,78 @@ class LHC_indivudal(object):
         self.p = p
         self.doe = doe
         self.phi = None # Morris-Mitchell sampling criterion
+        
+        # d**-q for each pair of points (zero on the diagonal) and the sum
+        # over all pairs, kept so that perturbed copies can be updated
+        # incrementally.
+        self._inv_dists = None
+        self._total = None
+        
+        # set by perturb() for a perturbed copy
+        self._parent = None
+        self._rows = None
+        self._new_rows = None
     
     @property
     def shape(self):
         """Size of the LatinHypercube DOE (rows,cols)."""
         return self.doe.shape
     
+    def _row_inv_dists(self, rows):
+        """Returns d**-q between the points in `rows` and all of the points,
+        with zeros where a point is paired with itself."""
+        diffs = abs(self.doe[rows][:, newaxis, :] - self.doe[newaxis, :, :])
+        if self.p == 1:
+            dists = diffs.sum(axis=2)
+        else:
+            dists = (diffs**self.p).sum(axis=2)**(1.0/self.p)
+        dists[arange(len(rows)), rows] = 1.
+        inv = dists**(-self.q)
+        inv[arange(len(rows)), rows] = 0.
+        return inv
+    
+    def _get_inv_dists(self):
+        """Returns the matrix of d**-q for each pair of points, computing
+        it if necessary."""
+        if self._inv_dists is None:
+            if self._parent is None or self._parent._inv_dists is None:
+                n = self.doe.shape[0]
+                self._inv_dists = self._row_inv_dists(arange(n))
+                self._total = self._inv_dists.sum()/2.
+            else:
+                self.mmphi()
+                inv = self._parent._inv_dists.copy()
+                inv[self._rows, :] = self._new_rows
+                inv[:, self._rows] = self._new_rows.T
+                self._inv_dists = inv
+            self._parent = None
+            self._new_rows = None
+        return self._inv_dists
+    
     def mmphi(self):
         """Returns the Morris-Mitchell sampling criterion for this Latin hypercube."""
 
         if self.phi is None:
-            n,m = self.doe.shape
-            distdict = {}
-            
-            #calculate the norm between each pair of points in the DOE
-            # TODO: This norm takes up the majority of the computation time. It
-            # should be converted to C or ShedSkin.
-            arr = self.doe
-            for i in range(n):
-                for j in range(i+1, n):
-                    nrm = norm(arr[i]-arr[j], ord=self.p)
-                    distdict[nrm] = distdict.get(nrm, 0) + 1
-    
-            distinct_d = array(distdict.keys())
-            
-            #mutltiplicity array with a count of how many pairs of points have a given distance
-            J = array(distdict.values())
+            parent = self._parent
+            if parent is not None and parent._inv_dists is not None:
+                # Only the distances to the points that were changed by
+                # perturb() need to be recomputed.
+                rows = self._rows
+                old = parent._inv_dists
+                self._new_rows = self._row_inv_dists(rows)
+                removed = old[rows].sum() - old[ix_(rows, rows)].sum()/2.
+                added = self._new_rows.sum() - self._new_rows[:, rows].sum()/2.
+                self._total = parent._total - removed + added
+                if self._total < 1.e-3*removed:
+                    # Too many digits were lost to cancellation, so sum the
+                    # unchanged pairs directly.
+                    keep = ones(len(old), dtype=bool)
+                    keep[rows] = False
+                    self._total = old[ix_(keep, keep)].sum()/2. + added
+            else:
+                self._get_inv_dists()
             
-            self.phi = sum(J*(distinct_d**(-self.q)))**(1.0/self.q)
+            self.phi = self._total**(1.0/self.q)
         
         return self.phi
     
@@ -122,6 +167,7 @@ class LHC_indivudal(object):
         """
         new_doe = self.doe.copy()
         n,k = self.doe.shape
+        rows = set()
         for count in range(mutation_count): 
             col = randint(0, k-1)
             
@@ -133,8 +179,13 @@ class LHC_indivudal(object):
            
             new_doe[el1, col] = self.doe[el2, col]
             new_doe[el2, col] = self.doe[el1, col] 
+            rows.update((el1, el2))
                
-        return LHC_indivudal(new_doe, self.q, self.p)
+        new_lhc = LHC_indivudal(new_doe, self.q, self.p)
+        new_lhc._parent = self
+        new_lhc._rows = array(sorted(rows))
+        self._get_inv_dists()
+        return new_lhc
     
     def __iter__(self):
         return self._get_rows()
@@ -201,6 +252,9 @@ class OptLatinHypercube(Container):
         desc="Number of generations the optimization will evolve over.")
     norm_method = Enum(["1-norm","2-norm"],
                     desc="Vector norm calculation method. '1-norm' is faster but less accurate.")
+    num_procs = Int(1, low=1,
+        desc="Number of processes used to run the optimizations for the "
+             "different values of q concurrently.")
     
     def __init__(self, num_samples=None, population=None,generations=None):
         super(OptLatinHypercube,self).__init__()
@@ -219,11 +273,27 @@ class OptLatinHypercube(Container):
     
     def _get_input_values(self):
         rand_doe = rand_latin_hypercube(self.num_samples, self.num_parameters)
-        best_lhc = LHC_indivudal(rand_doe, q=1, p=_norm_map[self.norm_method])
+        p = _norm_map[self.norm_method]
+        best_lhc = LHC_indivudal(rand_doe, q=1, p=p)
+        
+        if self.num_procs > 1:
+            # each process gets its own random seed, otherwise they would
+            # all make the same perturbations
+            args = [(rand_doe, q, p, self.population, self.generations,
+                     randint(0, sys.maxint)) for q in self.qs]
+            pool = Pool(min(self.num_procs, len(self.qs)))
+            try:
+                results = pool.map(_mmlhs_process, args)
+            finally:
+                pool.close()
+                pool.join()
+            opts = [LHC_indivudal(doe, q, p) for doe, q in zip(results, self.qs)]
+        else:
+            opts = (_mmlhs(LHC_indivudal(rand_doe, q, p),
+                           self.population, self.generations)
+                    for q in self.qs)
         
-        for q in self.qs:
-            lh = LHC_indivudal(rand_doe, q, _norm_map[self.norm_method])
-            lh_opt = _mmlhs(lh, self.population, self.generations)
+        for lh_opt in opts:
             if lh_opt.mmphi() < best_lhc.mmphi():
                 best_lhc = lh_opt
 
@@ -266,8 +336,15 @@ def _mmlhs(x_start, population, generations):
     return x_best
 
 
+def _mmlhs_process(args):
+    """Runs :func:`_mmlhs` in a separate process. Returns the optimized
+    DOE array."""
+    doe, q, p, population, generations, seed = args
+    seed_random(seed)
+    return _mmlhs(LHC_indivudal(doe, q, p), population, generations).doe
+
+
 if __name__== "__main__":  # pragma no cover
-    import sys
     
     lh1 = array([[1,2,3],[3,1,2],[2,3,1]])
     assert(is_latin_hypercube(lh1))
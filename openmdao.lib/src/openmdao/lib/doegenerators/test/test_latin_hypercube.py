@@ -24,6 +24,15 @@ class TestCase(unittest.TestCase):
         self.assertTrue(is_latin_hypercube(lh_opt))
         self.assertTrue(opt_phi < phi1)
         
+    def test_perturb_mmphi(self):
+        lh = LHC_indivudal(rand_latin_hypercube(20,3), 50, 2)
+        for i in range(20):
+            lh_try = lh.perturb(3)
+            full = LHC_indivudal(lh_try.doe.copy(), 50, 2).mmphi()
+            self.assertAlmostEqual(full, lh_try.mmphi(), places=10)
+            if i % 2:
+                lh = lh_try
+        
     def test_OptLatinHypercube(self):
         olh = OptLatinHypercube()
         olh.num_samples = 10
@@ -33,6 +42,15 @@ class TestCase(unittest.TestCase):
             z[i,:] = row
         self.assertTrue(is_latin_hypercube(z))
     
+    def test_OptLatinHypercube_procs(self):
+        olh = OptLatinHypercube(num_samples=10, generations=5)
+        olh.num_parameters = 2
+        olh.num_procs = 2
+        z = zeros((olh.num_samples, olh.num_parameters))
+        for i,row in enumerate(olh):
+            z[i,:] = row
+        self.assertTrue(is_latin_hypercube(z))
+
 
 if __name__ == "__main__":
     unittest.main()
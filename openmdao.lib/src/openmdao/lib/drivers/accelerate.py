@@ -0,0 +1,94 @@
+"""
+Acceleration schemes for fixed point (Gauss-Seidel) iteration. Each one is
+given the residual r = g(x) - x of the current iterate and returns the
+increment to add to x. Plain fixed point iteration would add r itself.
+"""
+
+import logging
+# pylint: disable-msg=E0611,F0401
+try:
+    from numpy import array, dot
+    from numpy.linalg import lstsq
+except ImportError as err:
+    logging.warn("In %s: %r" % (__file__, err))
+
+#public symbols
+__all__ = ['Aitken', 'Anderson', 'make_accelerator']
+
+
+class Aitken(object):
+    """ Aitken dynamic relaxation (Irons & Tuck). The increment is the
+    residual scaled by a relaxation factor that is updated every iteration
+    from the change in the residual.
+
+    relaxation: float
+        Relaxation factor for the first iteration.
+    """
+
+    def __init__(self, relaxation=1.0):
+        self.relaxation = relaxation
+        self.omega = relaxation
+        self._last = None
+
+    def step(self, residual):
+        """ Return the increment for `residual`. """
+
+        residual = array(residual, dtype=float).flatten()
+        if self._last is not None:
+            change = residual - self._last
+            denom = dot(change, change)
+            if denom > 0.0:
+                self.omega = -self.omega*dot(self._last, change)/denom
+        self._last = residual
+        return self.omega*residual
+
+
+class Anderson(object):
+    """ Anderson mixing. The increment combines the residual with those of
+    up to `depth` previous iterations so as to minimize the linearized
+    residual.
+
+    depth: int
+        Number of previous iterations used.
+    """
+
+    def __init__(self, depth=5):
+        self.depth = depth
+        self._last_residual = None
+        self._last_step = None
+        self._dR = []
+        self._dG = []
+
+    def step(self, residual):
+        """ Return the increment for `residual`. """
+
+        residual = array(residual, dtype=float).flatten()
+        if self._last_residual is not None:
+            dR = residual - self._last_residual
+            self._dR.append(dR)
+            self._dG.append(self._last_step + dR)
+            if len(self._dR) > self.depth:
+                del self._dR[0]
+                del self._dG[0]
+
+        increment = residual
+        if self._dR:
+            dR = array(self._dR).T
+            gamma = lstsq(dR, residual, rcond=-1)[0]
+            increment = residual - dot(array(self._dG).T, gamma)
+
+        self._last_residual = residual
+        self._last_step = increment
+        return increment
+
+
+def make_accelerator(driver):
+    """ Return a new accelerator for `driver` based on its `acceleration`,
+    `relaxation` and `anderson_depth` inputs, or None for plain
+    iteration. """
+
+    if driver.acceleration == 'aitken':
+        return Aitken(driver.relaxation)
+    elif driver.acceleration == 'anderson':
+        return Anderson(driver.anderson_depth)
+    return None
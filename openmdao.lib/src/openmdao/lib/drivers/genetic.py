@@ -16,9 +16,10 @@ from pyevolve import G1DList, GAllele, GenomeBase, Scaling
 from pyevolve import GSimpleGA, Selectors, Initializators, Mutators, Consts
 
 # pylint: disable-msg=E0611,F0401
-from openmdao.main.datatypes.api import Python, Enum, Float, Int, Bool, Slot
+from openmdao.main.datatypes.api import Python, Enum, Float, Int, Bool, Slot, \
+                                        Dict
 
-from openmdao.main.api import Driver 
+from openmdao.main.api import Driver, Case
 from openmdao.main.hasparameters import HasParameters
 from openmdao.main.hasobjective import HasObjective
 from openmdao.main.hasevents import HasEvents
@@ -26,6 +27,8 @@ from openmdao.main.interfaces import IHasParameters, IHasObjective, \
                                      implements, IOptimizer
 from openmdao.util.decorators import add_delegate
 from openmdao.util.typegroups import real_types, int_types, iterable_types
+from openmdao.lib.casehandlers.api import ListCaseIterator
+from openmdao.lib.drivers.caseiterdriver import CaseIteratorDriver
 
 array_test = re.compile("(\[[0-9]+\])+$")
 
@@ -82,6 +85,21 @@ class Genetic(Driver):
                     "for repeatable results; otherwise leave as None for truly "
                     "random seeding.")
     
+    sequential = Bool(True, iotype="in",
+                      desc="If False, the new members of each generation are "
+                           "evaluated concurrently on servers obtained from "
+                           "the ResourceAllocationManager.")
+    
+    extra_resources = Dict(iotype="in",
+                           desc="Extra resource requirements for concurrent "
+                                "evaluation (unusual).")
+    
+    def __init__(self, *args, **kwargs):
+        super(Genetic, self).__init__(*args, **kwargs)
+        self._scores = {}   # objective value keyed by chromosome
+        self._pending = []  # genomes waiting for concurrent evaluation
+        self._recorded = None  # last generation recorded
+    
     def _make_alleles(self): 
         """ Returns a GAllelle.Galleles instance with alleles corresponding to 
         the parameters specified by the user"""
@@ -123,12 +141,21 @@ class Genetic(Driver):
 
         alleles = self._make_alleles()
         
+        self._scores = {}
+        self._pending = []
+        self._recorded = None
+        
         genome = G1DList.G1DList(len(alleles))
         genome.setParams(allele=alleles)
-        genome.evaluator.set(self._run_model)
+        genome.evaluator.set(self._evaluate)
         
         genome.mutator.set(Mutators.G1DListMutatorAllele)
         genome.initializator.set(Initializators.G1DListInitializatorAllele)
+        if not self.sequential:
+            # Every new genome is initialized or mutated before it is
+            # evaluated, so queue them up to evaluate them all at once.
+            genome.mutator.add(self._queue_genome)
+            genome.initializator.add(self._queue_genome)
         #TODO: fix tournament size settings        
         #genome.setParams(tournamentPool=self.tournament_size)
         
@@ -153,19 +180,93 @@ class Genetic(Driver):
         #setting the selector for the algorithm
         ga.selector.set(self._selection_mapping[self.selection_method])
         
+        # record each generation
+        ga.stepCallback.set(self._record_generation)
+        
         #GO
         ga.evolve(freq_stats=0)
+        
+        # The final generation has already been recorded if a termination
+        # criterion stopped the evolution.
+        self._record_generation(ga)
 
         self.best_individual = ga.bestIndividual()
         
         #run it once to get the model into the optimal state
         self._run_model(self.best_individual) 
         
-        # TODO - We really need to be able to record the best candidate from each
-        # generation, but that will only be possible if we let OpenMDAO drive
-        # the optimization. For now, just print out the final best individual state.
         self.record_case()
         
+    def _evaluate(self, chromosome):
+        """Returns the objective value for `chromosome`. Chromosomes that
+        have already been evaluated aren't run again."""
+        key = tuple(chromosome)
+        if key not in self._scores:
+            if self.sequential:
+                self._scores[key] = self._run_model(chromosome)
+            else:
+                self._pending.append(chromosome)
+                self._run_pending()
+        return self._scores[key]
+        
+    def _queue_genome(self, genome, **args):
+        """Queues `genome` for concurrent evaluation. This is added to the
+        genome's mutators and initializators, so it returns zero mutations."""
+        self._pending.append(genome)
+        return 0
+        
+    def _run_pending(self):
+        """Evaluates the queued chromosomes concurrently."""
+        keys = []
+        for chromosome in self._pending:
+            key = tuple(chromosome)
+            if key not in self._scores and key not in keys:
+                keys.append(key)
+        self._pending = []
+        
+        objective = self.get_objectives().values()[0].text
+        cases = [self.set_parameters(list(key), Case(outputs=[objective]))
+                 for key in keys]
+        
+        # The case driver runs a replicate of our workflow. It isn't added
+        # to the assembly, so it isn't saved with the model.
+        driver = CaseIteratorDriver()
+        driver.parent = self.parent
+        driver.name = '%s_cases' % self.name
+        driver.workflow.add(self.workflow.get_names())
+        driver.iterator = ListCaseIterator(cases)
+        driver.sequential = False
+        driver.reload_model = False
+        driver.extra_resources = self.extra_resources
+        driver.execute()
+        
+        for key, case in zip(keys, cases):
+            if case.msg:
+                self.raise_exception('Error evaluating case %s: %s'
+                                     % (case.uuid, case.msg), RuntimeError)
+            self._scores[key] = case[objective]
+        
+    def _record_generation(self, ga_engine):
+        """Records each individual of the current generation in all
+        slotted case recorders, unless that generation has already been
+        recorded. Returns False so that pyevolve continues the evolution."""
+        generation = ga_engine.getCurrentGeneration()
+        if self.recorders and generation != self._recorded:
+            self._recorded = generation
+            names = []
+            for name in self.get_parameters().keys():
+                if isinstance(name, tuple):
+                    name = name[0]
+                names.append(name)
+            label = 'generation %d' % generation
+            for individual in ga_engine.getPopulation():
+                key = tuple(individual)
+                case = Case(zip(names, key), [("Objective", self._scores[key])],
+                            label=label, parent_uuid=self._case_id)
+                for recorder in self.recorders:
+                    recorder.record(case)
+        return False
+        
     def _run_model(self, chromosome):
         self.set_parameters([val for val in chromosome])
         self.run_iteration()
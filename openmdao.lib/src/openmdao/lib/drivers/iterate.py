@@ -13,6 +13,7 @@ except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
 from openmdao.lib.datatypes.api import Float, Int, Bool, Enum
+from openmdao.lib.drivers.accelerate import make_accelerator
 from openmdao.main.api import Driver
 from openmdao.util.decorators import add_delegate, stub_if_missing_deps
 from openmdao.main.hasstopcond import HasStopConditions
@@ -43,6 +44,19 @@ class FixedPointIterator(Driver):
                        desc='For multivariable iteration, type of norm '
                                    'to use to test convergence.')
 
+    acceleration = Enum('none', ['none', 'aitken', 'anderson'], iotype='in',
+                        desc='Acceleration scheme: none (plain fixed point '
+                             'iteration), aitken (dynamic relaxation) or '
+                             'anderson (mixing).')
+
+    relaxation = Float(1.0, iotype='in',
+                       desc='Initial relaxation factor for Aitken '
+                            'acceleration.')
+
+    anderson_depth = Int(5, iotype='in', low=1,
+                         desc='Number of previous iterations used by '
+                              'Anderson acceleration.')
+
 
     def __init__(self):
         super(FixedPointIterator, self).__init__()
@@ -76,6 +90,8 @@ class FixedPointIterator(Driver):
         else:
             order = 2
 
+        accelerator = make_accelerator(self)
+
         unconverged = True
         while unconverged:
 
@@ -91,7 +107,10 @@ class FixedPointIterator(Driver):
                 return
                 
             # Pass output to input
-            val0 += history[self.current_iteration, :]
+            if accelerator is None:
+                val0 += history[self.current_iteration, :]
+            else:
+                val0 += accelerator.step(history[self.current_iteration, :])
             self.set_parameters(val0)
 
             # run the workflow
@@ -3,6 +3,16 @@ This solver can converge an MDA that contains a cyclic graph without requiring
 the user to break connections and specify independent and dependent variables.
 Set "newton" to True to use Newton-Krylov, otherwise, set "newton" to False to
 use Gauses-Siedel (aka fixed-point iteration).
+
+For Newton, "linear_solver" picks how each linear system is solved: 'gmres'
+(matrix-free unless a preconditioner is requested) or 'direct', which
+assembles the Jacobian as a sparse matrix and solves it with an LU
+factorization. Factorizations are reused across Newton steps while the
+Jacobian changes by less than "refactor_tolerance".
+
+Gauss-Seidel can be accelerated with Aitken dynamic relaxation or Anderson
+mixing (see "acceleration"). The residual vector of each iteration is kept
+in "history".
 """
 
 # pylint: disable-msg=C0103
@@ -14,13 +24,14 @@ import logging
 
 try:
     import numpy
-    from scipy.sparse.linalg import gmres, LinearOperator
+    from scipy.sparse.linalg import gmres, LinearOperator, splu, spilu
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
 # pylint: disable-msg=E0611, F0401
 from openmdao.main.api import Driver, CyclicWorkflow   
-from openmdao.main.datatypes.api import Float, Int, Bool
+from openmdao.main.datatypes.api import Float, Int, Bool, Enum
+from openmdao.lib.drivers.accelerate import make_accelerator
 from openmdao.util.decorators import stub_if_missing_deps
 
 
@@ -34,11 +45,50 @@ class MDASolver(Driver):
     newton = Bool(False, iotype='in', desc='Set to True to use a ' + \
                     'Newton-Krylov method. Defaults to False for ' + \
                     'Gauss-Siedel.')
-    
+
+    linear_solver = Enum('gmres', ['gmres', 'direct'], iotype='in',
+                         desc="Newton's linear solver: 'gmres' or 'direct' "
+                              "(sparse LU of the assembled Jacobian).")
+
+    preconditioner = Enum('none', ['none', 'ilu'], iotype='in',
+                          desc='Preconditioner for gmres. ilu uses an '
+                               'incomplete LU factorization of the '
+                               'assembled Jacobian.')
+
+    gmres_maxiter = Int(100, iotype='in', low=1,
+                        desc='Maximum number of gmres iterations per '
+                             'Newton step.')
+
+    refactor_tolerance = Float(0.0, iotype='in', low=0.0,
+                               desc='Reuse the previous (I)LU factorization '
+                                    'while the relative change in the '
+                                    'assembled Jacobian is below this. Zero '
+                                    'refactors at every Newton step.')
+
+    acceleration = Enum('none', ['none', 'aitken', 'anderson'], iotype='in',
+                        desc='Acceleration scheme for Gauss-Seidel: none, '
+                             'aitken (dynamic relaxation) or anderson '
+                             '(mixing).')
+
+    relaxation = Float(1.0, iotype='in',
+                       desc='Initial relaxation factor for Aitken '
+                            'acceleration.')
+
+    anderson_depth = Int(5, iotype='in', low=1,
+                         desc='Number of previous iterations used by '
+                              'Anderson acceleration.')
+
+    factorizations = Int(0, iotype='out',
+                         desc='Number of (I)LU factorizations performed '
+                              'by the last Newton solve.')
+
     def __init__(self):
         
         super(MDASolver, self).__init__()
         self.workflow = CyclicWorkflow()
+        self._jacobian = None
+        self._factor = None
+        self.history = numpy.zeros(0)
         
     def check_config(self):
         """ This solver requires a CyclicWorkflow. """
@@ -61,34 +111,53 @@ class MDASolver(Driver):
         """ Solver execution loop: fixed point iteration. """
         
         # Find dimension of our problem.
-        self.workflow.initialize_residual()
+        nEdge = self.workflow.initialize_residual()
         
         # Initial Run
         self.run_iteration()
         
         # Initial residuals
-        norm = numpy.linalg.norm(self.workflow.calculate_residuals())
+        residuals = self.workflow.calculate_residuals()
+        history = [residuals.flatten()]
+        norm = numpy.linalg.norm(residuals)
         print "Residual vector norm:\n", norm
         
+        # Acceleration operates on the part of the residual vector
+        # belonging to the severed edges.
+        accelerator = make_accelerator(self)
+        if accelerator is not None:
+            bounds = self.workflow.bounds
+            severed = [i for edge in self.workflow._severed_edges
+                         for i in range(*bounds[edge])]
+            dv = numpy.zeros(nEdge)
+        
         # Loop until the residuals converge
         iter_num = 0
         while (norm > self.tolerance) and (iter_num < self.max_iteration):
             
-            # Pull values across severed edges
-            for edge in self.workflow._severed_edges:
-                src, target = edge
-                self.parent.set(target, self.parent.get(src), force=True)
+            if accelerator is None:
+                # Pull values across severed edges
+                for edge in self.workflow._severed_edges:
+                    src, target = edge
+                    self.parent.set(target, self.parent.get(src), force=True)
+            else:
+                dv[severed] = accelerator.step(residuals[severed])
+                self.workflow.set_new_state(dv)
             
             # Run all components
             self.run_iteration()
             
             # New residuals
-            norm = numpy.linalg.norm(self.workflow.calculate_residuals())
+            residuals = self.workflow.calculate_residuals()
+            history.append(residuals.flatten())
+            norm = numpy.linalg.norm(residuals)
             print "Residual vector norm:\n", norm
             
             iter_num += 1
             self.record_case()
             
+        self.history = numpy.array(history)
+            
     def execute_Newton(self):
         """ Solver execution loop: Newton-Krylov. """
         
@@ -98,12 +167,17 @@ class MDASolver(Driver):
         A = LinearOperator((nEdge, nEdge),
                            matvec=self.workflow.matvecFWD,
                            dtype=float)
+        self._jacobian = None
+        self._factor = None
+        self.factorizations = 0
             
         # Initial Run
         self.run_iteration()
         
         # Initial residuals
-        norm = numpy.linalg.norm(self.workflow.calculate_residuals())
+        residuals = self.workflow.calculate_residuals()
+        history = [residuals.flatten()]
+        norm = numpy.linalg.norm(residuals)
         print "Residual vector norm:\n", norm
         
         # Loop until convergence of residuals
@@ -114,10 +188,21 @@ class MDASolver(Driver):
             # point. (i.e., linearizes)
             self.workflow.calc_derivatives(first=True)
             
-            # Call GMRES to solve the linear system
-            dv, info = gmres(A, -self.workflow.res,
-                             tol=self.tolerance,
-                             maxiter=100)
+            if self.linear_solver == 'direct':
+                factor = self._get_factor(splu)
+                dv = factor.solve(-self.workflow.res.flatten())
+            else:
+                if self.preconditioner == 'ilu':
+                    factor = self._get_factor(spilu)
+                    M = LinearOperator((nEdge, nEdge), matvec=factor.solve,
+                                       dtype=float)
+                else:
+                    M = None
+
+                # Call GMRES to solve the linear system
+                dv, info = gmres(A, -self.workflow.res,
+                                 tol=self.tolerance,
+                                 maxiter=self.gmres_maxiter, M=M)
             
             # Increment the model input edges by dv
             self.workflow.set_new_state(dv)
@@ -126,11 +211,30 @@ class MDASolver(Driver):
             self.run_iteration()
             
             # New residuals
-            norm = numpy.linalg.norm(self.workflow.calculate_residuals())
+            residuals = self.workflow.calculate_residuals()
+            history.append(residuals.flatten())
+            norm = numpy.linalg.norm(residuals)
             print "Residual vector norm:\n", norm
             
             iter_num += 1
             self.record_case()
             
+        self.history = numpy.array(history)
+
+    def _get_factor(self, factorize):
+        """ Return a factorization of the assembled Jacobian, reusing the
+        last one if the Jacobian hasn't changed by more than
+        refactor_tolerance. """
+        
+        jacobian = self.workflow.assemble_jacobian()
+        
+        if self._factor is not None and self.refactor_tolerance > 0.0:
+            change = numpy.linalg.norm((jacobian - self._jacobian).data)
+            if change <= self.refactor_tolerance * \
+                         numpy.linalg.norm(self._jacobian.data):
+                return self._factor
             
-            
\ No newline at end of file
+        self._jacobian = jacobian
+        self._factor = factorize(jacobian)
+        self.factorizations += 1
+        return self._factor
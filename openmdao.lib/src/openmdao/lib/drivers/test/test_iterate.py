@@ -71,6 +71,17 @@ class Multi(Component):
         self.out1 = self.in1/10.0
         self.out2 = self.in2/10.0
 
+class Contraction(Component):
+    """Testing acceleration: slowly converging coupled linear iteration"""
+    in1 = Float(0.0, iotype="in")
+    in2 = Float(0.0, iotype="in")
+    out1 = Float(0, iotype="out")
+    out2 = Float(0, iotype="out")
+    
+    def execute(self):
+        self.out1 = 0.9*self.in1 + 0.05*self.in2 + 1.0
+        self.out2 = -0.3*self.in1 + 0.8*self.in2 + 2.0
+
 class FixedPointIteratorTestCase(unittest.TestCase):
     """test FixedPointIterator component"""
 
@@ -109,6 +120,38 @@ class FixedPointIteratorTestCase(unittest.TestCase):
         assert_rel_error(self, self.top.simple.out1, .001, .0002)
         self.assertEqual(self.top.driver.current_iteration, 2)
             
+    def _run_contraction(self, acceleration):
+        self.top.add("driver", FixedPointIterator())
+        self.top.add("simple", Contraction())
+        self.top.driver.workflow.add('simple')
+        
+        self.top.driver.add_constraint('simple.out1 = simple.in1')
+        self.top.driver.add_constraint('simple.out2 = simple.in2')
+        self.top.driver.add_parameter('simple.in1', -9e99, 9e99)
+        self.top.driver.add_parameter('simple.in2', -9e99, 9e99)
+        self.top.driver.tolerance = 1.0e-8
+        self.top.driver.max_iteration = 500
+        self.top.driver.acceleration = acceleration
+        self.top.run()
+        
+        # Fixed point of the linear map.
+        assert_rel_error(self, self.top.simple.in1, 60.0/7.0, 1.0e-6)
+        assert_rel_error(self, self.top.simple.in2, -20.0/7.0, 1.0e-6)
+        history = self.top.driver.history
+        self.assertEqual(history.shape,
+                         (self.top.driver.current_iteration+1, 2))
+        self.assertTrue(abs(history[-1]).max() < 1.0e-8)
+        return self.top.driver.current_iteration
+        
+    def test_acceleration(self):
+        plain = self._run_contraction('none')
+        self.setUp()
+        aitken = self._run_contraction('aitken')
+        self.setUp()
+        anderson = self._run_contraction('anderson')
+        self.assertTrue(aitken < plain/1.5)
+        self.assertTrue(anderson < 10)
+            
     def test_maxiteration(self):
         self.top.add("driver", FixedPointIterator())
         self.top.add("simple", Simple1())
@@ -4,6 +4,7 @@ Test the MDA driver
 
 import unittest
 import numpy
+from scipy.sparse.linalg import LinearOperator
 
 # pylint: disable-msg=F0401,E0611
 from openmdao.lib.drivers.mda_solver import MDASolver
@@ -75,6 +76,24 @@ class SLSPQdriverTestCase(unittest.TestCase):
                                1.0e-4)
         self.assertTrue(self.top.d1.exec_count < 10)
         
+    def test_gauss_seidel_accelerated(self):
+        
+        for acceleration in ('aitken', 'anderson'):
+            self.setUp()
+            self.top.driver.acceleration = acceleration
+            self.top.run()
+            
+            assert_rel_error(self, self.top.d1.y1,
+                                   self.top.d2.y1,
+                                   1.0e-4)
+            assert_rel_error(self, self.top.d1.y2,
+                                   self.top.d2.y2,
+                                   1.0e-4)
+            self.assertTrue(self.top.d1.exec_count < 10)
+            history = self.top.driver.history
+            self.assertEqual(history.shape[1], 2)
+            self.assertTrue(history.shape[0] < 10)
+        
     def test_newton(self):
         
         self.top.driver.newton = True
@@ -89,6 +108,95 @@ class SLSPQdriverTestCase(unittest.TestCase):
         print self.top.d1.exec_count
         self.assertTrue(self.top.d1.exec_count < 6)
         
+    def test_newton_direct(self):
+        
+        self.top.driver.newton = True
+        self.top.driver.linear_solver = 'direct'
+        self.top.run()
+        
+        assert_rel_error(self, self.top.d1.y1,
+                               self.top.d2.y1,
+                               1.0e-4)
+        assert_rel_error(self, self.top.d1.y2,
+                               self.top.d2.y2,
+                               1.0e-4)
+        self.assertTrue(self.top.d1.exec_count < 6)
+        self.assertEqual(self.top.driver.factorizations,
+                         self.top.d1.exec_count-1)
+        
+        # The count starts over with each run.
+        self.top.d1.z1 = 4.0
+        self.top.d2.z1 = 4.0
+        count = self.top.d1.exec_count
+        self.top.run()
+        self.assertEqual(self.top.driver.factorizations,
+                         self.top.d1.exec_count-count-1)
+        
+    def test_newton_reuse_factorization(self):
+        
+        self.top.driver.newton = True
+        self.top.driver.linear_solver = 'direct'
+        self.top.driver.refactor_tolerance = 0.5
+        self.top.run()
+        
+        assert_rel_error(self, self.top.d1.y1,
+                               self.top.d2.y1,
+                               1.0e-4)
+        assert_rel_error(self, self.top.d1.y2,
+                               self.top.d2.y2,
+                               1.0e-4)
+        self.assertTrue(self.top.driver.factorizations <
+                        self.top.d1.exec_count-1)
+        
+    def test_newton_ilu(self):
+        
+        self.top.driver.newton = True
+        self.top.driver.preconditioner = 'ilu'
+        self.top.run()
+        
+        assert_rel_error(self, self.top.d1.y1,
+                               self.top.d2.y1,
+                               1.0e-4)
+        assert_rel_error(self, self.top.d1.y2,
+                               self.top.d2.y2,
+                               1.0e-4)
+        self.assertTrue(self.top.d1.exec_count < 6)
+        
+    def test_assembled_jacobian(self):
+        
+        # The assembled matrix must match the matrix-free product.
+        self.top = set_as_top(Scalable_MDA())
+        self.top.run()
+        workflow = self.top.driver.workflow
+        workflow.calc_derivatives(first=True)
+        num = workflow.initialize_residual()
+        
+        jacobian = workflow.assemble_jacobian().todense()
+        for i in range(num):
+            unit = numpy.zeros(num)
+            unit[i] = 1.0
+            column = workflow.matvecFWD(unit)
+            for j in range(num):
+                self.assertAlmostEqual(jacobian[j, i], column[j], 12)
+        
+    def test_matmat(self):
+        
+        # Products that keep several results, like LinearOperator.matmat,
+        # must also match the assembled matrix.
+        self.top = set_as_top(Scalable_MDA())
+        self.top.run()
+        workflow = self.top.driver.workflow
+        workflow.calc_derivatives(first=True)
+        num = workflow.initialize_residual()
+        
+        operator = LinearOperator((num, num), matvec=workflow.matvecFWD,
+                                  dtype=float)
+        product = operator.matmat(numpy.eye(num))
+        jacobian = workflow.assemble_jacobian().todense()
+        for i in range(num):
+            for j in range(num):
+                self.assertAlmostEqual(jacobian[j, i], product[j, i], 12)
+        
     def test_scalable_newton(self):
         
         # This verifies that it works for arrays
@@ -117,6 +225,27 @@ class SLSPQdriverTestCase(unittest.TestCase):
         print self.top.d1.exec_count
         self.assertTrue(self.top.d1.exec_count < 4)
         
+    def test_scalable_newton_direct(self):
+        
+        self.top = set_as_top(Scalable_MDA())
+        self.top.driver.linear_solver = 'direct'
+        
+        self.top.d1.x = self.top.d2.x = numpy.array([[3.0], [-1.5]])
+        self.top.d1.z = self.top.d2.z = numpy.array([[-1.3], [2.45]])
+        self.top.d1.C_y = numpy.array([[1.1, 1.3], [1.05, 1.13]])
+        self.top.d2.C_y = numpy.array([[0.95, 0.98], [0.97, 0.95]])        
+
+        self.top.run()
+        
+        for i in range(2):
+            assert_rel_error(self, self.top.d1.y_out[i],
+                                   self.top.d2.y_in[i],
+                                   1.0e-4)
+            assert_rel_error(self, self.top.d2.y_out[i],
+                                   self.top.d1.y_in[i],
+                                   1.0e-4)
+        self.assertTrue(self.top.d1.exec_count < 4)
+        
         
             
 if __name__ == "__main__":
@@ -14,6 +14,7 @@ from pyevolve import Selectors
 
 from openmdao.main.api import Assembly, Component, set_as_top
 from openmdao.lib.drivers.genetic import Genetic
+from openmdao.lib.casehandlers.api import ListCaseRecorder
 from openmdao.main.eggchecker import check_save_load
 
 # pylint: disable-msg=E1101
@@ -157,6 +158,104 @@ class TestCase(unittest.TestCase):
         self.assertEqual(y, 0)
         self.assertEqual(z, 0)
 
+    def test_memo_and_recording(self):
+        self.top.add('comp', SphereFunction())
+        self.top.driver.workflow.add('comp')
+        self.top.driver.add_objective("comp.total")
+
+        self.top.driver.add_parameter('comp.x')
+        self.top.driver.add_parameter('comp.y')
+        self.top.driver.add_parameter('comp.z')
+
+        self.top.driver.generations = 3
+        self.top.driver.recorders = [ListCaseRecorder()]
+        self.top.comp.force_execute = True
+
+        # Record each chromosome the model is run with.
+        driver = self.top.driver
+        run_keys = []
+        run_model = driver._run_model
+        def _run_model(chromosome):
+            run_keys.append(tuple(chromosome))
+            return run_model(chromosome)
+        driver._run_model = _run_model
+
+        self.top.run()
+
+        # duplicate chromosomes aren't run again. The model is run once
+        # per unique chromosome, plus once more for the best one.
+        scores = driver._scores
+        self.assertEqual(len(set(run_keys[:-1])), len(run_keys)-1)
+        self.assertEqual(set(run_keys[:-1]), set(scores.keys()))
+        self.assertEqual(self.top.comp.exec_count, len(scores)+1)
+        self.assertTrue(len(scores) <
+                        driver.population_size*(driver.generations+1))
+
+        # A repeated chromosome gets its cached score without a run.
+        key = run_keys[0]
+        count = self.top.comp.exec_count
+        self.assertEqual(driver._evaluate(list(key)),
+                         key[0]**2+key[1]**2+key[2]**2)
+        self.assertEqual(self.top.comp.exec_count, count)
+        self.assertEqual(len(run_keys), len(scores)+1)
+
+        # Every individual of each generation is recorded once, followed
+        # by the final case.
+        cases = list(self.top.driver.recorders[0].get_iterator())
+        size = driver.population_size
+        self.assertEqual(len(cases), size*(driver.generations+1)+1)
+        for i in range(driver.generations+1):
+            self.assertEqual([case.label for case in cases[i*size:(i+1)*size]],
+                             ['generation %d' % i]*size)
+        for case in cases[:-1]:
+            key = (case['comp.x'], case['comp.y'], case['comp.z'])
+            self.assertEqual(case['Objective'], scores[key])
+        self.assertTrue(self.top.driver.best_individual.score in 
+                        [case['Objective'] for case in cases[-size-1:-1]])
+        
+        # A generation that has been recorded isn't recorded again.
+        class Engine(object):
+            def __init__(self, generation):
+                self.generation = generation
+            def getCurrentGeneration(self):
+                return self.generation
+            def getPopulation(self):
+                return [list(key)]
+        driver._record_generation(Engine(driver.generations))
+        self.assertEqual(len(driver.recorders[0].get_iterator()), len(cases))
+        driver._record_generation(Engine(driver.generations+1))
+        self.assertEqual(len(driver.recorders[0].get_iterator()), len(cases)+1)
+
+    def test_concurrent(self):
+        self.top.add('comp', SphereFunction())
+        self.top.driver.workflow.add('comp')
+        self.top.driver.add_objective("comp.total")
+
+        self.top.driver.add_parameter('comp.x')
+        self.top.driver.add_parameter('comp.y')
+        self.top.driver.add_parameter('comp.z')
+
+        self.top.driver.mutation_rate = .02
+        self.top.driver.generations = 1
+        self.top.driver.sequential = False
+
+        self.top.run()
+
+        self.assertAlmostEqual(self.top.driver.best_individual.score,
+                               .02,places = 1)
+        x,y,z = [x for x in self.top.driver.best_individual] 
+        self.assertAlmostEqual(x, 0.135, places = 2)
+        self.assertEqual(y, 0)
+        self.assertEqual(z, 0)
+        
+        # The chromosomes were evaluated remotely, the local model only
+        # ran for the best one.
+        self.assertEqual(self.top.comp.exec_count, 1)
+        scores = self.top.driver._scores
+        self.assertTrue(len(scores) > self.top.driver.population_size)
+        for key, score in scores.items():
+            self.assertEqual(score, key[0]**2+key[1]**2+key[2]**2)
+
     def test_optimizeSpherearray(self):
         self.top.add('comp', SphereFunctionArray())
         self.top.driver.workflow.add('comp')
@@ -80,6 +80,20 @@ class Discipline(Component):
                 result[key] += self.Jz.dot(arg['z'])
                               
         return
+
+    def apply_derivT(self, arg, result):
+        """Multiply an input vector by the transposed Jacobian"""
+
+        for key in arg:
+
+            if 'x' in result:
+                result['x'] += self.Jx.T.dot(arg[key]).reshape(result['x'].shape)
+            if 'y_in' in result:
+                result['y_in'] += self.Jy.T.dot(arg[key]).reshape(result['y_in'].shape)
+            if 'z' in result:
+                result['z'] += self.Jz.T.dot(arg[key]).reshape(result['z'].shape)
+
+        return
     
     
 class UnitScalableProblem(OptProblem):         
@@ -199,6 +199,18 @@ class Discipline2_WithDerivatives(Component):
                 result[key] += self.J[0, 1]*arg['z1']
             if 'z2' in arg:
                 result[key] += self.J[0, 2]*arg['z2']
+
+    def apply_derivT(self, arg, result):
+        """Multiply an input vector by the transposed Jacobian"""
+
+        for key in arg:
+
+            if 'y1' in result:
+                result['y1'] += self.J[0, 0]*arg[key]
+            if 'z1' in result:
+                result['z1'] += self.J[0, 1]*arg[key]
+            if 'z2' in result:
+                result['z2'] += self.J[0, 2]*arg[key]
                 
 
            
@@ -0,0 +1,67 @@
+"""
+Measure the time spent running a chain of the scalable problem's
+disciplines, comparing data transfer through the Assembly's precompiled
+transfer plans against evaluating the connection expressions.
+"""
+
+import sys
+import time
+
+from numpy import zeros
+
+from openmdao.main.api import Assembly, set_as_top
+from openmdao.main.datatypes.api import Array, Float
+from openmdao.lib.optproblems.scalable import Discipline
+
+
+def build_model(n_disciplines, prob_size, fast):
+    """ Return an assembly with `n_disciplines` coupled in a chain. """
+    top = set_as_top(Assembly())
+    top.fast_transfer = fast
+    top.add('z', Array(zeros((prob_size, 1)), iotype='in',
+                       shape=(prob_size, 1)))
+    top.add('c_y_out', Float(1.0, iotype='in'))
+    names = []
+    for i in range(n_disciplines):
+        name = 'd%d' % i
+        top.add(name, Discipline(prob_size))
+        top.connect('z', '%s.z' % name)
+        top.connect('c_y_out', '%s.c_y_out' % name)
+        if names:
+            top.connect('%s.y_out' % names[-1], '%s.y_in' % name)
+        names.append(name)
+    top.driver.workflow.add(names)
+    return top
+
+
+def run_test(top, reps):
+    """ Return seconds per run of `top`, changing `z` each time. """
+    top.run()
+    start = time.time()
+    for i in xrange(reps):
+        top.z = top.z + 1.
+        top.run()
+    return (time.time() - start) / reps
+
+
+def main(reps=200):
+    """ Run overhead tests for a few model sizes. """
+    print '%-12s %10s %12s %12s %8s' % ('disciplines', 'size', 'expr (ms)',
+                                        'plan (ms)', 'speedup')
+    for n_disciplines in (5, 20, 50):
+        for prob_size in (1, 10):
+            slow = build_model(n_disciplines, prob_size, False)
+            fast = build_model(n_disciplines, prob_size, True)
+            slow_time = run_test(slow, reps)
+            fast_time = run_test(fast, reps)
+            last = 'd%d' % (n_disciplines-1)
+            if (slow.get(last).y_out != fast.get(last).y_out).any():
+                print 'results differ!'
+                sys.exit(1)
+            print '%-12d %10d %12.3f %12.3f %8.2f' \
+                  % (n_disciplines, prob_size, slow_time*1e3, fast_time*1e3,
+                     slow_time/fast_time)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,15 @@
 """ Surrogate model based on Kriging. """
 
-from math import log, e, sqrt
+from math import log
 import logging
 
 # pylint: disable-msg=E0611,F0401
 try:
-    from numpy import array, zeros, dot, ones, arange, eye, abs, vstack, exp, diag
-    from numpy.linalg import det, linalg, lstsq
-    from scipy.linalg import cho_factor, cho_solve
-    from scipy.optimize import fmin
+    from numpy import array, zeros, dot, ones, eye, abs, vstack, hstack, exp, \
+                      diag, sqrt, prod, newaxis, triu_indices, triu, tril
+    from numpy.linalg import det, linalg, lstsq, pinv
+    from scipy.linalg import cho_factor, cho_solve, solve_triangular
+    from scipy.optimize import fmin_l_bfgs_b
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
@@ -33,6 +34,11 @@ class KrigingSurrogate(Container):
         self.thetas = None
         self.nugget = 0 #nugget smoothing parameter from [Sasena, 2002]
         
+        # bounds on log10(theta) used when maximizing the likelihood
+        self.theta_bounds = (-3., 2.)
+        # if True, retraining starts from the previously optimized thetas
+        self.warm_start = True
+        
         self.R = None
         self.R_fact = None
         self.mu = None
@@ -48,56 +54,43 @@ class KrigingSurrogate(Container):
         """Calculates a predicted value of the response based on the current
         trained model for the supplied list of inputs.
         """
+        f, RMSE = self.predict_batch([new_x])
+        return NormalDistribution(f[0], RMSE[0])
+
+    def predict_batch(self, X):
+        """Calculates the predicted mean and root mean squared error of the
+        response at each of the points in `X`, based on the current trained
+        model.
+
+        X: 2D array-like
+            Each row contains the inputs for one point.
+
+        Returns a tuple (f, RMSE) of 1D arrays.
+        """
         if self.m == None: #untrained surrogate
             raise RuntimeError("KrigingSurrogate has not been trained, so no "
                                "prediction can be made")
-        r = zeros(self.n)
-        X, Y = self.X, self.Y
+        X = array(X, dtype=float).reshape(-1, self.m)
         thetas = 10.**self.thetas
-        XX = array(X)
-        new_x = array(new_x)
-        for i in range(self.n):
-            r[i] = sum(thetas*(XX[i]-new_x)**2.)
-        r = exp(-r)
-            
-        one = ones(self.n)
+
+        # correlation of each new point (rows) with each training point
+        diff = X[:, newaxis, :] - self._X[newaxis, :, :]
+        r = exp(-dot(diff**2., thetas))
+
         if self.R_fact is not None: 
             #---CHOLESKY DECOMPOSTION ---
-            #f = self.mu+dot(r,cho_solve(self.R_fact,Y-dot(one,self.mu)))
-            #term1 = dot(r,cho_solve(self.R_fact,r))
-            #term2 = (1.0-dot(one,cho_solve(self.R_fact,r)))**2./dot(one,cho_solve(self.R_fact,one))
-            
-            rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-            R_fact = (self.R_fact[0].T,not self.R_fact[1])
-            cho = cho_solve(R_fact, rhs).T
-            
-            f = self.mu + dot(r, cho[0])
-            term1 = dot(r, cho[1])
-            term2 = (1.0 - dot(one, cho[1]))**2./dot(one, cho[2])
-            
+            Rinv_r = cho_solve(self.R_fact, r.T)
         else: 
             #-----LSTSQ-------
-            rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-            lsq = lstsq(self.R.T, rhs)[0].T
-            
-            f = self.mu + dot(r, lsq[0])
-            term1 = dot(r, lsq[1])
-            term2 = (1.0 - dot(one, lsq[1]))**2./dot(one, lsq[2])
-            """
-      #-----LSTSQ-------
-      rhs = vstack([(Y-dot(one, self.mu)), r, one]).T
-      lsq = lstsq(self.R.T, rhs)[0].T
-      
-      f = self.mu + dot(r, lsq[0])
-      term1 = dot(r, lsq[1])
-      term2 = (1.0 - dot(one, lsq[1]))**2./dot(one, lsq[2])
-      """
+            Rinv_r = lstsq(self.R, r.T)[0]
+
+        f = self.mu + dot(r, self._Rinv_Y)
+        term1 = (r.T*Rinv_r).sum(axis=0)
+        term2 = (1.0 - Rinv_r.sum(axis=0))**2./self._Rinv_one.sum()
+
         MSE = self.sig2*(1.0-term1+term2)
         RMSE = sqrt(abs(MSE))
-        
-        dist = NormalDistribution(f, RMSE)
-        return dist
-        
+        return f, RMSE
 
     def train(self,X,Y):
         """Train the surrogate model with the given set of inputs and outputs."""
@@ -113,38 +106,135 @@ class KrigingSurrogate(Container):
         self.Y = Y
         self.m = len(X[0])
         self.n = len(X)
+
+        self._X = array(X, dtype=float)
+        self._Y = array(Y, dtype=float)
+        # squared distances between each pair of training points, which
+        # don't change while the thetas are being optimized.
+        self._ij = triu_indices(self.n, 1)
+        self._D = (self._X[self._ij[0]]-self._X[self._ij[1]])**2.
                 
-        thetas = zeros(self.m)
+        if self.warm_start and self.thetas is not None and \
+           len(self.thetas) == self.m:
+            thetas = array(self.thetas, dtype=float)
+        else:
+            thetas = zeros(self.m)
         def _calcll(thetas):
             self.thetas = thetas
             self._calculate_log_likelihood()
-            return -self.log_likelihood
-        #if self.thetas == None:
-        self.thetas = fmin(_calcll, thetas, disp=False, ftol = 0.0001)
+            return -self.log_likelihood, -self._log_likelihood_grad()
+        self.thetas = fmin_l_bfgs_b(_calcll, thetas,
+                                    bounds=[self.theta_bounds]*self.m,
+                                    pgtol=1.e-8)[0]
         self._calculate_log_likelihood()
         
+    def update(self, x, y):
+        """Add the training point (`x`, `y`) to the model without
+        re-optimizing the thetas. The Cholesky factor of the correlation
+        matrix is extended by one row and column, so the cost is O(n^2)
+        rather than the O(n^3) of retraining. If the extended correlation
+        matrix isn't positive definite, the model is fully retrained.
+        """
+        if self.m == None: #untrained surrogate
+            raise RuntimeError("KrigingSurrogate has not been trained, so it "
+                               "can't be updated")
+        x = array(x, dtype=float).reshape(self.m)
+        X = vstack([self._X, x])
+        Y = hstack([self._Y, y])
+
+        if self.R_fact is None:
+            self.train(X, Y)
+            return
+
+        thetas = 10.**self.thetas
+        r = (1-self.nugget)*exp(-dot((self._X-x)**2., thetas))
+        U, lower = self.R_fact
+        if lower:
+            u = solve_triangular(U, r, lower=True)
+        else:
+            u = solve_triangular(U, r, trans='T')
+        d2 = 1.0 - dot(u, u)
+        if d2 <= 0.:
+            self.train(X, Y)
+            return
+
+        n = self.n+1
+        Unew = zeros((n, n))
+        if lower:
+            Unew[:-1, :-1] = tril(U)
+            Unew[-1, :-1] = u
+        else:
+            Unew[:-1, :-1] = triu(U)
+            Unew[:-1, -1] = u
+        Unew[-1, -1] = sqrt(d2)
+
+        R = eye(n)
+        R[:-1, :-1] = self.R
+        R[:-1, -1] = r
+        R[-1, :-1] = r
+
+        self.X = X
+        self.Y = Y
+        self.n = n
+        self._X = X
+        self._Y = Y
+        self._ij = triu_indices(n, 1)
+        self._D = (X[self._ij[0]]-X[self._ij[1]])**2.
+        self.R = R
+        self.R_fact = (Unew, lower)
+        self._update_from_factor()
+
+    def _update_from_factor(self):
+        """Calculate mu, sig2, and the log likelihood using the current
+        Cholesky factor of R."""
+        Y = self._Y
+        one = ones(self.n)
+        rhs = vstack([Y, one]).T
+        cho = cho_solve(self.R_fact, rhs).T
+
+        self.mu = dot(one,cho[0])/dot(one,cho[1])
+        self._Rinv_Y = cho_solve(self.R_fact, Y-self.mu)
+        self._Rinv_one = cho[1]
+        self.sig2 = dot(Y-self.mu, self._Rinv_Y)/self.n
+        # det(R) is the squared product of the diagonal of the factor
+        det_R = prod(diag(self.R_fact[0]))**2.
+        #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det_R+1.e-16))-sum(thetas)
+        self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det_R+1.e-16))
+
+    def _log_likelihood_grad(self):
+        """Returns the gradient of the log likelihood, as computed by the
+        last call to _calculate_log_likelihood, with respect to the (log10)
+        thetas. mu and sig2 are the maximum likelihood estimates for the
+        current thetas, so they don't contribute to the gradient."""
+        if self.R_fact is not None:
+            Rinv = cho_solve(self.R_fact, eye(self.n))
+            # account for the 1.e-16 added to det(R) in the likelihood
+            det_R = prod(diag(self.R_fact[0]))**2.
+        else:
+            Rinv = pinv(self.R)
+            det_R = det(self.R)
+        i, j = self._ij
+        a = self._Rinv_Y
+        # dL/dR for the off-diagonal terms, summed over both triangles
+        dL_dR = a[i]*a[j]/self.sig2 - Rinv[i, j]*det_R/(det_R+1.e-16)
+        thetas = 10.**self.thetas
+        # dR/d(theta) = -D*R and d(theta)/d(log10(theta)) = theta*ln(10)
+        return -dot(dL_dR*self.R[i, j], self._D)*thetas*log(10.)
+        
     def _calculate_log_likelihood(self):
         #if self.m == None:
         #    Give error message
-        R = zeros((self.n, self.n))
-        X,Y = array(self.X), array(self.Y)
+        Y = self._Y
         thetas = 10.**self.thetas
-        for i in range(self.n):
-            for j in arange(i+1,self.n):
-                R[i,j] = (1-self.nugget)*e**(-sum(thetas*(X[i]-X[j])**2.)) #weighted distance formula
-        R = R + R.T + eye(self.n)
+        R = eye(self.n)
+        i, j = self._ij
+        R[i, j] = (1-self.nugget)*exp(-dot(self._D, thetas)) #weighted distance formula
+        R[j, i] = R[i, j]
         self.R = R
         one = ones(self.n)
         try:
             self.R_fact = cho_factor(R)
-            rhs = vstack([Y, one]).T
-            R_fact = (self.R_fact[0].T,not self.R_fact[1])
-            cho = cho_solve(R_fact, rhs).T
-            
-            self.mu = dot(one,cho[0])/dot(one,cho[1])
-            self.sig2 = dot(Y-dot(one,self.mu),cho_solve(self.R_fact,(Y-dot(one,self.mu))))/self.n
-            #self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))-sum(thetas)
-            self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))
+            self._update_from_factor()
         except (linalg.LinAlgError,ValueError):
             #------LSTSQ---------
             self.R_fact = None #reset this to none, so we know not to use cholesky
@@ -152,7 +242,9 @@ class KrigingSurrogate(Container):
             rhs = vstack([Y, one]).T
             lsq = lstsq(self.R.T,rhs)[0].T
             self.mu = dot(one,lsq[0])/dot(one,lsq[1])
-            self.sig2 = dot(Y-dot(one,self.mu),lstsq(self.R,Y-dot(one,self.mu))[0])/self.n
+            self._Rinv_Y = lstsq(self.R,Y-self.mu)[0]
+            self._Rinv_one = lstsq(self.R,one)[0]
+            self.sig2 = dot(Y-self.mu,self._Rinv_Y)/self.n
             self.log_likelihood = -self.n/2.*log(self.sig2)-1./2.*log(abs(det(self.R)+1.e-16))
             #print self.log_likelihood
 
@@ -1,6 +1,6 @@
 """Surrogate Model based on second order response surface equations."""
 
-from numpy import matrix, linalg, power, multiply, concatenate, ones
+from numpy import array, dot, hstack, vstack, linalg, ones, outer, triu_indices
 
 from openmdao.main.api import Container
 from openmdao.main.interfaces import implements,ISurrogate
@@ -16,6 +16,8 @@ class ResponseSurface(Container):
         self.m = None #number of training points 
         self.n = None #number of independents
         self.betas = None #vector of response surface equation coefficients
+        self._P = None #inverse of X'X, used for recursive updates
+        self._cross = None #index pairs of the cross terms
         
         if X is not None and Y is not None: 
             self.train(X,Y)
@@ -27,39 +29,77 @@ class ResponseSurface(Container):
     def train(self,X,Y): 
         """ Calculate response surface equation coefficients using least squares regression. """ 
         
-        X = matrix(X)
-        Y = matrix(Y).T
+        X = array(X, dtype=float)
+        Y = array(Y, dtype=float)
+        self._X = X
+        self._Y = Y
         
         self.m = X.shape[0]
         self.n = X.shape[1]
+        self._cross = triu_indices(self.n, 1)
         
         # Modify X to include constant, squared terms and cross terms
-        X = concatenate((matrix(ones((self.m,1))),X),1) 
-        for i in range(1,self.n+1):
-            X = concatenate((X,power(X[:,i],2)),1)
-        for i in range(1,self.n):
-            for j in range(i+1,self.n+1):
-                X = concatenate((X,multiply(X[:,i],X[:,j])),1)
+        X = self._design_matrix(X)
         
         # Determine response surface equation coefficients (betas) using least squares
         self.betas, rs, r, s = linalg.lstsq(X,Y)
         
+        # keep inv(X'X) for recursive least squares updates if it exists
+        if r == X.shape[1]:
+            self._P = linalg.inv(dot(X.T,X))
+        else:
+            self._P = None
+        
+    def update(self,x,y):
+        """Add the training point (`x`, `y`) to the response surface using
+        recursive least squares, which costs O(p^2) for p coefficients. If
+        the existing training data didn't determine all of the coefficients,
+        the response surface is retrained."""
+        
+        if self.betas is None:
+            raise RuntimeError("ResponseSurface has not been trained, so it "
+                               "can't be updated")
+        x = array(x, dtype=float).reshape(1, self.n)
+        if self._P is None:
+            self.train(vstack([self._X, x]), hstack([self._Y, y]))
+            return
+        
+        self._X = vstack([self._X, x])
+        self._Y = hstack([self._Y, y])
+        self.m += 1
+        
+        a = self._design_matrix(x)[0]
+        Pa = dot(self._P,a)
+        k = Pa/(1.0+dot(a,Pa))
+        self.betas = self.betas + k*(y-dot(a,self.betas))
+        self._P = self._P - outer(k,Pa)
+        
+    def _design_matrix(self,X):
+        """Returns X with a column of ones, the squared terms and the cross
+        terms added."""
+        
+        i, j = self._cross
+        return hstack([ones((X.shape[0],1)), X, X**2, X[:,i]*X[:,j]])
+        
     def predict(self,new_x): 
         """Calculates a predicted value of the response based on the current response surface model for the supplied list of inputs. """ 
         
-        new_x = matrix(new_x)
+        return self.predict_batch([new_x])[0]
+        
+    def predict_batch(self,X):
+        """Calculates the predicted values of the response at each of the
+        points in `X`, based on the current response surface model.
         
-        # Modify new_x to include constant, squared terms and cross terms
-        new_x = concatenate((matrix(ones((1,1))),new_x),1) 
-        for i in range(1,self.n+1):
-            new_x = concatenate((new_x,power(new_x[:,i],2)),1)
-        for i in range(1,self.n):
-            for j in range(i+1,self.n+1):
-                new_x = concatenate((new_x,multiply(new_x[:,i],new_x[:,j])),1)
+        X: 2D array-like
+            Each row contains the inputs for one point.
+            
+        Returns a 1D array.
+        """
         
-        # Predict new_y using new_x and betas
-        new_y = new_x*self.betas
-        return new_y[0,0]
+        X = array(X, dtype=float).reshape(-1, self.n)
+        
+        # Modify X to include constant, squared terms and cross terms
+        return dot(self._design_matrix(X), self.betas)
 
 
 if __name__ == "__main__":
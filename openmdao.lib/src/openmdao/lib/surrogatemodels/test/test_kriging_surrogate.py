@@ -30,7 +30,8 @@ class KrigingSurrogateTests(unittest.TestCase):
         krig1 = KrigingSurrogate()
         krig1.train(x,y)
 
-        self.assertAlmostEqual(1.18375,krig1.thetas,places=7)
+        # the analytic gradient lets L-BFGS-B converge to the exact optimum
+        self.assertAlmostEqual(1.183723,krig1.thetas,places=6)
         
     def test_1d_kriging_predictor(self):
         x = array([[0.05], [.25], [0.61], [0.95]])
@@ -76,6 +77,85 @@ class KrigingSurrogateTests(unittest.TestCase):
         self.assertAlmostEqual(14.513550,pred.sigma,places=2)
         self.assertAlmostEqual(18.759264,pred.mu,places=2)
         
+    def test_log_likelihood_grad(self):
+        x = array([[-2.,0.],[-0.5,1.5],[1.,3.],[8.5,4.5],[-3.5,6.],[4.,7.5]])
+        y = array([a*b-a for a,b in x])
+        krig1 = KrigingSurrogate()
+        krig1.train(x,y)
+
+        thetas = array([-1.3, 0.2])
+        krig1.thetas = thetas
+        krig1._calculate_log_likelihood()
+        ll = krig1.log_likelihood
+        grad = krig1._log_likelihood_grad()
+        for k in range(2):
+            krig1.thetas = thetas.copy()
+            krig1.thetas[k] += 1.e-6
+            krig1._calculate_log_likelihood()
+            fd = (krig1.log_likelihood-ll)/1.e-6
+            self.assertAlmostEqual(fd, grad[k], places=4)
+
+    def test_warm_start(self):
+        x = array([[0.05], [.25], [0.61], [0.95]])
+        y = array([0.738513784857542,-0.210367746201974,-0.489015457891476,12.3033138316612])
+        krig1 = KrigingSurrogate()
+        krig1.train(x,y)
+        thetas = krig1.thetas.copy()
+        # retraining with the same data starts at the optimum
+        krig1.train(x,y)
+        self.assertAlmostEqual(thetas[0],krig1.thetas[0],places=7)
+
+    def test_predict_batch(self):
+        x = array([[-2.,0.],[-0.5,1.5],[1.,3.],[8.5,4.5],[-3.5,6.],[4.,7.5],[-5.,9.],[5.5,10.5],
+                   [10.,12.],[7.,13.5],[2.5,15.]])
+        y = array([(a-b)**2 for a,b in x])
+
+        krig1 = KrigingSurrogate()
+        krig1.train(x,y)
+        new_x = array([[-2.,0.],[5.,5.],[0.,14.],[3.3,-1.]])
+        mu, rmse = krig1.predict_batch(new_x)
+        self.assertEqual(mu.shape, (4,))
+        self.assertEqual(rmse.shape, (4,))
+        for i, point in enumerate(new_x):
+            pred = krig1.predict(point)
+            self.assertAlmostEqual(pred.mu, mu[i], places=10)
+            self.assertAlmostEqual(pred.sigma, rmse[i], places=10)
+        self.assertAlmostEqual(y[0], mu[0], places=5)
+
+    def test_update(self):
+        x = array([[-2.,0.],[-0.5,1.5],[1.,3.],[8.5,4.5],[-3.5,6.],[4.,7.5],[-5.,9.],[5.5,10.5],
+                   [10.,12.],[7.,13.5],[2.5,15.]])
+        y = array([(a-b)**2 for a,b in x])
+
+        krig1 = KrigingSurrogate()
+        krig1.train(x[:-2],y[:-2])
+        krig1.update(x[-2],y[-2])
+        krig1.update(x[-1],y[-1])
+        self.assertEqual(krig1.n, 11)
+
+        # same result as a full rebuild using the same thetas
+        krig2 = KrigingSurrogate()
+        krig2.train(x,y)
+        krig2.thetas = krig1.thetas.copy()
+        krig2._calculate_log_likelihood()
+        self.assertAlmostEqual(krig1.mu, krig2.mu, places=8)
+        self.assertAlmostEqual(krig1.sig2, krig2.sig2, places=6)
+        self.assertAlmostEqual(krig1.log_likelihood, krig2.log_likelihood, places=6)
+        new_x = array([[5.,5.],[0.,14.]])
+        mu1, rmse1 = krig1.predict_batch(new_x)
+        mu2, rmse2 = krig2.predict_batch(new_x)
+        for i in range(2):
+            self.assertAlmostEqual(mu1[i], mu2[i], places=6)
+            self.assertAlmostEqual(rmse1[i], rmse2[i], places=6)
+
+        krig3 = KrigingSurrogate()
+        try:
+            krig3.update(x[0],y[0])
+        except RuntimeError,err:
+            self.assertEqual(str(err),"KrigingSurrogate has not been trained, so it can't be updated")
+        else:
+            self.fail("RuntimeError Expected")
+
     def test_get_uncertain_value(self): 
         x = array([[0.05], [.25], [0.61], [0.95]])
         y = array([0.738513784857542,-0.210367746201974,-0.489015457891476,12.3033138316612])
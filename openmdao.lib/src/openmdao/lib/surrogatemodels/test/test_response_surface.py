@@ -5,6 +5,7 @@ from numpy import array,round,linspace,sin,cos,pi
 import numpy as np
 
 from openmdao.lib.surrogatemodels.logistic_regression import LogisticRegression
+from openmdao.lib.surrogatemodels.response_surface import ResponseSurface
 
 
 class LogisticRegressionTest(unittest.TestCase):
@@ -42,4 +43,67 @@ class LogisticRegressionTest(unittest.TestCase):
     def test_uncertain_value(self): 
         lr = LogisticRegression()
         
-        self.assertEqual(lr.get_uncertain_value(1.0),1.0)
\ No newline at end of file
+        self.assertEqual(lr.get_uncertain_value(1.0),1.0)
+
+
+class ResponseSurfaceTest(unittest.TestCase):
+
+    def test_update(self):
+        x = array([[-2.,0.],[-0.5,1.5],[1.,3.],[8.5,4.5],[-3.5,6.],[4.,7.5],[-5.,9.],[5.5,10.5],
+                   [10.,12.],[7.,13.5],[2.5,15.]])
+        y = array([(a-b)**2+sin(a) for a,b in x])
+
+        rs1 = ResponseSurface()
+        rs1.train(x[:-3],y[:-3])
+        for i in range(-3,0):
+            rs1.update(x[i],y[i])
+        self.assertEqual(rs1.m, 11)
+
+        rs2 = ResponseSurface()
+        rs2.train(x,y)
+        for b1, b2 in zip(rs1.betas.flat, rs2.betas.flat):
+            self.assertAlmostEqual(b1, b2, places=8)
+        self.assertAlmostEqual(rs1.predict([3.,4.]), rs2.predict([3.,4.]), places=8)
+
+    def test_update_underdetermined(self):
+        x = [[0.,0.],[1.,0.],[0.,1.]]
+        y = [1.,2.,3.]
+        rs1 = ResponseSurface()
+        rs1.train(x,y)
+        self.assertEqual(rs1._P, None)
+        for point in [[1.,1.],[2.,0.],[0.,2.],[2.,1.]]:
+            x.append(point)
+            y.append(1.+point[0]+2.*point[1]+point[0]*point[1])
+            rs1.update(point,y[-1])
+        rs2 = ResponseSurface(x,y)
+        self.assertAlmostEqual(rs1.predict([3.,4.]), rs2.predict([3.,4.]), places=8)
+
+    def test_predict_batch(self):
+        def quad(x):
+            return 1.+2.*x[0]-x[1]+.5*x[2]**2+3.*x[0]*x[2]-x[1]*x[2]
+
+        np.random.seed(10)
+        x = np.random.random((20,3))
+        y = array([quad(case) for case in x])
+        rs = ResponseSurface(x,y)
+        self.assertEqual(rs.betas.shape, (10,))
+
+        new_x = np.random.random((5,3))
+        pred = rs.predict_batch(new_x)
+        self.assertEqual(pred.shape, (5,))
+        for i, point in enumerate(new_x):
+            self.assertAlmostEqual(pred[i], rs.predict(point), places=10)
+            self.assertAlmostEqual(pred[i], quad(point), places=8)
+
+    def test_update_untrained(self):
+        rs = ResponseSurface()
+        try:
+            rs.update([1.,2.],3.)
+        except RuntimeError,err:
+            self.assertEqual(str(err),"ResponseSurface has not been trained, so it can't be updated")
+        else:
+            self.fail("RuntimeError Expected")
+
+
+if __name__ == "__main__":
+    unittest.main()
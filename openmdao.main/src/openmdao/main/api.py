@@ -31,6 +31,8 @@ from openmdao.main.interfaces import implements, Attribute, Interface
 from openmdao.main.file_supp import FileMetadata
 
 from openmdao.main.case import Case
+from openmdao.main.resultcache import ResultCache
+from openmdao.main.profiling import Profiler, enable_profiling, disable_profiling
 
 from openmdao.main.arch import Architecture
 from openmdao.main.problem_formulation import ArchitectureAssembly, OptProblem
@@ -7,6 +7,7 @@ __all__ = ['Assembly', 'set_as_top']
 import cStringIO
 import threading
 import re
+import ast
 
 from zope.interface import implementedBy
 
@@ -20,7 +21,7 @@ from openmdao.main.container import _copydict
 from openmdao.main.component import Component, Container
 from openmdao.main.variable import Variable
 from openmdao.main.vartree import VariableTree
-from openmdao.main.datatypes.api import Slot
+from openmdao.main.datatypes.api import Array, Bool, Float, Slot
 from openmdao.main.driver import Driver, Run_Once
 from openmdao.main.hasparameters import HasParameters, ParameterGroup
 from openmdao.main.hasconstraints import HasConstraints, HasEqConstraints, HasIneqConstraints
@@ -30,6 +31,7 @@ from openmdao.main.mp_support import is_instance
 from openmdao.main.expreval import ConnectedExprEvaluator
 from openmdao.main.printexpr import eliminate_expr_ws
 from openmdao.util.nameutil import partition_names_by_comp
+from openmdao.units import get_conversion_tuple
 
 _iodict = {'out': 'output', 'in': 'input'}
 
@@ -86,6 +88,149 @@ class PassthroughProperty(Variable):
         self._vals[obj][name] = self._trait.validate(obj, name, value)
 
 
+class _ExprTransfer(object):
+    """Transfers data across a connection by evaluating the source
+    expression and setting the destination expression.
+    """
+    def __init__(self, srcexpr, destexpr):
+        self.srcexpr = srcexpr
+        self.destexpr = destexpr
+
+    def transfer(self):
+        self.destexpr.set(self.srcexpr.evaluate(), src=self.srcexpr.text)
+
+
+class _DirectTransfer(_ExprTransfer):
+    """Transfers data across a connection between two simple variables
+    (the source may have constant array indices) by getting and setting
+    the attributes directly, with any unit conversion precomputed.
+    """
+    def __init__(self, srcexpr, destexpr, srcobj, srcname, index,
+                 destcomp, destname, factor=None, offset=0.):
+        super(_DirectTransfer, self).__init__(srcexpr, destexpr)
+        self.srcobj = srcobj
+        self.srcname = srcname
+        self.index = index
+        self.destcomp = destcomp
+        self.destname = destname
+        self.factor = factor
+        self.offset = offset
+
+    def transfer(self):
+        val = getattr(self.srcobj, self.srcname)
+        for idx in self.index:
+            val = val[idx]
+        if self.factor is not None:
+            val = (val + self.offset) * self.factor
+
+        # same as Container.set, but the source was checked when the
+        # plan was built
+        comp = self.destcomp
+        chk = comp._input_check
+        comp._input_check = comp._input_nocheck
+        try:
+            setattr(comp, self.destname, val)
+        finally:
+            comp._input_check = chk
+        if comp._call_execute:
+            comp._input_updated(self.destname)
+
+
+def _const_index(node):
+    """Return a list of the constant indices applied to the variable in
+    the given expression AST, or None if any index isn't a constant int
+    or slice.
+    """
+    index = []
+    while isinstance(node, ast.Subscript):
+        slc = node.slice
+        if isinstance(slc, ast.Index) and isinstance(slc.value, ast.Num):
+            index.append(slc.value.n)
+        elif isinstance(slc, ast.Slice):
+            parts = []
+            for part in (slc.lower, slc.upper, slc.step):
+                if part is None or \
+                   (isinstance(part, ast.Name) and part.id == 'None'):
+                    parts.append(None)
+                elif isinstance(part, ast.Num):
+                    parts.append(part.n)
+                else:
+                    return None
+            index.append(slice(*parts))
+        else:
+            return None
+        node = node.value
+    if not isinstance(node, (ast.Name, ast.Attribute)):
+        return None
+    index.reverse()
+    return index
+
+
+def _make_transfer(scope, srcexpr, destexpr):
+    """Return the transfer object for the connection between *srcexpr*
+    and *destexpr* within *scope*. Connections that can't be done by
+    directly getting and setting attributes are transferred by evaluating
+    the expressions.
+    """
+    fallback = _ExprTransfer(srcexpr, destexpr)
+
+    # destination must be a simple input of one of our children, and that
+    # child must be set the usual way
+    cname, _, destname = destexpr.text.partition('.')
+    if not destname or '.' in destname or '[' in destname:
+        return fallback
+    destcomp = getattr(scope, cname, None)
+    if not is_instance(destcomp, Component) or \
+       destcomp.parent is not scope or \
+       type(destcomp).set.im_func is not Container.set.im_func:
+        return fallback
+    dtrait = destcomp.get_trait(destname)
+    if dtrait is None or dtrait.iotype != 'in':
+        return fallback
+
+    # source must be a simple variable of ours or of one of our children,
+    # optionally with constant indices into an Array
+    srcpaths = srcexpr.get_referenced_varpaths(copy=False)
+    if len(srcpaths) != 1:
+        return fallback
+    srcpath = list(srcpaths)[0]
+    index = _const_index(ast.parse(srcexpr.text, mode='eval').body)
+    if index is None:
+        return fallback
+    if '.' in srcpath:
+        sname, _, srcname = srcpath.partition('.')
+        srcobj = getattr(scope, sname, None)
+        if '.' in srcname or not is_instance(srcobj, Component) or \
+           srcobj.parent is not scope:
+            return fallback
+    else:
+        srcobj, srcname = scope, srcpath
+    strait = srcobj.get_trait(srcname)
+    if strait is None:
+        return fallback
+    sttype = strait.trait_type
+    if sttype is None or sttype.copy or isinstance(sttype, Slot) or \
+       (index and not isinstance(sttype, Array)):
+        return fallback
+
+    # precompute the unit conversion, if any. Values from sources without
+    # a wrapper don't carry units, so they're never converted.
+    factor, offset = None, 0.
+    src_units = strait.units if sttype.get_val_wrapper is not None else None
+    dst_units = dtrait.units
+    if src_units and dst_units and src_units != dst_units:
+        if not isinstance(dtrait.trait_type, (Array, Float)):
+            return fallback
+        try:
+            factor, offset = get_conversion_tuple(src_units, dst_units)
+        except Exception:
+            # let the regular transfer report the problem
+            return fallback
+
+    return _DirectTransfer(srcexpr, destexpr, srcobj, srcname, index,
+                           destcomp, destname, factor, offset)
+
+
 class ExprMapper(object):
     """A mapping between source expressions and destination expressions"""
     def __init__(self, scope):
@@ -263,12 +408,17 @@ class Assembly(Component):
                     desc="The top level Driver that manages execution of "
                     "this Assembly.")
 
+    fast_transfer = Bool(True, desc='If True, data is transferred across '
+                         'connections using transfer plans that are built '
+                         'once per configuration change.')
+
     def __init__(self):
 
         super(Assembly, self).__init__()
 
         self._exprmapper = ExprMapper(self)
         self._graph_loops = []
+        self._transfer_plans = {}
 
         # default Driver executes its workflow once
         self.add('driver', Run_Once())
@@ -687,6 +837,9 @@ class Assembly(Component):
         if self.driver is not None:
             self.driver.config_changed(update_parent=False)
             
+        # connections may have changed, so transfer plans must be rebuilt
+        self._transfer_plans = {}
+
         # Detect and save any loops in the graph.
         if hasattr(self, '_depgraph'):
             graph = self._depgraph._graph
@@ -740,7 +893,14 @@ class Assembly(Component):
         expr_info = []
         invalids = []
 
-        if compname is not None:
+        if compname is not None and exprs and self.fast_transfer:
+            plan = self._get_transfer_plan(compname)
+            for name in exprs:
+                for xfer in plan.get(name, ()):
+                    invalids.extend(xfer.srcexpr.invalid_refs())
+                    expr_info.append(xfer)
+            exprs = []
+        elif compname is not None:
             pred = self._exprmapper._exprgraph.pred
             if exprs:
                 ex = ['.'.join([compname, n]) for n in exprs]
@@ -756,7 +916,8 @@ class Assembly(Component):
             if srctxt:
                 srcexpr = self._exprmapper.get_expr(srctxt)
                 invalids.extend(srcexpr.invalid_refs())
-                expr_info.append((srcexpr, self._exprmapper.get_expr(expr)))
+                expr_info.append(_ExprTransfer(srcexpr,
+                                               self._exprmapper.get_expr(expr)))
 
         # if source exprs reference invalid vars, request an update
         if invalids:
@@ -780,12 +941,47 @@ class Assembly(Component):
                     getattr(self, cname).update_outputs(vnames)
                     #self.set_valid(vnames, True)
 
-        for srcexpr, destexpr in expr_info:
+        for xfer in expr_info:
             try:
-                destexpr.set(srcexpr.evaluate(), src=srcexpr.text)
+                xfer.transfer()
             except Exception as err:
                 self.raise_exception("cannot set '%s' from '%s': %s" %
-                                     (destexpr.text, srcexpr.text, str(err)), type(err))
+                                     (xfer.destexpr.text, xfer.srcexpr.text,
+                                      str(err)), type(err))
+
+    def _get_transfer_plan(self, compname):
+        """Return a dict mapping each connected input of the named component
+        to a list of the transfers that update it. The plan is built the
+        first time it's needed after a configuration change.
+        """
+        try:
+            return self._transfer_plans[compname]
+        except KeyError:
+            pass
+
+        plan = {}
+        mapper = self._exprmapper
+        graph = mapper._exprgraph
+        prefix = compname + '.'
+        for node, data in graph.nodes(data=True):
+            destexpr = data['expr']
+            srctxt = mapper.get_source(node)
+            if not srctxt:
+                continue
+            # index the transfer under the same names that
+            # find_referring_exprs would match for this component
+            names = set([path[len(prefix):]
+                         for path in destexpr.get_referenced_varpaths(copy=False)
+                         if path.startswith(prefix)])
+            if node.startswith(prefix):
+                names.add(node[len(prefix):])
+            if names:
+                xfer = _make_transfer(self, mapper.get_expr(srctxt), destexpr)
+                for name in names:
+                    plan.setdefault(name, []).append(xfer)
+
+        self._transfer_plans[compname] = plan
+        return plan
 
     def update_outputs(self, outnames):
         """Execute any necessary internal or predecessor components in order
@@ -898,6 +1094,14 @@ class Assembly(Component):
 
         self.driver.calc_derivatives(first, second, savebase)
 
+    def set_complex_step(self, complex_step):
+        """ Overides the component's version of this function. An assembly
+        must also set complex step mode on all components in its driver's
+        workflow."""
+
+        super(Assembly, self).set_complex_step(complex_step)
+        self.driver.set_complex_step(complex_step)
+
     def check_derivatives(self, order, driver_inputs, driver_outputs):
         """An assembly just tells its driver to run check_derivatives on each
         element in its workflow. Note that an assembly signifies a change of
@@ -14,11 +14,11 @@ import sys
 import weakref
 
 try:
-    from numpy import inner
+    from numpy import inner, ndarray, zeros
 except ImportError as err:
     import logging
     logging.warn("In %s: %r", __file__, err)
-    from openmdao.main.numpy_fallback import inner
+    from openmdao.main.numpy_fallback import inner, ndarray, zeros
 
 # pylint: disable-msg=E0611,F0401
 from enthought.traits.trait_base import not_event
@@ -51,6 +51,7 @@ from openmdao.util.eggsaver import SAVE_CPICKLE
 from openmdao.util.eggobserver import EggObserver
 
 import openmdao.util.log as tracing
+from openmdao.main import profiling
 
 __missing__ = object()
 
@@ -155,6 +156,28 @@ class Component(Container):
 
     create_instance_dir = Bool(False)
 
+    # Set True in subclasses whose execute() spends most of its time outside
+    # the Python interpreter (waiting on a subprocess, in extension code that
+    # releases the GIL, ...). A parallel Dataflow runs such components in
+    # threads.
+    releases_gil = False
+
+    # Set True in subclasses whose execute() only changes their outputs to
+    # let a parallel Dataflow run them in worker processes. Only the output
+    # values are sent back from the worker.
+    run_in_process = False
+
+    # Assign a ResultCache to restore outputs from a previous run having the
+    # same input values rather than calling execute() again.
+    result_cache = None
+
+    # Positions of variables in the provideJ() Jacobian.
+    _jacobian_bounds = None
+
+    # Bumped by config_changed(). Also a class attribute because HasTraits
+    # deepcopies assign children to the copy before its __dict__ is filled.
+    _config_version = 0
+
     def __init__(self):
         super(Component, self).__init__()
 
@@ -187,6 +210,7 @@ class Component(Container):
         self._call_execute = True
 
         # cached configuration information
+        self._config_version = 0
         self._input_names = None
         self._output_names = None
         self._container_names = None
@@ -198,6 +222,7 @@ class Component(Container):
         self._dir_context = None
 
         self.ffd_order = 0
+        self._complex_step = False
         self._case_id = ''
 
         self._publish_vars = {}  # dict of varname to subscriber count
@@ -414,7 +439,15 @@ class Component(Container):
                                     if valids.get(inp) is False]
             if invalid_ins:
                 self._call_execute = True
-                self.parent.update_inputs(self.name, invalid_ins)
+                profiler = profiling.PROFILER
+                if profiler is None:
+                    self.parent.update_inputs(self.name, invalid_ins)
+                else:
+                    profiler.start('update_inputs')
+                    try:
+                        self.parent.update_inputs(self.name, invalid_ins)
+                    finally:
+                        profiler.stop_transfer(self.get_pathname())
                 for name in invalid_ins:
                     valids[name] = True
             elif self._call_execute is False and len(self.list_outputs(valid=False)):
@@ -445,6 +478,18 @@ class Component(Container):
             setattr(self, name,
                     self.derivatives.calculate_output(name, ffd_order))
 
+    def set_complex_step(self, complex_step):
+        """Turn complex step mode on or off. In complex step mode, Float and
+        Array variables accept complex values, so that a complex
+        perturbation of an input can be pushed through *execute()* to
+        calculate derivatives. *execute()* must only use functions that
+        support complex arguments (e.g., numpy rather than math).
+        
+        complex_step: Bool
+            Set to True to allow complex values.
+        """
+        self._complex_step = complex_step
+
     def calc_derivatives(self, first=False, second=False, savebase=False):
         """Prepare for Fake Finite Difference runs by calculating all needed
         derivatives, and saving the current state as the baseline if
@@ -469,6 +514,7 @@ class Component(Container):
         # Calculate first derivatives using the new API.
         # TODO: unify linearize & calculate_first_derivatives'
         if first and hasattr(self, 'linearize'):
+            self._jacobian_bounds = None
             self.linearize()
             self.derivative_exec_count += 1
             
@@ -545,36 +591,17 @@ class Component(Container):
         self._stop = False
         self.ffd_order = ffd_order
         self._case_id = case_id
+        profiler = profiling.PROFILER
+        if profiler is not None:
+            profiler.start(self.get_pathname())
+            exec_count = self.exec_count
         try:
             self._pre_execute(force)
             self._set_exec_state('RUNNING')
 
             if self._call_execute or force:
                 #print 'execute: %s' % self.get_pathname()
-
-                if ffd_order == 1 and \
-                   hasattr(self, 'calculate_first_derivatives'):
-                    # During Fake Finite Difference, the available derivatives
-                    # are used to approximate the outputs.
-                    self._execute_ffd(1)
-
-                elif ffd_order == 2 and \
-                   hasattr(self, 'calculate_second_derivatives'):
-                    # During Fake Finite Difference, the available derivatives
-                    # are used to approximate the outputs.
-                    self._execute_ffd(2)
-
-                else:
-                    # Component executes as normal
-                    self.exec_count += 1
-                    if tracing.TRACER is not None and \
-                       not obj_has_interface(self, IAssembly) and \
-                       not obj_has_interface(self, IDriver):
-
-                        tracing.TRACER.debug(self.get_itername())
-
-                    self.execute()
-
+                self._run_execute(ffd_order)
                 self._post_execute()
             #else:
                 #print 'skipping: %s' % self.get_pathname()
@@ -583,16 +610,55 @@ class Component(Container):
             self._set_exec_state('INVALID')
             raise
         finally:
+            if profiler is not None:
+                profiler.stop(self.get_pathname(),
+                              self.exec_count - exec_count)
             # If this is the top-level component, perform run termination.
             if self.parent is None:
                 self._run_terminated()
             if self.directory:
                 self.pop_dir()
 
+    def _run_execute(self, ffd_order=0):
+        """Execute this component (or approximate its outputs during Fake
+        Finite Difference). This is the part of :meth:`run` that doesn't
+        touch the parent, so it may be done outside of the main thread."""
+        if ffd_order == 1 and \
+           hasattr(self, 'calculate_first_derivatives'):
+            # During Fake Finite Difference, the available derivatives
+            # are used to approximate the outputs.
+            self._execute_ffd(1)
+
+        elif ffd_order == 2 and \
+           hasattr(self, 'calculate_second_derivatives'):
+            # During Fake Finite Difference, the available derivatives
+            # are used to approximate the outputs.
+            self._execute_ffd(2)
+
+        else:
+            cache = self.result_cache
+            if cache is not None:
+                key = cache.make_key(self)
+                if key is not None and cache.restore(self, key):
+                    return
+
+            # Component executes as normal
+            self.exec_count += 1
+            if tracing.TRACER is not None and \
+               not obj_has_interface(self, IAssembly) and \
+               not obj_has_interface(self, IDriver):
+
+                tracing.TRACER.debug(self.get_itername())
+
+            self.execute()
+
+            if cache is not None and key is not None:
+                cache.store(self, key)
+
     def _run_terminated(self):
         """ Executed at end of top-level run. """
         def _recursive_close(container, visited):
-            """ Close all case recorders. """
+            """ Close all case recorders and workflows. """
             # Using ._alltraits() since .items() won't pickle.
             # and we may be traversing a distributed tree.
             for name in container._alltraits():
@@ -603,6 +669,8 @@ class Component(Container):
                 if obj_has_interface(obj, IDriver):
                     for recorder in obj.recorders:
                         recorder.close()
+                    if obj.workflow is not None:
+                        obj.workflow.close()
                 elif obj_has_interface(obj, ICaseRecorder):
                     obj.close()
                 if isinstance(obj, Container):
@@ -735,6 +803,9 @@ class Component(Container):
         """
         if update_parent and hasattr(self, 'parent') and self.parent:
             self.parent.config_changed(update_parent)
+        # lets objects that cache references into our tree (e.g.,
+        # ExprEvaluator accessors) know that they need to rebuild them
+        self._config_version += 1
         self._input_names = None
         self._output_names = None
         self._connected_inputs = None
@@ -1892,7 +1963,12 @@ class Component(Container):
         function hook "apply_deriv.
         """
         for key in result:
-            result[key] = -arg[key]
+            res = result[key]
+            if isinstance(res, ndarray) and res is not arg[key]:
+                res.fill(0.0)  # Update in place.
+                res -= arg[key]
+            else:
+                result[key] = -arg[key]
 
         if hasattr(self, 'apply_deriv'):
             self.apply_deriv(arg, result)
@@ -1900,22 +1976,7 @@ class Component(Container):
 
         # Optional specification of the Jacobian
         input_keys, output_keys, J = self.provideJ()
-
-        ibounds = {}
-        nvar = 0
-        for key in input_keys:
-            val = self.get(key)
-            width = flattened_size('.'.join((self.name, key)), val)
-            ibounds[key] = (nvar, nvar+width)
-            nvar += width
-
-        obounds = {}
-        nvar = 0
-        for key in output_keys:
-            val = self.get(key)
-            width = flattened_size('.'.join((self.name, key)), val)
-            obounds[key] = (nvar, nvar+width)
-            nvar += width
+        ibounds, obounds = self._get_jacobian_bounds(input_keys, output_keys)
 
         for okey in result:
             for ikey in arg:
@@ -1940,6 +2001,91 @@ class Component(Container):
                         else:
                             result[okey] += tmp.reshape(result[okey].shape)
 
+    def _get_jacobian_bounds(self, input_keys, output_keys):
+        """Return dicts of the (start, end) columns and rows in the
+        *provideJ()* Jacobian of each input and output. These are only
+        recalculated after the component is linearized again.
+        """
+        cached = self._jacobian_bounds
+        if cached is not None and cached[0] == input_keys \
+           and cached[1] == output_keys:
+            return cached[2], cached[3]
+
+        ibounds = {}
+        nvar = 0
+        for key in input_keys:
+            val = self.get(key)
+            width = flattened_size('.'.join((self.name, key)), val)
+            ibounds[key] = (nvar, nvar+width)
+            nvar += width
+
+        obounds = {}
+        nvar = 0
+        for key in output_keys:
+            val = self.get(key)
+            width = flattened_size('.'.join((self.name, key)), val)
+            obounds[key] = (nvar, nvar+width)
+            nvar += width
+
+        self._jacobian_bounds = (input_keys, output_keys, ibounds, obounds)
+        return ibounds, obounds
+
+    def applyJT(self, arg, result):
+        """Multiply an input vector by the transposed Jacobian. `arg` is keyed
+        by output name and `result` by input name; results for any outputs in
+        `result` get the transpose of the "fake" residual term. Calls into the
+        function hook "apply_derivT" if it exists, otherwise uses the
+        Jacobian from *provideJ()*.
+        """
+        for key in result:
+            res = result[key]
+            if key in arg:
+                if isinstance(res, ndarray) and res is not arg[key]:
+                    res.fill(0.0)  # Update in place.
+                    res -= arg[key]
+                else:
+                    result[key] = -arg[key]
+            elif isinstance(res, ndarray):
+                res.fill(0.0)  # Update in place.
+            else:
+                val = self.get(key)
+                if isinstance(val, ndarray):
+                    result[key] = zeros(val.shape)
+                else:
+                    result[key] = 0.0
+
+        if hasattr(self, 'apply_derivT'):
+            self.apply_derivT(arg, result)
+            return
+
+        # Optional specification of the Jacobian
+        input_keys, output_keys, J = self.provideJ()
+        ibounds, obounds = self._get_jacobian_bounds(input_keys, output_keys)
+
+        for ikey in result:
+            if ikey in arg:
+                continue
+            i1, i2 = ibounds[ikey]
+            for okey in arg:
+                o1, o2 = obounds[okey]
+                if o2 - o1 == 1:
+                    if i2 - i1 == 1:
+                        Jsub = float(J[o1, i1])
+                        result[ikey] += Jsub*arg[okey]
+                    else:
+                        Jsub = J[o1:o2, i1:i2]
+                        tmp = Jsub*arg[okey]
+                        result[ikey] += tmp.reshape(result[ikey].shape)
+                else:
+                    tmp = flattened_value('.'.join((self.name, okey)),
+                                          arg[okey]).reshape(1, -1)
+                    Jsub = J[o1:o2, i1:i2]
+                    tmp = inner(Jsub.T, tmp)
+                    if i2 - i1 == 1:
+                        result[ikey] += float(tmp)
+                    else:
+                        result[ikey] += tmp.reshape(result[ikey].shape)
+
 
 def _show_validity(comp, recurse=True, exclude=None, valid=None):  # pragma no cover
     """Prints out validity status of all input and output traits
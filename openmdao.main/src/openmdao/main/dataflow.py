@@ -1,26 +1,108 @@
 """ A workflow where the execution order is automatically inferred from the
 data connections."""
 
+import cPickle
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import time
+
 import networkx as nx
 from networkx.algorithms.components import strongly_connected_components
 from networkx.algorithms.dag import is_directed_acyclic_graph
 
+from openmdao.main import profiling
+from openmdao.main.component import Component
+from openmdao.main.container import Container
+from openmdao.main.exceptions import RunStopped
 from openmdao.main.sequentialflow import SequentialWorkflow
-from openmdao.main.interfaces import IDriver
+from openmdao.main.interfaces import IDriver, IAssembly
 from openmdao.main.mp_support import has_interface
 
 __all__ = ['Dataflow']
 
+
+def _execute_pickled(data, ffd_order, outputs):
+    """Worker process side of a parallel :class:`Dataflow`. Rebuild the
+    component from `data`, execute it, and return its output values."""
+    cls, state = cPickle.loads(data)
+    comp = cls.__new__(cls)
+    comp.__setstate__(state)
+    comp._run_execute(ffd_order)
+    return [(name, getattr(comp, name)) for name in outputs]
+
+
 class Dataflow(SequentialWorkflow):
     """
     A Dataflow consists of a collection of Components which are executed in 
     data flow order.
+
+    If `parallel` is True, Components that don't depend on each other are
+    executed concurrently. Input transfers and validity bookkeeping are still
+    done sequentially in the main thread; only the components' *execute()*
+    calls overlap. Components with `releases_gil` set run in threads and
+    components with `run_in_process` set run in worker processes (at most
+    `max_workers` of each, which defaults to the number of CPUs). Only the
+    outputs of a component run in a worker process are sent back, so any
+    other state its *execute()* changes is lost. Components with a
+    `result_cache` or that can't be pickled run in threads instead. All
+    other components, including Drivers, Assemblies, and components that
+    override *run()* or have a `directory` set, run in the main thread.
     """
     def __init__(self, parent=None, scope=None, members=None):
         """ Create an empty flow. """
+        self._parallel = False
+        self.max_workers = None
+        self._thread_pool = None
+        self._process_pool = None
         super(Dataflow, self).__init__(parent, scope, members)
         self.config_changed()
 
+    def __getstate__(self):
+        """Return dict representing this workflow's state. Worker pools
+        aren't saved."""
+        state = self.__dict__.copy()
+        state['_thread_pool'] = None
+        state['_process_pool'] = None
+        return state
+
+    def __setstate__(self, state):
+        """Restore this workflow's state."""
+        self.__dict__.update(state)
+        # Older saved states won't have these.
+        if '_parallel' not in state:
+            self._parallel = state.get('parallel', False)
+            self.__dict__.pop('parallel', None)
+        self.__dict__.setdefault('max_workers', None)
+        self.__dict__.setdefault('_thread_pool', None)
+        self.__dict__.setdefault('_process_pool', None)
+        self.__dict__.setdefault('_levels', None)
+        if '_dependency_graph' not in self.__dict__:
+            self._dependency_graph = None
+            self._collapsed_graph = None
+
+    @property
+    def parallel(self):
+        """If True, independent components are executed concurrently."""
+        return self._parallel
+
+    @parallel.setter
+    def parallel(self, parallel):
+        self._parallel = parallel
+        if not parallel:
+            self.close()
+
+    def close(self):
+        """Shut down any worker threads and processes. They are started
+        again as needed."""
+        if self._thread_pool is not None:
+            self._thread_pool.close()
+            self._thread_pool.join()
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.close()
+            self._process_pool.join()
+            self._process_pool = None
+
     def __iter__(self):
         """Iterate through the nodes in dataflow order."""
         # resolve all of the components up front so if there's a problem it'll
@@ -55,8 +137,189 @@ class Dataflow(SequentialWorkflow):
         has changed.
         """
         self._collapsed_graph = None
+        self._dependency_graph = None
         self._topsort = None
         self._duplicates = None
+        self._levels = None
+        self.close()
+
+    def run(self, ffd_order=0, case_id=''):
+        """ Run the Components in this Workflow. """
+        if not self.parallel:
+            return super(Dataflow, self).run(ffd_order, case_id)
+
+        self._stop = False
+        self._iterator = None
+        self._exec_count += 1
+        self._comp_count = 0
+        iterbase = self._iterbase(case_id)
+        profiler = profiling.PROFILER
+        if profiler is not None:
+            wall = time.time()
+            cpu = profiling.cpu_time()
+        scope = self.scope
+        for level in self._get_levels():
+            comps = []
+            for name in level:
+                comp = getattr(scope, name)
+                self._comp_count += 1
+                comp.set_itername('%s-%d' % (iterbase, self._comp_count))
+                comps.append(comp)
+            self._run_level(comps, ffd_order, case_id)
+            if self._stop:
+                raise RunStopped('Stop requested')
+        if profiler is not None:
+            self._record_iteration(profiler, iterbase, wall, cpu)
+
+    def _run_level(self, comps, ffd_order, case_id):
+        """Run a group of mutually independent components, executing as
+        many of them concurrently as possible."""
+        concurrent = []
+        local = []
+        for comp in comps:
+            if len(comps) > 1 and self._can_run_concurrently(comp):
+                concurrent.append(comp)
+            else:
+                local.append(comp)
+
+        # Transfer inputs and update validity in sequence order.
+        to_execute = []
+        for comp in concurrent:
+            force = comp.force_execute
+            comp._stop = False
+            comp.ffd_order = ffd_order
+            comp._case_id = case_id
+            try:
+                comp._pre_execute(force)
+                comp._set_exec_state('RUNNING')
+            except:
+                comp._set_exec_state('INVALID')
+                raise
+            if comp._call_execute or force:
+                to_execute.append(comp)
+
+        # If nothing else needs the main thread, one component is executed
+        # here while the others are running.
+        here = to_execute[-1] if to_execute and not local else None
+        profiler = profiling.PROFILER
+        exec_counts = [comp.exec_count for comp in to_execute]
+        results = [None if comp is here
+                        else self._start(comp, ffd_order, profiler is not None)
+                   for comp in to_execute]
+
+        # The remaining components are run here while the others execute.
+        # Wait for everything to finish before reporting any errors so that
+        # no component is still executing when we return.
+        errors = []
+        for comp in local:
+            try:
+                comp.run(ffd_order=ffd_order, case_id=case_id)
+            except Exception as exc:
+                errors.append(exc)
+                break
+
+        for comp, result, exec_count in zip(to_execute, results, exec_counts):
+            try:
+                if result is None:
+                    result = profiling.timed(comp._run_execute, ffd_order)
+                    outputs = None
+                else:
+                    result = result.get()
+                    outputs = result[0] if profiler is not None else result
+                if outputs is not None:
+                    for name, value in outputs:
+                        setattr(comp, name, value)
+            except Exception as exc:
+                comp._set_exec_state('INVALID')
+                errors.append(exc)
+            else:
+                if profiler is not None:
+                    profiler.record(comp.get_pathname(), result[1], result[2],
+                                    comp.exec_count - exec_count)
+                comp._post_execute()
+
+        for comp in concurrent:
+            if comp._exec_state != 'INVALID':
+                comp._post_run()
+
+        if errors:
+            raise errors[0]
+
+    def _can_run_concurrently(self, comp):
+        """Return True if `comp` may be executed outside the main thread."""
+        if not isinstance(comp, Component) or \
+           has_interface(comp, IDriver) or has_interface(comp, IAssembly):
+            return False
+        if not (comp.releases_gil or comp.run_in_process):
+            return False
+        if type(comp).run.im_func is not Component.run.im_func:
+            return False
+        return not comp.directory
+
+    def _start(self, comp, ffd_order, timed=False):
+        """Start executing `comp`, returning an `AsyncResult`. If `timed`,
+        the result is that of :func:`profiling.timed`."""
+        # A result cache must be updated in this process.
+        if comp.run_in_process and comp.result_cache is None:
+            outputs = comp.list_outputs()
+            if not [name for name in outputs
+                    if isinstance(getattr(comp, name), Container)]:
+                try:
+                    data = self._pickle(comp)
+                except Exception:
+                    pass  # Fall back to a thread.
+                else:
+                    if self._process_pool is None:
+                        self._process_pool = \
+                            multiprocessing.Pool(self.max_workers)
+                    args = (data, ffd_order, outputs)
+                    if timed:
+                        return self._process_pool.apply_async(
+                                   profiling.timed, (_execute_pickled,) + args)
+                    return self._process_pool.apply_async(_execute_pickled,
+                                                          args)
+
+        if self._thread_pool is None:
+            self._thread_pool = \
+                ThreadPool(self.max_workers or multiprocessing.cpu_count())
+        if timed:
+            return self._thread_pool.apply_async(profiling.timed,
+                                                 (comp._run_execute, ffd_order))
+        return self._thread_pool.apply_async(comp._run_execute, (ffd_order,))
+
+    @staticmethod
+    def _pickle(comp):
+        """Pickle `comp` without its parent."""
+        state = comp.__getstate__()
+        state['_parent'] = None
+        return cPickle.dumps((type(comp), state), cPickle.HIGHEST_PROTOCOL)
+
+    def _get_levels(self):
+        """Return the components grouped into levels where each component
+        only depends on components in earlier levels.
+        """
+        if self._levels is None:
+            topsort = self._get_topsort()
+            if self._duplicates:
+                # Duplicated components have no place in the graph.
+                self._levels = [[name] for name in topsort]
+            else:
+                # The ordering-only edges of the collapsed graph would
+                # serialize unconnected components.
+                graph = self._dependency_graph
+                depth = {}
+                levels = []
+                for name in topsort:
+                    preds = graph.predecessors(name)
+                    depth[name] = max([depth[p] + 1 for p in preds] or [0])
+                    if depth[name] == len(levels):
+                        levels.append([])
+                    levels[depth[name]].append(name)
+                # Keep the user's ordering within a level.
+                for level in levels:
+                    level.sort(key=self._names.index)
+                self._levels = levels
+        return self._levels
 
     def _get_topsort(self):
         if self._topsort is None:
@@ -125,6 +388,7 @@ class Dataflow(SequentialWorkflow):
                     if u != drv:
                         to_add.append((u, drv))
         collapsed_graph.add_edges_from(to_add)
+        self._dependency_graph = collapsed_graph.subgraph(cnames-removes)
         
         # now add some fake dependencies for degree 0 nodes in an attempt to
         # mimic a SequentialWorkflow in cases where nodes aren't connected.
@@ -8,7 +8,7 @@ __all__ = ["Array"]
 import logging
 
 # pylint: disable-msg=E0611,F0401
-from openmdao.units import PhysicalQuantity
+from openmdao.units import PhysicalQuantity, get_conversion_tuple
 
 from openmdao.main.attrwrapper import AttrWrapper, UnitsAttrWrapper
 from openmdao.main.index import get_indexed_value
@@ -127,7 +127,18 @@ class Array(TraitArray):
             
             value = value.value
             
+        return self._validate_value(obj, name, value)
+
+    def _validate_value(self, obj, name, value):
+        """Validates a value that has been converted to our units. If `obj`
+        is in complex step mode, complex arrays are allowed, and only their
+        real part is checked.
+        """
         try:
+            if isinstance(value, ndarray) and value.dtype.kind == 'c' and \
+               getattr(obj, '_complex_step', False):
+                super(Array, self).validate(obj, name, value.real)
+                return value
             return super(Array, self).validate(obj, name, value)
         except Exception:
             self.error(obj, name, value)
@@ -175,14 +186,13 @@ class Array(TraitArray):
         dst_units = self.units
 
         try:
-            pq = PhysicalQuantity(1.0, src_units)
-        except NameError:
-            raise NameError("while setting value of %s: undefined unit '%s'" %
-                            (src_units, name))
-        
-        try:
-            pq.convert_to_unit(dst_units)
+            factor, offset = get_conversion_tuple(src_units, dst_units)
         except NameError:
+            try:
+                PhysicalQuantity(1.0, src_units)
+            except NameError:
+                raise NameError("while setting value of %s: undefined unit '%s'" %
+                                (src_units, name))
             raise NameError("undefined unit '%s' for variable '%s'" %
                             (dst_units, name))
         except TypeError:
@@ -191,10 +201,11 @@ class Array(TraitArray):
             raise TypeError(msg)
         
         try:
-            value *= pq.value
-            return super(Array, self).validate(obj, name, value)
+            # don't convert in place, value may be the source array itself
+            value = (value + offset) * factor
         except Exception:
             self.error(obj, name, value)
+        return self._validate_value(obj, name, value)
 
     def get_attribute(self, name, value, trait, meta):
         """Return the attribute dictionary for this variable. This dict is
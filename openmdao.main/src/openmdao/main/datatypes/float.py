@@ -11,7 +11,7 @@ from sys import float_info
 # pylint: disable-msg=E0611,F0401
 from enthought.traits.api import Range
 from enthought.traits.api import Float as TraitFloat
-from openmdao.units import PhysicalQuantity
+from openmdao.units import PhysicalQuantity, get_conversion_tuple
 
 from openmdao.main.variable import Variable
 from openmdao.main.attrwrapper import AttrWrapper, UnitsAttrWrapper
@@ -120,7 +120,18 @@ class Float(Variable):
             value = value.value
         elif isinstance(value, UncertainDistribution):
             value = value.getvalue()
+        return self._validate_value(obj, name, value)
+
+    def _validate_value(self, obj, name, value):
+        """Validates a value that has been converted to our units. If `obj`
+        is in complex step mode, complex values are allowed, and only their
+        real part is checked.
+        """
         try:
+            if isinstance(value, complex) and \
+               getattr(obj, '_complex_step', False):
+                self._validator.validate(obj, name, value.real)
+                return value
             return self._validator.validate(obj, name, value)
         except Exception:
             self.error(obj, name, value)
@@ -186,20 +197,16 @@ class Float(Variable):
 
         # Note: benchmarking showed that this check does speed things up -- KTM
         if src_units == dst_units:
-            try:
-                return self._validator.validate(obj, name, value)
-            except Exception:
-                self.error(obj, name, value)
+            return self._validate_value(obj, name, value)
 
         try:
-            pq = PhysicalQuantity(value, src_units)
-        except NameError:
-            raise NameError("while setting value of %s: undefined unit '%s'" %
-                             (src_units, name))
-        
-        try:
-            pq.convert_to_unit(dst_units)
+            factor, offset = get_conversion_tuple(src_units, dst_units)
         except NameError:
+            try:
+                PhysicalQuantity(value, src_units)
+            except NameError:
+                raise NameError("while setting value of %s: undefined unit '%s'" %
+                                 (src_units, name))
             raise NameError("undefined unit '%s' for variable '%s'" %
                              (dst_units, name))
         except TypeError:
@@ -207,10 +214,7 @@ class Float(Variable):
                    "with assigning units of '%s'" % (dst_units)
             raise TypeError(msg)
         
-        try:
-            return self._validator.validate(obj, name, pq.value)
-        except Exception:
-            self.error(obj, name, pq.value)
+        return self._validate_value(obj, name, (value + offset) * factor)
 
     def get_attribute(self, name, value, trait, meta):
         """Return the attribute dictionary for this variable. This dict is
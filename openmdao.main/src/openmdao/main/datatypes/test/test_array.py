@@ -70,6 +70,15 @@ class ArrayTestCase(unittest.TestCase):
         self.assertAlmostEqual(2., self.hobj.arr2[1])
         self.assertAlmostEqual(4., self.hobj.arr2[2])
         
+    def test_offset_unit_conversion(self):
+        self.hobj.add('degc', Array(array([0., 100.]), iotype='out', units='degC'))
+        self.hobj.add('degf', Array(iotype='in', units='degF'))
+        self.hobj.degf = self.hobj.get_wrapped_attr('degc')
+        self.assertAlmostEqual(32., self.hobj.degf[0])
+        self.assertAlmostEqual(212., self.hobj.degf[1])
+        # source is not modified by the conversion
+        self.assertEqual(100., self.hobj.degc[1])
+        
     def test_bogus_units(self):
         try:
             uf = Array([0.], iotype='in', units='bogus')
@@ -145,6 +154,28 @@ class ArrayTestCase(unittest.TestCase):
         else:
             self.fail('ValueError expected')
             
+    def test_complex_step(self):
+        self.hobj.add('sh1', Array(array([[2.0, 4.5],[3.14, 2.5]]), iotype='in',
+                                   dtype=float, shape=(2,2)))
+        value = array([[1.0, 2.0], [3.0, 4.0]]) + 1.e-20j
+        
+        self.hobj.set_complex_step(True)
+        self.hobj.sh1 = value
+        self.assertEqual(self.hobj.sh1[1][1], 4.0+1.e-20j)
+        
+        # shape is still checked
+        try:
+            self.hobj.sh1 = array([[11.0, 2.0]])+1.e-20j
+        except ValueError, err:
+            msg = ": Variable 'sh1' must be an array-like object of shape (2, 2), but a shape of (1, 2) (<type 'numpy.ndarray'>) was specified."
+            self.assertEqual(str(err), msg)
+        else:
+            self.fail('ValueError expected')
+            
+        self.hobj.set_complex_step(False)
+        self.hobj.sh1 = value.real
+        self.assertEqual(self.hobj.sh1.dtype, float)
+            
     def test_flatten(self):
         a = array([[1,2],[3,4],[5,6]])
         self.assertEqual(flatten_obj('foo',a), 
@@ -2,7 +2,7 @@
 
 import unittest
 
-from openmdao.main.api import Container
+from openmdao.main.api import Container, Component
 from openmdao.main.datatypes.float import Float
 from openmdao.units import convert_units
 
@@ -133,6 +133,38 @@ class FloatTestCase(unittest.TestCase):
         else:
             self.fail('Exception expected')
 
+    def test_complex_step(self):
+        comp = Component()
+        comp.add('x', Float(1.0, low=0., high=2., iotype='in', units='ft'))
+        comp.add('y', Float(1.0, iotype='out', units='inch'))
+        
+        try:
+            comp.x = 1.5+1.e-20j
+        except ValueError, err:
+            self.assertEqual(str(err), 
+                ": Variable 'x' must be a float in the range [0.0, 2.0], but a value of (1.5+1e-20j) <type 'complex'> was specified.")
+        else:
+            self.fail('ValueError expected')
+            
+        comp.set_complex_step(True)
+        comp.x = 1.5+1.e-20j
+        self.assertEqual(comp.x, 1.5+1.e-20j)
+        
+        # unit conversion keeps the imaginary part
+        comp.y = 6.+1.e-20j
+        comp.x = comp.get_wrapped_attr('y')
+        self.assertAlmostEqual(comp.x.real, 0.5)
+        self.assertAlmostEqual(comp.x.imag, 1.e-20/12.)
+        
+        # bounds are checked using the real part
+        try:
+            comp.x = 3.+1.e-20j
+        except ValueError, err:
+            self.assertEqual(str(err), 
+                ": Variable 'x' must be a float in the range [0.0, 2.0], but a value of (3+1e-20j) <type 'complex'> was specified.")
+        else:
+            self.fail('ValueError expected')
+
     def test_constructor_defaults(self):
         
         self.hobj.add('float_nodefault1',
@@ -330,6 +330,13 @@ class Driver(Component):
         in this workflow."""
         self.workflow.calc_derivatives(first, second, savebase)
 
+    def set_complex_step(self, complex_step):
+        """ Turn complex step mode on or off for this driver and all
+        components in its workflow."""
+        super(Driver, self).set_complex_step(complex_step)
+        for comp in self.workflow.get_components():
+            comp.set_complex_step(complex_step)
+
     def check_derivatives(self, order, driver_inputs, driver_outputs):
         """ Check derivatives for all components in this workflow."""
         self.workflow.check_derivatives(order, driver_inputs, driver_outputs)
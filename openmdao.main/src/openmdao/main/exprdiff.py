@@ -0,0 +1,235 @@
+"""
+Symbolic differentiation of expression ASTs. Derivatives are returned
+as new ASTs, so they can be compiled along with the expression they came
+from instead of being reparsed from text on every evaluation.
+"""
+
+import ast
+import math
+
+from openmdao.main.printexpr import _get_long_name, ExprPrinter
+from openmdao.main.sym import SymbolicDerivativeError
+
+#public symbols
+__all__ = ["differentiate"]
+
+
+def _num(val):
+    return ast.Num(n=val)
+
+def _is_num(node, val=None):
+    return isinstance(node, ast.Num) and (val is None or node.n == val)
+
+def _neg(node):
+    if _is_num(node):
+        return _num(-node.n)
+    return ast.UnaryOp(op=ast.USub(), operand=node)
+
+def _add(left, right):
+    if _is_num(left, 0):
+        return right
+    if _is_num(right, 0):
+        return left
+    if _is_num(left) and _is_num(right):
+        return _num(left.n+right.n)
+    return ast.BinOp(left=left, op=ast.Add(), right=right)
+
+def _sub(left, right):
+    if _is_num(right, 0):
+        return left
+    if _is_num(left, 0):
+        return _neg(right)
+    if _is_num(left) and _is_num(right):
+        return _num(left.n-right.n)
+    return ast.BinOp(left=left, op=ast.Sub(), right=right)
+
+def _mul(left, right):
+    if _is_num(left, 0) or _is_num(right, 0):
+        return _num(0.)
+    if _is_num(left, 1):
+        return right
+    if _is_num(right, 1):
+        return left
+    if _is_num(left) and _is_num(right):
+        return _num(left.n*right.n)
+    return ast.BinOp(left=left, op=ast.Mult(), right=right)
+
+def _div(left, right):
+    if _is_num(left, 0):
+        return _num(0.)
+    if _is_num(right, 1):
+        return left
+    return ast.BinOp(left=left, op=ast.Div(), right=right)
+
+def _pow(left, right):
+    if _is_num(right, 1):
+        return left
+    return ast.BinOp(left=left, op=ast.Pow(), right=right)
+
+def _copy_tree(node):
+    # unlike copy.deepcopy, this doesn't preserve shared subtrees, so the
+    # result can be safely modified by a NodeTransformer
+    if isinstance(node, ast.AST):
+        new = node.__class__()
+        for name, value in ast.iter_fields(node):
+            setattr(new, name, _copy_tree(value))
+        return new
+    elif isinstance(node, list):
+        return [_copy_tree(n) for n in node]
+    return node
+
+def _call(prefix, fname, *args):
+    if prefix:
+        func = ast.Attribute(value=ast.Name(id=prefix, ctx=ast.Load()),
+                             attr=fname, ctx=ast.Load())
+    else:
+        func = ast.Name(id=fname, ctx=ast.Load())
+    return ast.Call(func=func, args=list(args), keywords=[],
+                    starargs=None, kwargs=None)
+
+
+# Each rule takes the module prefix of the original call ('', 'math' or
+# 'numpy') and the AST of the argument, and returns the AST of the
+# derivative of the function with respect to its argument.
+_funct_rules = {
+    'sin':   lambda p, x: _call(p, 'cos', x),
+    'cos':   lambda p, x: _neg(_call(p, 'sin', x)),
+    'tan':   lambda p, x: _div(_num(1.), _pow(_call(p, 'cos', x), _num(2))),
+    'exp':   lambda p, x: _call(p, 'exp', x),
+    'expm1': lambda p, x: _call(p, 'exp', x),
+    'log':   lambda p, x: _div(_num(1.), x),
+    'log1p': lambda p, x: _div(_num(1.), _add(_num(1.), x)),
+    'log10': lambda p, x: _div(_num(1./math.log(10.)), x),
+    'sqrt':  lambda p, x: _div(_num(0.5), _call(p, 'sqrt', x)),
+    'sinh':  lambda p, x: _call(p, 'cosh', x),
+    'cosh':  lambda p, x: _call(p, 'sinh', x),
+    'tanh':  lambda p, x: _div(_num(1.), _pow(_call(p, 'cosh', x), _num(2))),
+    'asin':  lambda p, x: _div(_num(1.), _call(p, 'sqrt', _sub(_num(1.), _pow(x, _num(2))))),
+    'acos':  lambda p, x: _div(_num(-1.), _call(p, 'sqrt', _sub(_num(1.), _pow(x, _num(2))))),
+    'atan':  lambda p, x: _div(_num(1.), _add(_num(1.), _pow(x, _num(2)))),
+    'fabs':  lambda p, x: _call(p or 'math', 'copysign', _num(1.), x),
+    'abs':   lambda p, x: _call(p or 'math', 'copysign', _num(1.), x),
+}
+# numpy spellings
+_funct_rules['arcsin'] = _funct_rules['asin']
+_funct_rules['arccos'] = _funct_rules['acos']
+_funct_rules['arctan'] = _funct_rules['atan']
+_funct_rules['absolute'] = _funct_rules['abs']
+
+
+class _Differentiator(object):
+    """Builds the AST of the derivative of an expression AST with respect
+    to one of the variables it references.  A variable is a node whose
+    text is one of *refs*.  Any other name is assumed to be a constant.
+    """
+    def __init__(self, wrt, refs):
+        self.wrt = wrt
+        self.refs = refs
+
+    def diff(self, node):
+        method = getattr(self, 'diff_' + node.__class__.__name__, None)
+        if method is None:
+            raise SymbolicDerivativeError("can't differentiate '%s' nodes"
+                                          % node.__class__.__name__)
+        return method(node)
+
+    def _ref_diff(self, name):
+        if name == self.wrt:
+            return _num(1.)
+        return _num(0.)
+
+    def diff_Num(self, node):
+        return _num(0.)
+
+    def diff_Name(self, node):
+        return self._ref_diff(node.id)
+
+    def diff_Attribute(self, node):
+        name = _get_long_name(node)
+        if name is None:
+            raise SymbolicDerivativeError("can't differentiate attribute '%s'"
+                                          % node.attr)
+        return self._ref_diff(name)
+
+    def diff_Subscript(self, node):
+        printer = ExprPrinter()
+        printer.visit(node)
+        name = printer.get_text()
+        if name not in self.refs:
+            raise SymbolicDerivativeError("can't differentiate '%s'" % name)
+        return self._ref_diff(name)
+
+    def diff_UnaryOp(self, node):
+        if isinstance(node.op, ast.UAdd):
+            return self.diff(node.operand)
+        elif isinstance(node.op, ast.USub):
+            return _neg(self.diff(node.operand))
+        raise SymbolicDerivativeError("can't differentiate '%s'"
+                                      % node.op.__class__.__name__)
+
+    def diff_IfExp(self, node):
+        return ast.IfExp(test=node.test, body=self.diff(node.body),
+                         orelse=self.diff(node.orelse))
+
+    def diff_BinOp(self, node):
+        left, right = node.left, node.right
+        dleft, dright = self.diff(left), self.diff(right)
+        if isinstance(node.op, ast.Add):
+            return _add(dleft, dright)
+        elif isinstance(node.op, ast.Sub):
+            return _sub(dleft, dright)
+        elif isinstance(node.op, ast.Mult):
+            return _add(_mul(dleft, right), _mul(left, dright))
+        elif isinstance(node.op, ast.Div):
+            if _is_num(dright, 0):
+                return _div(dleft, right)
+            return _div(_sub(_mul(dleft, right), _mul(left, dright)),
+                        _pow(right, _num(2)))
+        elif isinstance(node.op, ast.Pow):
+            return self._pow_diff(left, right, dleft, dright)
+        raise SymbolicDerivativeError("can't differentiate '%s'"
+                                      % node.op.__class__.__name__)
+
+    def _pow_diff(self, base, expon, dbase, dexpon):
+        if _is_num(dexpon, 0):
+            return _mul(_mul(expon, _pow(base, _sub(expon, _num(1)))), dbase)
+        # d(a**b) = a**b * (b'*log(a) + b*a'/a)
+        return _mul(_pow(base, expon),
+                    _add(_mul(dexpon, _call('', 'log', base)),
+                         _div(_mul(expon, dbase), base)))
+
+    def diff_Call(self, node):
+        name = _get_long_name(node.func)
+        if name is None or name in self.refs or node.keywords or \
+           node.starargs or node.kwargs:
+            raise SymbolicDerivativeError("can't differentiate call to '%s'"
+                                          % name)
+        dargs = [self.diff(arg) for arg in node.args]
+        if all([_is_num(darg, 0) for darg in dargs]):
+            return _num(0.)
+
+        prefix, _, fname = name.rpartition('.')
+        if prefix not in ('', 'math', 'numpy'):
+            raise SymbolicDerivativeError("can't differentiate call to '%s'"
+                                          % name)
+        if fname in ('pow', 'power') and len(node.args) == 2:
+            return self._pow_diff(node.args[0], node.args[1],
+                                  dargs[0], dargs[1])
+        rule = _funct_rules.get(fname)
+        if rule is None or len(node.args) != 1:
+            raise SymbolicDerivativeError("can't differentiate call to '%s'"
+                                          % name)
+        return _mul(rule(prefix, node.args[0]), dargs[0])
+
+
+def differentiate(node, wrt, refs):
+    """Return the AST of the derivative of the expression AST *node* with
+    respect to the variable *wrt*. *refs* contains the text of all of the
+    variables referenced by the expression, including any array indices.
+    Raises a SymbolicDerivativeError if the expression contains something
+    that can't be differentiated.
+
+    The returned AST assumes true division, so it should be compiled with
+    the __future__ division flag.
+    """
+    return _copy_tree(_Differentiator(wrt, refs).diff(node))
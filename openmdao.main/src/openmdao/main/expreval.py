@@ -9,12 +9,15 @@ import ast
 import copy
 import re
 import __builtin__
+import __future__
+from operator import attrgetter
 
 from openmdao.main.printexpr import _get_attr_node, _get_long_name, transform_expression, ExprPrinter
 from openmdao.util.nameutil import partition_names_by_comp
 from openmdao.main.index import INDEX, ATTR, CALL, SLICE
 
-from openmdao.main.sym import SymGrad, SymbolicDerivativeError
+from openmdao.main.sym import SymbolicDerivativeError
+from openmdao.main.exprdiff import differentiate
 
 def _import_functs(mod, dct, names=None):
     if names is None:
@@ -221,6 +224,41 @@ class ExprTransformer(ast.NodeTransformer):
             return ast.Assign(targets=[lhs], value=rhs)
         return lhs
 
+class _FastExprTransformer(ast.NodeTransformer):
+    """Transforms dotted name references in an expression AST into local
+    placeholder names, e.g., abc.d.g[3]+x.y(2) becomes _v0[3]+_v1(2), so that
+    the values of the references can be supplied directly in the locals dict
+    passed to eval(). Indexing, attribute access and calls on the referenced
+    objects are left as ordinary python. The list of (placeholder, name)
+    tuples is kept in *refs*. If an existing *refs* list is given, it will be
+    extended, so the same placeholders can be shared by more than one AST.
+    """
+    def __init__(self, expreval, refs=None):
+        self.expreval = expreval
+        self.refs = [] if refs is None else refs
+        self._placeholders = dict([(name, pname) for pname, name in self.refs])
+        super(_FastExprTransformer, self).__init__()
+
+    def _name_to_node(self, node, name):
+        if self.expreval.is_local(name):
+            return node
+        pname = self._placeholders.get(name)
+        if pname is None:
+            pname = '_v%d' % len(self.refs)
+            self._placeholders[name] = pname
+            self.refs.append((pname, name))
+        return ast.copy_location(ast.Name(id=pname, ctx=ast.Load()), node)
+
+    def visit_Name(self, node):
+        return self._name_to_node(node, node.id)
+
+    def visit_Attribute(self, node):
+        long_name = _get_long_name(node)
+        if long_name is None:
+            return self.generic_visit(node)
+        return self._name_to_node(node, long_name)
+
+
 class ExprExaminer(ast.NodeVisitor):
     """"Examines various properties of an expression for later analysis."""
     def __init__(self, node, evaluator=None):
@@ -389,7 +427,8 @@ class ExprEvaluator(object):
     @text.setter
     def text(self, value):
         self._code = self._assignment_code = None
-        self._examiner = self.cached_grad_eq = None
+        self._fast_code = self._accessors = None
+        self._examiner = self._grad_code = None
         self._text = value
 
     @property
@@ -406,7 +445,8 @@ class ExprEvaluator(object):
     def scope(self, value):
         if value is not self.scope:
             self._code = self._assignment_code = None
-            self._examiner = self.cached_grad_eq = None
+            self._fast_code = self._accessors = None
+            self._examiner = self._grad_code = None
             if value is not None:
                 self._scope = weakref.ref(value)
             else:
@@ -441,11 +481,14 @@ class ExprEvaluator(object):
         state['_code'] = None  # <type 'code'> won't pickle either.
         if state.get('_assignment_code'):
             state['_assignment_code'] = None # more unpicklable <type 'code'>
+        # accessors hold direct references into the scope, so just rebuild them
+        state['_fast_code'] = state['_accessors'] = state['_grad_code'] = None
         return state
 
     def __setstate__(self, state):
         """Restore this component's state."""
         self.__dict__.update(state)
+        self._fast_code = self._accessors = self._grad_code = None
         if self._scope is not None:
             self._scope = weakref.ref(self._scope)
 
@@ -508,6 +551,105 @@ class ExprEvaluator(object):
         
         return new_ast
     
+    def _parse_fast(self):
+        """Compile a version of our expression where each variable reference
+        is replaced by a local placeholder. Returns False if the expression
+        can't be evaluated that way, e.g., it's an assignment or it uses a
+        getter other than 'get'.
+        """
+        if self.getter != 'get':
+            return False
+        root = self._pre_parse()
+        if not isinstance(root, ast.Expression):
+            return False
+        transformer = _FastExprTransformer(self)
+        new_ast = transformer.visit(root)
+        ast.fix_missing_locations(new_ast)
+        self._fast_refs = transformer.refs
+        return compile(new_ast, '<string>', 'eval')
+
+    def _parse_grad(self, inputs):
+        """Differentiate our expression symbolically with respect to each of
+        the given inputs and compile the results into a single tuple
+        expression that shares the placeholders of our fast code. Returns
+        False if that can't be done.
+        """
+        if self._fast_code is None:
+            self._fast_code = self._parse_fast()
+        if not self._fast_code:
+            return False
+        root = self._pre_parse()
+        try:
+            derivs = [differentiate(root.body, name, inputs) for name in inputs]
+        except SymbolicDerivativeError:
+            return False
+        nrefs = len(self._fast_refs)
+        transformer = _FastExprTransformer(self, self._fast_refs)
+        new_ast = transformer.visit(ast.Expression(body=ast.Tuple(elts=derivs,
+                                                                  ctx=ast.Load())))
+        if len(self._fast_refs) > nrefs:
+            self._accessors = None
+        ast.fix_missing_locations(new_ast)
+        return compile(new_ast, '<string>', 'eval', __future__.division.compiler_flag)
+
+    def _bind_accessors(self, scope, version):
+        """Return a list of (placeholder, owner, getter) tuples, one for each
+        variable referenced in our expression, or False if the scope can't
+        be accessed directly.  Owners are resolved through child Components
+        that were added to the scope. Replacing any of those results in a
+        call to config_changed() on the scope, so the accessors stay valid
+        until the config version of the scope changes. Anything below that
+        is looked up via getattr() on each evaluation, just as Container.get()
+        would do.
+        """
+        # avoid circular imports
+        from openmdao.main.container import Container
+        from openmdao.main.component import Component
+        from openmdao.main.datatypes.slot import Slot
+
+        def _has_default_get(obj):
+            return isinstance(obj, Container) and \
+                   type(obj).get.im_func is Container.get.im_func
+
+        if not _has_default_get(scope):
+            return False
+
+        accessors = []
+        for pname, name in self._fast_refs:
+            parts = name.split('.')
+            owner = scope
+            if version is not None:
+                while len(parts) > 1:
+                    child = getattr(owner, parts[0], None)
+                    if not (isinstance(child, Component) and _has_default_get(child)
+                            and child.parent is owner):
+                        break
+                    # Slots can be set without notifying anybody
+                    if owner.trait(parts[0]).is_trait_type(Slot):
+                        break
+                    owner = child
+                    parts = parts[1:]
+            accessors.append((pname, owner, attrgetter('.'.join(parts))))
+        return accessors
+
+    def _fast_locals(self, scope):
+        """Return a dict mapping each placeholder in our fast code to the
+        current value of the variable it refers to, or None if the fast
+        path can't be used.
+        """
+        version = getattr(scope, '_config_version', None)
+        if self._accessors is None or version != self._accessor_version:
+            self._accessors = self._bind_accessors(scope, version)
+            self._accessor_version = version
+        if not self._accessors:
+            return None if self._accessors is False else {}
+        try:
+            return dict([(pname, getter(owner))
+                           for pname, owner, getter in self._accessors])
+        except Exception:
+            # let the normal path report the problem
+            return None
+
     def _get_updated_scope(self, scope):
         if scope is not None:
             self.scope = scope
@@ -523,6 +665,12 @@ class ExprEvaluator(object):
         try:
             if self._code is None:
                 self._parse()
+            if self._fast_code is None:
+                self._fast_code = self._parse_fast()
+            if self._fast_code:
+                fast_locals = self._fast_locals(scope)
+                if fast_locals is not None:
+                    return eval(self._fast_code, _expr_dict, fast_locals)
             return eval(self._code, _expr_dict, locals())
         except Exception, err:
             raise type(err)("can't evaluate expression "+
@@ -543,8 +691,8 @@ class ExprEvaluator(object):
     
     def evaluate_gradient(self, stepsize=1.0e-6, wrt=None, scope=None):
         """Return a dict containing the gradient of the expression with respect to 
-        each of the referenced varpaths. The gradient is calculated by 1st order central
-        difference for now. 
+        each of the referenced varpaths. The gradient is calculated symbolically
+        if possible, otherwise by 1st order central difference.
         
         stepsize: float
             Step size for finite difference.
@@ -563,8 +711,24 @@ class ExprEvaluator(object):
             wrt = [wrt]
                 
         gradient = {}
-        if self.cached_grad_eq is None:
-            self.cached_grad_eq = {}
+        
+        # First time, try to differentiate symbolically. All of the partial
+        # derivatives are compiled into one code object, so after that the
+        # whole gradient takes just a single eval.
+        if self._grad_code is None:
+            self._grad_inputs = inputs
+            self._grad_code = self._parse_grad(inputs)
+            
+        derivs = None
+        if self._grad_code:
+            fast_locals = self._fast_locals(scope)
+            if fast_locals is not None:
+                try:
+                    derivs = dict(zip(self._grad_inputs, 
+                                      eval(self._grad_code, _expr_dict, fast_locals)))
+                except Exception:
+                    # e.g., a singularity; finite difference may still work
+                    derivs = None
 
         for var in wrt:
 
@@ -581,34 +745,8 @@ class ExprEvaluator(object):
                 gradient[var] = 0.0
                 continue
             
-            # First time, try to differentiate symbolically
-            if (var not in self.cached_grad_eq) or self._code is None:
-                
-                #Take symbolic gradient of all inputs using sympy
-                try:
-                    for varname, expression in zip(inputs, SymGrad(self.text, inputs)):
-                        self.cached_grad_eq[varname] = expression
-
-                except SymbolicDerivativeError, NameError:
-                    self.cached_grad_eq[var] = False
-
-            # If we have a cached gradient expression:
-            if self.cached_grad_eq[var]:
-                
-                # This is not the way I wanted to do it, but I didn't want
-                # to mess with everything that's is in self._parse
-                grad_text = self.cached_grad_eq[var]
-                for name in inputs:
-                    if '[' in name:
-                        new_expr = ExprEvaluator(name, scope)
-                        replace_val = new_expr.evaluate()
-                    else:
-                        replace_val = scope.get(name)
-                    grad_text = grad_text.replace(name, str(replace_val))
-                
-                grad_root = ast.parse(grad_text, mode='eval')
-                grad_code = compile(grad_root, '<string>', 'eval')
-                gradient[var] = eval(grad_code, _expr_dict, locals())
+            if derivs is not None:
+                gradient[var] = derivs[var]
                 
             # Otherwise resort to finite difference (1st order central)
             else:
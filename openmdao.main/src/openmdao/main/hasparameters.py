@@ -158,6 +158,11 @@ class Parameter(object):
         """Assigns the given value to the variable referenced by this parameter."""
         self._expreval.set(self._transform(val), scope)
 
+    def add_to_case(self, case, val):
+        """Adds the given value to `case` as an input for the variable
+        referenced by this parameter."""
+        case.add_input(self.target, self._transform(val))
+
     def get_metadata(self, metaname=None):
         """Returns a list of tuples of the form (varname, metadata), with one
         entry for each variable referenced by the parameter expression. The
@@ -239,6 +244,11 @@ class ParameterGroup(object):
         for p in self._params: 
             p.set(value, scope)
 
+    def add_to_case(self, case, value):
+        """Adds the given value to `case` as an input for all targets."""
+        for p in self._params:
+            p.add_to_case(case, value)
+
     def evaluate(self, scope=None):
         """Return the value of the first parameter in our target list. Values
         of all of our targets are assumed to be the same.
@@ -533,15 +543,15 @@ class HasParameters(object):
         case: Case (optional)
             If supplied, the values will be associated with their corresponding
             targets and added as inputs to the Case instead of being set directly
-            into the model.
+            into the model. Like values set into the model, they are scaled by
+            the parameter's scaler and adder.
         """
 
         param = self._parameters[name]
         if case is None:
             param.set(value, self._get_scope(scope))
         else:
-            for target in param.targets:
-                case.add_input(target, value)
+            param.add_to_case(case, value)
             return case
 
     def set_parameters(self, values, case=None, scope=None): 
@@ -557,7 +567,8 @@ class HasParameters(object):
         case: Case (optional)
             If supplied, the values will be associated with their corresponding
             targets and added as inputs to the Case instead of being set directly
-            into the model.
+            into the model. Like values set into the model, they are scaled by
+            the parameter's scaler and adder.
         """
         if len(values) != len(self._parameters):
             raise ValueError("number of input values (%s) != number of parameters (%s)" % 
@@ -567,9 +578,8 @@ class HasParameters(object):
             for val, param in zip(values, self._parameters.values()):
                 param.set(val, self._get_scope(scope))
         else:
-            for val, parameter in zip(values, self._parameters.values()):
-                for target in parameter.targets:
-                    case.add_input(target, val)
+            for val, param in zip(values, self._parameters.values()):
+                param.add_to_case(case, val)
             return case
 
     def get_expr_depends(self):
@@ -425,6 +425,9 @@ class ICaseRecorder(Interface):
     def get_iterator():
         """Return an iterator that matches the format that this recorder uses."""
 
+    def flush():
+        """Write any buffered Cases to this recorder's storage."""
+
     def close():
         """Perform any operations required to shut-down this recorder."""
 
@@ -563,6 +566,17 @@ class ISurrogate(Interface):
             which corresponds to the training case input history given by X.
         """
 
+    def update(x, y):
+        """Optional. Adds a single training point to an already trained
+        surrogate model without retraining it from scratch. Surrogates that
+        don't provide this method are retrained on the full training set.
+
+        x: list
+            Input values of the new training point.
+        y: float
+            Output value of the new training point.
+        """
+
 
 class IHasParameters(Interface):
 
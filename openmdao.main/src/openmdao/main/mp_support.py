@@ -57,6 +57,8 @@ from multiprocessing.managers import BaseManager, BaseProxy, RebuildProxy, \
 if sys.platform == 'win32':  #pragma no cover
     from _multiprocessing import win32
 
+from Crypto import Random
+
 from enthought.traits.trait_handlers import TraitDictObject
 
 from openmdao.main.interfaces import obj_has_interface
@@ -1013,6 +1015,10 @@ class OpenMDAO_Manager(BaseManager):
         Create a server, report its address and public key, and run it.
         """
         try:
+            # PyCrypto's random number generator must be reinitialized in
+            # a forked process.
+            Random.atfork()
+
             if sys.platform == 'win32':
                 set_credentials(credentials)
                 # Recreate registry proxytypes.
@@ -0,0 +1,254 @@
+"""
+Opt-in profiling of model execution. While a :class:`Profiler` is enabled,
+every Component run records its wall and CPU time, the time spent
+transferring its inputs (``update_inputs``), how often it was run and how
+often it actually executed, keyed on its pathname. Each run of a Driver's
+workflow (one iteration of that Driver) is recorded as well::
+
+    profiler = enable_profiling()
+    top.run()
+    disable_profiling()
+    print profiler.report(limit=10)
+    profiler.dump_collapsed('model.folded')
+
+The collapsed stack file can be turned into a flame graph with
+``flamegraph.pl model.folded > model.svg`` or loaded into speedscope.
+
+CPU time is that of the whole process, so components that are executed
+concurrently (see :class:`Dataflow`) are charged for each other's work.
+"""
+
+import os
+import sys
+import threading
+import time
+
+#public symbols
+__all__ = ['Profiler', 'enable_profiling', 'disable_profiling']
+
+# The active Profiler, if any.
+PROFILER = None
+
+if sys.platform == 'win32':
+    def cpu_time():
+        """Return the CPU time used by this process."""
+        times = os.times()
+        return times[0] + times[1]
+else:
+    cpu_time = time.clock
+
+
+def enable_profiling(profiler=None):
+    """
+    Start recording with `profiler`, or a new :class:`Profiler` if None.
+    Returns the profiler.
+    """
+    global PROFILER
+    if profiler is None:
+        profiler = Profiler()
+    PROFILER = profiler
+    return profiler
+
+
+def disable_profiling():
+    """ Stop recording. Returns the profiler that was active, if any. """
+    global PROFILER
+    profiler = PROFILER
+    PROFILER = None
+    return profiler
+
+
+def timed(func, *args):
+    """Call `func` with `args`, returning its result along with the wall and
+    CPU time it took. Used for work done outside the profiled thread."""
+    wall = time.time()
+    cpu = cpu_time()
+    result = func(*args)
+    return (result, time.time() - wall, cpu_time() - cpu)
+
+
+class Profiler(object):
+    """
+    Accumulates execution statistics. The framework calls :meth:`start`
+    and :meth:`stop` around each Component run, so the nesting of runs
+    (assembly, driver, component) is known and the time spent in each can be
+    split into the time spent in the component itself and in the runs it
+    contains.
+
+    Statistics are kept per pathname (the top Assembly is ``''``) as a dict
+    with the following entries:
+
+    calls
+        Number of runs.
+
+    executions
+        Number of times the component actually executed (runs of a valid
+        component and outputs restored from a ResultCache don't count).
+
+    wall, cpu
+        Total time spent in the component's runs, including the runs they
+        contain.
+
+    self_wall, self_cpu
+        The same, excluding the runs they contain.
+
+    transfers, transfer_wall
+        Number of ``update_inputs`` calls made for the component and the
+        total time spent in them (included in the component's wall and CPU
+        time, but not in its self time).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.clear()
+
+    def clear(self):
+        """ Discard all statistics. """
+        with self._lock:
+            self._stats = {}
+            self._iterations = {}
+            self._stacks = {}
+
+    def _frames(self):
+        """Return the stack of running frames for the current thread."""
+        try:
+            return self._local.frames
+        except AttributeError:
+            self._local.frames = frames = []
+            return frames
+
+    def start(self, name):
+        """ Start timing `name`, nested in the current run. """
+        self._frames().append([name, time.time(), cpu_time(), 0., 0.])
+
+    def _pop(self):
+        """Finish the most recently started frame. Returns its stack and its
+        total and self wall and CPU times."""
+        frames = self._frames()
+        name, wall, cpu, child_wall, child_cpu = frames.pop()
+        wall = time.time() - wall
+        cpu = cpu_time() - cpu
+        if frames:
+            frames[-1][3] += wall
+            frames[-1][4] += cpu
+        stack = tuple([frame[0] for frame in frames]) + (name,)
+        return (stack, wall, cpu, wall - child_wall, cpu - child_cpu)
+
+    def stop(self, pathname, executions=0):
+        """ Finish timing a run of the component at `pathname`, which
+        executed `executions` times. """
+        stack, wall, cpu, self_wall, self_cpu = self._pop()
+        with self._lock:
+            self._add_stack(stack, self_wall, self_cpu)
+            stats = self._get_stats(pathname)
+            stats['calls'] += 1
+            stats['executions'] += executions
+            stats['wall'] += wall
+            stats['cpu'] += cpu
+            stats['self_wall'] += self_wall
+            stats['self_cpu'] += self_cpu
+
+    def stop_transfer(self, pathname):
+        """ Finish timing an ``update_inputs`` call for the component at
+        `pathname`. """
+        stack, wall, cpu, self_wall, self_cpu = self._pop()
+        with self._lock:
+            self._add_stack(stack, self_wall, self_cpu)
+            stats = self._get_stats(pathname)
+            stats['transfers'] += 1
+            stats['transfer_wall'] += wall
+
+    def record(self, pathname, wall, cpu, executions=1):
+        """ Record a run of the component at `pathname` that was timed
+        elsewhere (in another thread or process), nested in the current run.
+        """
+        frames = self._frames()
+        if frames:
+            frames[-1][3] += wall
+            frames[-1][4] += cpu
+        stack = tuple([frame[0] for frame in frames]) + (pathname,)
+        with self._lock:
+            self._add_stack(stack, wall, cpu)
+            stats = self._get_stats(pathname)
+            stats['calls'] += 1
+            stats['executions'] += executions
+            stats['wall'] += wall
+            stats['cpu'] += cpu
+            stats['self_wall'] += wall
+            stats['self_cpu'] += cpu
+
+    def record_iteration(self, pathname, itername, wall, cpu):
+        """ Record one run of the workflow of the Driver at `pathname`, with
+        iteration coordinate `itername`. """
+        with self._lock:
+            self._iterations.setdefault(pathname, []).append((itername,
+                                                              wall, cpu))
+
+    def _get_stats(self, pathname):
+        try:
+            return self._stats[pathname]
+        except KeyError:
+            stats = dict(calls=0, executions=0, wall=0., cpu=0.,
+                         self_wall=0., self_cpu=0., transfers=0,
+                         transfer_wall=0.)
+            self._stats[pathname] = stats
+            return stats
+
+    def _add_stack(self, stack, wall, cpu):
+        try:
+            times = self._stacks[stack]
+        except KeyError:
+            self._stacks[stack] = [wall, cpu]
+        else:
+            times[0] += wall
+            times[1] += cpu
+
+    def stats(self, pathname=None):
+        """ Return a copy of the statistics for the component at
+        `pathname`, or a dict of them keyed on pathname if `pathname` is
+        None. """
+        with self._lock:
+            if pathname is not None:
+                return dict(self._stats[pathname])
+            return dict([(path, dict(stats))
+                         for path, stats in self._stats.items()])
+
+    def iterations(self, pathname):
+        """ Return a list of (iteration coordinate, wall time, CPU time)
+        for each recorded iteration of the Driver at `pathname`. """
+        with self._lock:
+            return list(self._iterations.get(pathname, []))
+
+    def report(self, sort='self_wall', limit=None):
+        """ Return a table of the statistics as a string, sorted on `sort`
+        in decreasing order and cut off after `limit` rows. """
+        rows = sorted(self.stats().items(),
+                      key=lambda item: item[1][sort], reverse=True)
+        if limit is not None:
+            rows = rows[:limit]
+        lines = ['%-40s %8s %8s %10s %10s %10s %10s' \
+                 % ('pathname', 'calls', 'execs', 'wall', 'self_wall',
+                    'self_cpu', 'transfer')]
+        for pathname, stats in rows:
+            lines.append('%-40s %8d %8d %10.4f %10.4f %10.4f %10.4f'
+                         % (pathname or '<top>', stats['calls'],
+                            stats['executions'], stats['wall'],
+                            stats['self_wall'], stats['self_cpu'],
+                            stats['transfer_wall']))
+        return '\n'.join(lines)
+
+    def dump_collapsed(self, filename, cpu=False):
+        """ Write the self time of each stack of runs to `filename` in
+        microseconds, in the 'collapsed' format read by flame graph tools:
+        one line per stack with its semicolon-separated frame names and the
+        time. Uses CPU time rather than wall time if `cpu` is True. """
+        index = 1 if cpu else 0
+        with self._lock:
+            items = sorted(self._stacks.items())
+        with open(filename, 'w') as out:
+            for stack, times in items:
+                usecs = int(round(times[index] * 1e6))
+                if usecs > 0:
+                    names = [name or '<top>' for name in stack]
+                    out.write('%s %d\n' % (';'.join(names), usecs))
@@ -0,0 +1,167 @@
+"""
+A cache of Component results keyed on the values of the Component's inputs,
+so a Component re-run with inputs it has already seen (by an optimizer's
+line search, a finite difference base point, ...) can restore its outputs
+instead of executing again.
+"""
+
+import copy
+import cPickle
+import hashlib
+import os
+
+import ordereddict
+
+try:
+    from numpy import ndarray
+except ImportError as err:
+    import logging
+    logging.warn("In %s: %r", __file__, err)
+    from openmdao.main.numpy_fallback import ndarray
+
+from openmdao.main.container import Container
+
+#public symbols
+__all__ = ["ResultCache"]
+
+
+class ResultCache(object):
+    """
+    Holds the outputs of up to `maxsize` runs of a Component, discarding the
+    least recently used entries first. To use it, assign one to the
+    Component's `result_cache` attribute::
+
+        comp.result_cache = ResultCache(maxsize=100)
+
+    maxsize: int
+        Maximum number of entries kept. Zero or None means unlimited.
+
+    filename: string
+        If given, entries are appended to this file as they are added and
+        are read back when the cache is created, so results survive from one
+        session to the next. The file is rewritten without discarded entries
+        whenever it holds more than twice `maxsize` of them. A truncated
+        file (from an interrupted session, say) is read up to its last
+        complete entry.
+
+    Components with Container (Slot or VariableTree) inputs or outputs
+    are never cached. Framework variables such as `exec_count` and
+    `directory` are neither part of the key nor restored.
+    """
+
+    def __init__(self, maxsize=100, filename=None):
+        self.maxsize = maxsize
+        self.filename = filename
+        self.hits = 0
+        self.misses = 0
+        self._entries = ordereddict.OrderedDict()
+        self._file_count = 0  # Entries written to our file.
+        if filename and os.path.exists(filename):
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def stats(self):
+        """Return a dict with the number of hits, misses and entries."""
+        return dict(hits=self.hits, misses=self.misses,
+                    size=len(self._entries))
+
+    def clear(self):
+        """Remove all entries and reset statistics. A cache file is
+        truncated."""
+        self._entries.clear()
+        self.hits = self.misses = 0
+        if self.filename:
+            open(self.filename, 'wb').close()
+            self._file_count = 0
+
+    def make_key(self, comp):
+        """Return the key for the current inputs of `comp`, or None if it
+        can't be cached."""
+        items = []
+        for name in sorted(comp.list_inputs()):
+            if comp.get_trait(name).framework_var:
+                continue
+            val = getattr(comp, name)
+            if isinstance(val, Container):
+                return None
+            if isinstance(val, ndarray):
+                val = (val.dtype.str, val.shape, val.tostring())
+            items.append((name, val))
+        cls = type(comp)
+        try:
+            data = cPickle.dumps((cls.__module__, cls.__name__, items),
+                                 cPickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None
+        return hashlib.sha1(data).hexdigest()
+
+    def restore(self, comp, key):
+        """Set the outputs of `comp` from the entry for `key`. Returns False
+        if there is no such entry."""
+        try:
+            outputs = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return False
+        self._entries[key] = outputs  # Now the most recently used.
+        self.hits += 1
+        for name, val in outputs:
+            setattr(comp, name, copy.deepcopy(val))
+        return True
+
+    def store(self, comp, key):
+        """Save the current outputs of `comp` under `key`."""
+        outputs = []
+        for name in comp.list_outputs():
+            if comp.get_trait(name).framework_var:
+                continue
+            val = getattr(comp, name)
+            if isinstance(val, Container):
+                return
+            outputs.append((name, copy.deepcopy(val)))
+        self._add(key, outputs)
+        if self.filename:
+            if self.maxsize and self._file_count >= 2*self.maxsize:
+                self._write()
+            else:
+                with open(self.filename, 'ab') as out:
+                    cPickle.dump((key, outputs), out,
+                                 cPickle.HIGHEST_PROTOCOL)
+                self._file_count += 1
+
+    def _add(self, key, outputs):
+        self._entries.pop(key, None)
+        self._entries[key] = outputs
+        if self.maxsize:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _load(self):
+        """Read entries from our file, then rewrite it if it holds
+        entries that have since been discarded or is truncated."""
+        end = 0  # End of the last complete entry.
+        with open(self.filename, 'rb') as inp:
+            while True:
+                try:
+                    key, outputs = cPickle.load(inp)
+                except (EOFError, cPickle.UnpicklingError, ValueError,
+                        IndexError, TypeError):
+                    break
+                end = inp.tell()
+                self._add(key, outputs)
+                self._file_count += 1
+        if end < os.path.getsize(self.filename) or \
+           self._file_count > len(self._entries):
+            self._write()
+
+    def _write(self):
+        """Rewrite our file with just the current entries."""
+        with open(self.filename, 'wb') as out:
+            for item in self._entries.items():
+                cPickle.dump(item, out, cPickle.HIGHEST_PROTOCOL)
+        self._file_count = len(self._entries)
@@ -13,9 +13,26 @@ except ImportError as err:
     logging.warn("In %s: %r", __file__, err)
     from openmdao.main.numpy_fallback import ndarray, zeros
 
+try:
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.linalg import gmres, LinearOperator
+except ImportError as err:
+    import logging
+    logging.warn("In %s: %r", __file__, err)
+
 __all__ = ['SequentialWorkflow']
 
 
+def _restore_views(results, views):
+    """Copy any values a component stored in `results` in place of our views
+    back into the views."""
+    for key, view in views:
+        val = results[key]
+        if val is not view:
+            view[:] = flattened_value(key, val)
+            results[key] = view
+
+
 class SequentialWorkflow(Workflow):
     """A Workflow that is a simple sequence of components."""
 
@@ -27,7 +44,11 @@ class SequentialWorkflow(Workflow):
         # Bookkeeping for calculating the residual.
         self._severed_edges = None
         self.res = None
-        self.bounds = None        
+        self.bounds = None
+
+        # Extra sections of the state vector used by calc_gradient.
+        self._grad_params = []
+        self._grad_outputs = []
 
     def __iter__(self):
         """Returns an iterator over the components in the workflow."""
@@ -145,8 +166,131 @@ class SequentialWorkflow(Workflow):
         if self.res is None or nEdge != self.res.shape[0]:
             self.res = zeros((nEdge, 1))
 
+        self._setup_vectors()
         return nEdge
 
+    def _setup_vectors(self):
+        """Lay out the vectors used by matvecFWD and matvecREV. Each
+        component gets dictionaries of views into these vectors, so the
+        products themselves don't build dictionaries or allocate arrays.
+        """
+        sizes = [i2 for i1, i2 in self.bounds.values()]
+        sizes.extend(i2 for i1, i2, targets in self._grad_params)
+        sizes.extend(i2 for i1, i2, src in self._grad_outputs)
+        num = max(sizes or [0])
+        self._arg = arg = zeros(num)
+        self._result = result = zeros(num)
+
+        edges = self.get_interior_edges()
+
+        # Outputs may feed several edges, so they get sections of their own,
+        # as do the inputs at the other end.
+        src_widths = []
+        seen = set()
+        for edge in edges:
+            if edge[0] not in seen:
+                seen.add(edge[0])
+                i1, i2 = self.bounds[edge]
+                src_widths.append((edge[0], i2-i1))
+        src_widths.extend((src, i2-i1) for i1, i2, src in self._grad_outputs)
+        out_buf = zeros(sum(width for name, width in src_widths))
+        seed_buf = zeros(out_buf.size)
+        zero_buf = zeros(max([width for name, width in src_widths] or [0]))
+        src_views = {}
+        start = 0
+        for name, width in src_widths:
+            src_views[name] = (out_buf[start:start+width],
+                               seed_buf[start:start+width],
+                               zero_buf[:width])
+            start += width
+
+        tgt_widths = [(edge[1], self.bounds[edge][1]-self.bounds[edge][0])
+                      for edge in edges]
+        for i1, i2, targets in self._grad_params:
+            tgt_widths.extend((target, i2-i1) for target in targets)
+        in_buf = zeros(sum(width for name, width in tgt_widths))
+        in_views = {}
+        start = 0
+        for name, width in tgt_widths:
+            in_views[name] = in_buf[start:start+width]
+            start += width
+
+        comps = list(self)
+        fwd_args = dict((comp.name, {}) for comp in comps)
+        fwd_results = dict((comp.name, {}) for comp in comps)
+        rev_args = dict((comp.name, {}) for comp in comps)
+        rev_results = dict((comp.name, {}) for comp in comps)
+        seeds = {}
+
+        # Sections whose result is the output's product minus the arg.
+        self._fwd_sections = []
+        # Sections whose result is the input's product minus the arg.
+        self._rev_sections = []
+        # Sections whose result is just minus the arg (plus the products of
+        # any inputs in reverse).
+        self._param_sections = []
+        self._output_sections = []
+
+        for edge in edges:
+            src, target = edge
+            i1, i2 = self.bounds[edge]
+            out_view, seed_view, zero_view = src_views[src]
+
+            comp_name, dot, var_name = src.partition('.')
+            fwd_args[comp_name][var_name] = zero_view
+            fwd_results[comp_name][var_name] = out_view
+            seeds.setdefault(src, []).append(arg[i1:i2])
+
+            comp_name, dot, var_name = target.partition('.')
+            fwd_args[comp_name][var_name] = arg[i1:i2]
+            rev_results[comp_name][var_name] = in_views[target]
+
+            self._fwd_sections.append((result[i1:i2], out_view, arg[i1:i2]))
+            self._rev_sections.append((result[i1:i2], in_views[target],
+                                       arg[i1:i2]))
+
+        for i1, i2, targets in self._grad_params:
+            for target in targets:
+                comp_name, dot, var_name = target.partition('.')
+                fwd_args[comp_name][var_name] = arg[i1:i2]
+                rev_results[comp_name][var_name] = in_views[target]
+            self._param_sections.append((result[i1:i2], arg[i1:i2],
+                                         [in_views[t] for t in targets]))
+
+        for i1, i2, src in self._grad_outputs:
+            out_view, seed_view, zero_view = src_views[src]
+            comp_name, dot, var_name = src.partition('.')
+            fwd_args[comp_name][var_name] = zero_view
+            fwd_results[comp_name][var_name] = out_view
+            seeds.setdefault(src, []).append(arg[i1:i2])
+            self._fwd_sections.append((result[i1:i2], out_view, arg[i1:i2]))
+            self._output_sections.append((result[i1:i2], arg[i1:i2]))
+
+        # The seed for an output feeding several edges is their sum.
+        self._seed_sums = []
+        for src, views in seeds.items():
+            comp_name, dot, var_name = src.partition('.')
+            if len(views) == 1:
+                rev_args[comp_name][var_name] = views[0]
+            else:
+                seed_view = src_views[src][1]
+                rev_args[comp_name][var_name] = seed_view
+                self._seed_sums.append((seed_view, views))
+
+        # Components with no inputs (forward) or no seeds (reverse) in the
+        # vectors would only produce zeros, so they aren't called at all.
+        self._fwd_comps = []
+        self._rev_comps = []
+        for comp in comps:
+            args = fwd_args[comp.name]
+            results = fwd_results[comp.name]
+            if results and [key for key in args if key not in results]:
+                self._fwd_comps.append((comp, args, results, results.items()))
+            args = rev_args[comp.name]
+            results = rev_results[comp.name]
+            if results and args:
+                self._rev_comps.append((comp, args, results, results.items()))
+
     def calculate_residuals(self):
         """Calculate and return the vector of residuals based on the current
         state of the system in our workflow."""
@@ -233,49 +377,225 @@ class SequentialWorkflow(Workflow):
     def matvecFWD(self, arg):
         '''Callback function for performing the matrix vector product of the
         workflow's full Jacobian with an incoming vector arg.'''
+        self._arg[:] = arg.reshape(-1)
+
+        for comp, args, results, views in self._fwd_comps:
+            comp.applyJ(args, results)
+            _restore_views(results, views)
 
-        # Bookkeeping dictionaries
-        inputs = {}
-        outputs = {}
+        # An output's "fake" residual term is added per edge, since an
+        # output may feed several of them.
+        for res, out, val in self._fwd_sections:
+            res[:] = out
+            res -= val
 
-        # Start with zero-valued dictionaries cotaining keys for all inputs
-        for comp in self:
-            name = comp.name
-            inputs[name] = {}
-            outputs[name] = {}
+        for res, val, ins in self._param_sections:
+            res.fill(0.0)
+            res -= val
 
-        # Fill input dictionaries with values from input arg.
+        # Callers such as LinearOperator.matmat keep several results.
+        return self._result.copy()
+
+    def matvecREV(self, arg):
+        '''Callback function for performing the matrix vector product of the
+        transpose of the workflow's full Jacobian with an incoming vector
+        arg.'''
+        self._arg[:] = arg.reshape(-1)
+
+        for seed, views in self._seed_sums:
+            seed[:] = views[0]
+            for view in views[1:]:
+                seed += view
+
+        for comp, args, results, views in self._rev_comps:
+            comp.applyJT(args, results)
+            _restore_views(results, views)
+
+        for res, inp, val in self._rev_sections:
+            res[:] = inp
+            res -= val
+
+        for res, val, ins in self._param_sections:
+            res.fill(0.0)
+            res -= val
+            for inp in ins:
+                res += inp
+
+        for res, val in self._output_sections:
+            res.fill(0.0)
+            res -= val
+
+        # Callers such as LinearOperator.matmat keep several results.
+        return self._result.copy()
+
+    def assemble_jacobian(self):
+        """Returns the matrix that matvecFWD multiplies by as a scipy sparse
+        (CSC) matrix, so it can be factored or used to build a
+        preconditioner. The components should have been linearized (see
+        *calc_derivatives*) and *initialize_residual* called. Each block
+        comes from the component's *provideJ()* if it has one, otherwise
+        from calling its *applyJ()* with unit vectors.
+        """
+        scope = self.scope
+        in_edges = {}
+        out_edges = {}
         for edge in self.get_interior_edges():
             src, target = edge
-            i1, i2 = self.bounds[edge]
-
             comp_name, dot, var_name = src.partition('.')
-            outputs[comp_name][var_name] = arg[i1:i2]
-            inputs[comp_name][var_name] = arg[i1:i2]
-
+            out_edges.setdefault(comp_name, []).append((var_name,
+                                                        self.bounds[edge]))
             comp_name, dot, var_name = target.partition('.')
-            inputs[comp_name][var_name] = arg[i1:i2]
-
-        # Call ApplyJ on each component
-        for comp in self:
-            name = comp.name
-            comp.applyJ(inputs[name], outputs[name])
-
-        # Poke results into the return vector
-        result = zeros(len(arg))
+            in_edges.setdefault(comp_name, []).append((var_name,
+                                                       self.bounds[edge]))
+
+        num = len(self._arg)
+        rows = range(num)
+        cols = range(num)
+        data = [-1.0]*num
+
+        for comp_name, ins in in_edges.items():
+            if comp_name not in out_edges:
+                continue
+            outs = out_edges[comp_name]
+            comp = scope.get(comp_name)
+            if hasattr(comp, 'provideJ'):
+                input_keys, output_keys, J = comp.provideJ()
+                ibounds, obounds = \
+                    comp._get_jacobian_bounds(input_keys, output_keys)
+                blocks = []
+                for ivar, (c1, c2) in ins:
+                    if ivar not in ibounds:
+                        continue
+                    i1, i2 = ibounds[ivar]
+                    for ovar, (r1, r2) in outs:
+                        o1, o2 = obounds[ovar]
+                        blocks.append((J[o1:o2, i1:i2], r1, c1))
+            else:
+                blocks = self._probe_jacobian(comp, ins, outs)
+
+            for Jsub, r1, c1 in blocks:
+                nz_rows, nz_cols = Jsub.nonzero()
+                rows.extend(nz_rows + r1)
+                cols.extend(nz_cols + c1)
+                data.extend(Jsub[nz_rows, nz_cols])
+
+        # Duplicate entries are summed.
+        return coo_matrix((data, (rows, cols)), shape=(num, num)).tocsc()
+
+    @staticmethod
+    def _probe_jacobian(comp, ins, outs):
+        """Returns the Jacobian blocks of `comp` between the given inputs and
+        outputs, found by calling *applyJ()* with unit vectors."""
+        blocks = []
+        for ivar, (c1, c2) in ins:
+            Jsub = {}
+            for ovar, (r1, r2) in outs:
+                Jsub[ovar] = zeros((r2-r1, c2-c1))
+            for j in range(c2-c1):
+                unit = zeros(c2-c1)
+                unit[j] = 1.0
+                arg = {ivar: unit}
+                result = {}
+                for ovar, (r1, r2) in outs:
+                    arg[ovar] = zeros(r2-r1)
+                    result[ovar] = zeros(r2-r1)
+                comp.applyJ(arg, result)
+                for ovar, (r1, r2) in outs:
+                    Jsub[ovar][:, j] = flattened_value(ovar, result[ovar])
+            for ovar, (r1, r2) in outs:
+                blocks.append((Jsub[ovar], r1, c1))
+        return blocks
+
+    def calc_gradient(self, inputs, outputs, mode='auto'):
+        """Returns the gradient of the given outputs with respect to the
+        given inputs, computed from the linearized components in this
+        workflow. The result is a 2D array with a row for each (flattened)
+        output and a column for each (flattened) input, in the order given.
+
+        inputs: list of str or tuple of str
+            Pathnames of unconnected component inputs. A tuple of pathnames
+            is treated as a single input that sets all of them (like a
+            Parameter with multiple targets).
+
+        outputs: list of str
+            Pathnames of component outputs.
+
+        mode: str
+            'forward' solves one linear system per input, 'adjoint' solves
+            one per output with the transposed system, and 'auto' (the
+            default) picks whichever needs fewer solves.
+        """
+        if mode not in ('auto', 'forward', 'adjoint'):
+            self.scope.raise_exception("calc_gradient mode must be 'auto',"
+                                       " 'forward' or 'adjoint', not %r"
+                                       % mode, ValueError)
+
+        self.calc_derivatives(first=True)
+        nEdge = self.initialize_residual()
+
+        # Inputs and outputs get their own section of the state vector,
+        # except for outputs that already have one as an edge source.
+        scope = self.scope
+        num = nEdge
+        grad_params = []
+        in_bounds = []
+        for item in inputs:
+            if isinstance(item, basestring):
+                item = (item,)
+            width = flattened_size(item[0], scope.get(item[0]))
+            grad_params.append((num, num+width, item))
+            in_bounds.append((num, num+width))
+            num += width
+
+        sources = {}
         for edge in self.get_interior_edges():
-            src, target = edge
-            i1, i2 = self.bounds[edge]
+            sources.setdefault(edge[0], self.bounds[edge])
+        grad_outputs = []
+        out_bounds = []
+        for name in outputs:
+            if name in sources:
+                out_bounds.append(sources[name])
+            else:
+                width = flattened_size(name, scope.get(name))
+                grad_outputs.append((num, num+width, name))
+                out_bounds.append((num, num+width))
+                num += width
 
-            comp_name, dot, var_name = src.partition('.')
-            result[i1:i2] = outputs[comp_name][var_name]
+        in_idx = [i for i1, i2 in in_bounds for i in range(i1, i2)]
+        out_idx = [i for i1, i2 in out_bounds for i in range(i1, i2)]
+        if mode == 'auto':
+            mode = 'adjoint' if len(out_idx) < len(in_idx) else 'forward'
+
+        try:
+            self._grad_params = grad_params
+            self._grad_outputs = grad_outputs
+            self._setup_vectors()
 
-        return result
+            if mode == 'forward':
+                matvec = self.matvecFWD
+                seeds, readout = in_idx, out_idx
+            else:
+                matvec = self.matvecREV
+                seeds, readout = out_idx, in_idx
+
+            A = LinearOperator((num, num), matvec=matvec, dtype=float)
+            J = zeros((len(out_idx), len(in_idx)))
+            rhs = zeros(num)
+            for j, seed in enumerate(seeds):
+                rhs[seed] = -1.0
+                dx, info = gmres(A, rhs, tol=1.0e-10, maxiter=max(num, 100))
+                rhs[seed] = 0.0
+                if info > 0:
+                    scope.raise_exception('gmres failed to converge while'
+                                          ' calculating the gradient',
+                                          RuntimeError)
+                if mode == 'forward':
+                    J[:, j] = dx[readout]
+                else:
+                    J[j, :] = dx[readout]
+        finally:
+            self._grad_params = []
+            self._grad_outputs = []
+            self._setup_vectors()
 
-    def calc_gradient(self):
-        """Returns the gradient of the given outputs with respect to all 
-        parameters. The returned output is in the form of a dictionary of
-        dictionaries where the 
-        """
-        pass
-        
+        return J
@@ -0,0 +1,63 @@
+"""
+Measure the per-evaluate overhead of ExprEvaluator, comparing the
+compiled fast path against the scope.get() path.
+"""
+
+import time
+
+from openmdao.main.api import Assembly, Component, set_as_top
+from openmdao.main.datatypes.api import Array, Float
+from openmdao.main.expreval import ExprEvaluator
+
+
+EXPRESSIONS = [
+    'comp.x',
+    'comp.x**2+comp.y',
+    'sub.comp.x*sub.comp.y-comp.x',
+    'comp.arr[2]+abs(comp.arr[0])',
+]
+
+
+class Comp(Component):
+    """ Component with a few inputs to reference. """
+
+    x = Float(1.5, iotype='in')
+    y = Float(-2., iotype='in')
+    arr = Array([1., 2., 3.], iotype='in')
+
+
+def build_model():
+    """ Return an assembly with a component and a nested component. """
+    top = set_as_top(Assembly())
+    top.add('comp', Comp())
+    top.add('sub', Assembly())
+    top.sub.add('comp', Comp())
+    return top
+
+
+def run_test(expr, reps):
+    """ Return seconds per evaluation of `expr`. """
+    expr.evaluate()  # 'prime' the compiled code.
+    start = time.time()
+    for i in xrange(reps):
+        expr.evaluate()
+    return (time.time() - start) / reps
+
+
+def main(reps=100000):
+    """ Run overhead tests for each expression. """
+    top = build_model()
+    print '%-32s %12s %12s %8s' % ('expression', 'get (us)', 'fast (us)',
+                                   'speedup')
+    for text in EXPRESSIONS:
+        slow = ExprEvaluator(text, top)
+        slow._fast_code = False  # force the scope.get() path
+        fast = ExprEvaluator(text, top)
+        slow_time = run_test(slow, reps)
+        fast_time = run_test(fast, reps)
+        print '%-32s %12.3f %12.3f %8.2f' \
+              % (text, slow_time*1e6, fast_time*1e6, slow_time/fast_time)
+
+
+if __name__ == '__main__':
+    main()
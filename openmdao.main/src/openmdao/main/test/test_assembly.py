@@ -927,6 +927,87 @@ subassy.comp3: ReRun.2-3.2-2.2-1"""
         self.assertEqual([c.name for c in asm.sub.driver.workflow],
                          ['newcomp2', 'newcomp3'])
 
+    def test_fast_transfer(self):
+        class Src(Component):
+            k = Float(1.0, iotype='in')
+            ft = Float(iotype='out', units='ft')
+            degc = Float(iotype='out', units='degC')
+            arr = Array([0., 0., 0.], iotype='out', units='ft')
+
+            def execute(self):
+                self.ft = 2. * self.k
+                self.degc = 20. * self.k
+                self.arr = [self.k, 2. * self.k, 3. * self.k]
+
+        class Dest(Dummy):
+            inch = Float(iotype='in', units='inch')
+            degf = Float(iotype='in', units='degF')
+            arr = Array([0., 0., 0.], iotype='in', units='inch')
+            elem = Float(iotype='in', units='inch')
+            part = Array([0., 0.], iotype='in')
+            x = Float(iotype='in')
+            y = Float(iotype='in')
+
+        def build(fast):
+            top = set_as_top(Assembly())
+            top.fast_transfer = fast
+            top.add('x', Float(3.0, iotype='in'))
+            top.add('src', Src())
+            top.add('dest', Dest())
+            top.driver.workflow.add(['src', 'dest'])
+            top.connect('src.ft', 'dest.inch')
+            top.connect('src.degc', 'dest.degf')
+            top.connect('src.arr', 'dest.arr')
+            top.connect('src.arr[1]', 'dest.elem')
+            top.connect('src.arr[0:2]', 'dest.part')
+            top.connect('x', 'dest.x')
+            top.connect('x*2', 'dest.y')
+            return top
+
+        fast, slow = build(True), build(False)
+        for top in (fast, slow):
+            top.run()
+            top.x = 4.0
+            top.src.k = 2.0
+            top.run()
+
+        for name in ('inch', 'degf', 'elem', 'x', 'y'):
+            self.assertAlmostEqual(getattr(fast.dest, name),
+                                   getattr(slow.dest, name))
+        self.assertAlmostEqual(fast.dest.inch, 48.)
+        self.assertAlmostEqual(fast.dest.degf, 104.)
+        self.assertAlmostEqual(fast.dest.elem, 48.)
+        self.assertAlmostEqual(fast.dest.y, 8.)
+        self.assertEqual(list(fast.dest.arr), list(slow.dest.arr))
+        for val, expected in zip(fast.dest.arr, [24., 48., 72.]):
+            self.assertAlmostEqual(val, expected)
+        self.assertEqual(list(fast.dest.part), list(slow.dest.part))
+        self.assertEqual(list(fast.dest.part), [2., 4.])
+
+        # everything but the expression source is transferred directly
+        plan = fast._get_transfer_plan('dest')
+        direct = set([name for name, xfers in plan.items()
+                      if type(xfers[0]).__name__ == '_DirectTransfer'])
+        self.assertEqual(direct, set(['inch', 'degf', 'arr', 'elem',
+                                      'part', 'x']))
+
+        # the plan is rebuilt when the connections change
+        fast.disconnect('src.ft', 'dest.inch')
+        self.assertTrue('inch' not in fast._get_transfer_plan('dest'))
+
+        # a bad value is still reported as coming from the connection
+        fast.src.ft = 1.0
+        fast.connect('src.ft', 'dest.inch')
+        fast.dest.add('neg', Float(iotype='in', low=0.))
+        fast.connect('x', 'dest.neg')
+        fast.x = -1.
+        try:
+            fast.run()
+        except ValueError as err:
+            self.assertTrue("cannot set 'dest.neg' from 'x'" in str(err))
+        else:
+            self.fail('ValueError expected')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import math
+import copy
 import ast
 
 from openmdao.main.numpy_fallback import array
@@ -241,6 +242,60 @@ class ExprEvalTestCase(unittest.TestCase):
         self.assertEqual(list(ex.evaluate()), [4,4,4,123,4])
         
         
+    def test_fast_path(self):
+        self.top.comp.contlist = [A(), A(), A()]
+        self.top.comp.add('sub', Comp())
+        self.top.comp.sub.x = 2.5
+        texts = ['comp.x**2+a.f', 'comp.contlist[1].a1d[1:3]',
+                 "comp.get_cont(2).some_funct(comp.x,3,op='mult')",
+                 'comp.sub.x*comp.x', 'a.some_prop', 'math.sin(comp.y)']
+        for text in texts:
+            fast = ExprEvaluator(text, self.top)
+            slow = ExprEvaluator(text, self.top)
+            slow._fast_code = False
+            fval = fast.evaluate()
+            sval = slow.evaluate()
+            self.assertTrue(fast._fast_code)
+            self.assertEqual(str(fval), str(sval))
+
+        # accessors are pre-bound to the owning component
+        ex = ExprEvaluator('comp.sub.x*comp.x', self.top)
+        self.assertEqual(ex.evaluate(), 2.5*3.14)
+        self.assertEqual([self.top.comp.sub, self.top.comp],
+                         [acc[1] for acc in ex._accessors])
+
+        # replacing a component invalidates the accessors
+        self.top.comp.add('sub', Comp())
+        self.top.comp.sub.x = 4.
+        self.assertEqual(ex.evaluate(), 4.*3.14)
+        self.assertTrue(ex._accessors[0][1] is self.top.comp.sub)
+
+        # a deepcopied model keeps its children (copying the added trait
+        # calls config_changed() on the partly copied parents) and binds
+        # to its own
+        self.top.comp.sub.add_trait('z', Float(1.5, iotype='in'))
+        top = copy.deepcopy(self.top)
+        self.assertEqual(sorted(top.list_containers()),
+                         sorted(self.top.list_containers()))
+        ex = ExprEvaluator('comp.sub.x*comp.x', top)
+        self.assertEqual(ex.evaluate(), 4.*3.14)
+        self.assertTrue(ex._accessors[0][1] is top.comp.sub)
+        self.assertEqual(top.comp.sub.z, 1.5)
+
+        # Slots can change without a config_changed, so they aren't pre-bound
+        ex = ExprEvaluator('comp.cont.f', self.top)
+        self.top.comp.cont = A()
+        self.top.comp.cont.f = 1.5
+        self.assertEqual(ex.evaluate(), 1.5)
+        self.top.comp.cont = A()
+        self.assertEqual(ex.evaluate(), 0.)
+
+        # assignments and other getters use the normal path
+        ex = ExprEvaluator('comp.x = 2.*a.f', self.top)
+        self.assertEqual(ex._parse_fast(), False)
+        ex = ExprEvaluator('comp.x', self.top, getter='get_wrapped_attr')
+        self.assertEqual(ex._parse_fast(), False)
+
     def test_reparse_on_scope_change(self):
         self.top.comp.x = 99.5
         self.top.comp.y = -3.14
@@ -517,6 +572,38 @@ class ExprEvalTestCase(unittest.TestCase):
         #g1=gamma(top.comp2.a)*polygamma(0,top.comp2.a) #true partial derivative 
         #assert_rel_error(self, grad['comp2.a'], g1, 0.001)
         
+    def test_eval_gradient_symbolic(self):
+        top = set_as_top(Assembly())
+        top.add('comp1', Simple())
+        top.add('comp2', A())
+        top.comp2.a1d = [0.2, 0.3, 0.4]
+        a, b = top.comp1.a, top.comp1.b
+        tests = [
+            ('comp1.a/comp1.b-comp1.a**comp1.b',
+             {'comp1.a': 1./b-b*a**(b-1), 'comp1.b': -a/b**2-a**b*log(a)}),
+            ('-(comp1.a-comp1.b)**3', {'comp1.a': -3., 'comp1.b': 3.}),
+            ('numpy.arcsin(comp2.a1d[1])*abs(-comp1.a)',
+             {'comp2.a1d[1]': a/sqrt(1.-0.09), 'comp1.a': math.asin(0.3)}),
+            ('math.exp(comp1.b)*tanh(comp1.a)+3',
+             {'comp1.b': math.exp(b)*math.tanh(a),
+              'comp1.a': math.exp(b)/math.cosh(a)**2}),
+            ('comp1.a if comp1.b > 2 else comp1.b', {'comp1.a': 1., 'comp1.b': 0.}),
+        ]
+        for text, expected in tests:
+            exp = ExprEvaluator(text, top)
+            grad = exp.evaluate_gradient()
+            self.assertTrue(exp._grad_code)
+            self.assertEqual(set(grad.keys()), set(expected.keys()))
+            for name, val in expected.items():
+                assert_rel_error(self, grad[name], val, 1e-10)
+
+        top.comp1.a = 3.
+        # functions without a rule fall back to finite difference
+        exp = ExprEvaluator('gamma(comp1.a)', top)
+        grad = exp.evaluate_gradient()
+        self.assertEqual(exp._grad_code, False)
+        assert_rel_error(self, grad['comp1.a'], 2.*(1.5-0.5772156649), 1e-5)
+
     def test_eval_gradient_array(self):
         top = set_as_top(Assembly())
         top.add('comp1', A())
@@ -2,6 +2,7 @@
 import unittest
 
 from openmdao.main.api import Assembly, Component, Driver, set_as_top
+from openmdao.main.case import Case
 from openmdao.lib.datatypes.api import Int, Event, Float, List, Enum, Str
 from openmdao.util.decorators import add_delegate
 from openmdao.main.hasparameters import HasParameters, Parameter, ParameterGroup
@@ -157,6 +158,21 @@ class HasParametersTestCase(unittest.TestCase):
         self.assertEqual(self.top.comp.x, 22.)
         self.assertEqual(self.top.comp.y, 22.)
         
+    def test_set_params_case(self):
+        self.top.comp.add_trait('z', Float(0.0, iotype='in'))
+        self.top.driver.add_parameter(('comp.x','comp.y'), low=0., high=1e99,
+                                      scaler=2., adder=1.)
+        self.top.driver.add_parameter('comp.z', low=0., high=1e99,
+                                      scaler=0.5, name='z')
+        case = self.top.driver.set_parameters([3., 4.], Case())
+        self.assertEqual(case['comp.x'], 8.)
+        self.assertEqual(case['comp.y'], 8.)
+        self.assertEqual(case['comp.z'], 2.)
+        self.assertEqual(self.top.comp.x, 0.)
+        
+        case = self.top.driver.set_parameter_by_name('z', 6., Case())
+        self.assertEqual(case.items(iotype='in'), [('comp.z', 3.)])
+        
     def test_add_incompatible_params(self): 
         self.top.add('dummy',Dummy())
         
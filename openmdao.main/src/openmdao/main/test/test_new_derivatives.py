@@ -10,7 +10,7 @@ try:
 except ImportError as err:
     from openmdao.main.numpy_fallback import zeros, array
 
-from openmdao.main.api import Component, VariableTree
+from openmdao.main.api import Assembly, Component, VariableTree, set_as_top
 from openmdao.main.datatypes.api import Array, Float, VarTree
 
 class Tree2(VariableTree):
@@ -64,6 +64,64 @@ class MyComp(Component):
         return input_keys, output_keys, self.J
 
 
+class Paraboloid(Component):
+
+    x = Float(2.0, iotype='in')
+    y = Float(3.0, iotype='in')
+    v = Array(array([1.0, 2.0]), iotype='in')
+
+    f = Float(0.0, iotype='out')
+    g = Float(0.0, iotype='out')
+    w = Array(zeros(2), iotype='out')
+
+    def execute(self):
+        self.f = self.x*self.y
+        self.g = self.x**2
+        self.w = self.v**2 + self.y
+
+    def linearize(self):
+        self.J = array([[self.y, self.x, 0.0, 0.0],
+                        [2.0*self.x, 0.0, 0.0, 0.0],
+                        [0.0, 1.0, 2.0*self.v[0], 0.0],
+                        [0.0, 1.0, 0.0, 2.0*self.v[1]]])
+
+    def provideJ(self):
+        return ('x', 'y', 'v'), ('f', 'g', 'w'), self.J
+
+
+class Summer(Component):
+
+    a = Float(0.0, iotype='in')
+    b = Float(0.0, iotype='in')
+    h = Float(0.0, iotype='out')
+
+    def execute(self):
+        self.h = self.a + 3.0*self.b*self.a
+
+    def linearize(self):
+        self.J = array([[1.0 + 3.0*self.b, 3.0*self.a]])
+
+    def provideJ(self):
+        return ('a', 'b'), ('h',), self.J
+
+
+class Doubler(Component):
+
+    a = Float(0.0, iotype='in')
+    k = Float(0.0, iotype='out')
+
+    def execute(self):
+        self.k = 2.0*self.a
+
+    def apply_deriv(self, arg, result):
+        if 'a' in arg:
+            result['k'] += 2.0*arg['a']
+
+    def apply_derivT(self, arg, result):
+        if 'a' in result:
+            result['a'] += 2.0*arg['k']
+
+
 class Testcase(unittest.TestCase):
     """ Test run/step/stop aspects of a simple workflow. """
 
@@ -120,6 +178,141 @@ class Testcase(unittest.TestCase):
                 self.assertEqual(outputs['vvt.vt1.d1'].flat[j], comp.J[9+j, i])
 
 
+    def test_applyJT(self):
+
+        comp = MyComp()
+        comp.linearize()
+
+        outputs = {}
+        inputs = { 'x1': None,
+                   'x2': None,
+                   'x3': None,
+                   'x4': None,
+                   'vt.a1': None,
+                   'vt.vt1.d1': None}
+
+        num = 11
+        ident = identity(num)
+
+        for i in range(num):
+
+            outputs['xx1'] = ident[i, 0]
+            outputs['xx2'] = ident[i, 1]
+            outputs['xx3'] = ident[i, 2:4].reshape((2, 1))
+            outputs['xx4'] = ident[i, 4:8].reshape((2, 2))
+            outputs['vvt.a1'] = ident[i, 8]
+            outputs['vvt.vt1.d1'] = ident[i, 9:11].reshape((1, 2))
+
+            comp.applyJT(outputs, inputs)
+
+            self.assertEqual(inputs['x1'], comp.J[i, 0])
+            self.assertEqual(inputs['x2'], comp.J[i, 1])
+            for j in range(2):
+                self.assertEqual(inputs['x3'][j], comp.J[i, 2+j])
+            for j in range(4):
+                self.assertEqual(inputs['x4'].flat[j], comp.J[i, 4+j])
+            self.assertEqual(inputs['vt.a1'], comp.J[i, 8])
+            for j in range(2):
+                self.assertEqual(inputs['vt.vt1.d1'].flat[j], comp.J[i, 9+j])
+
+        # Outputs in the result are updated in place.
+        arg = {'xx3': array([[1.0], [2.0]])}
+        result = {'x3': zeros((2, 1)), 'xx3': zeros((2, 1))}
+        buf = result['xx3']
+        comp.applyJT(arg, result)
+        self.assertTrue(result['xx3'] is buf)
+        self.assertEqual(list(buf.flat), [-1.0, -2.0])
+        for j in range(2):
+            self.assertAlmostEqual(result['x3'][j, 0],
+                                   comp.J[2, 2+j] + 2.0*comp.J[3, 2+j])
+
+    def test_calc_gradient(self):
+
+        top = set_as_top(Assembly())
+        top.add('p', Paraboloid())
+        top.add('s', Summer())
+        top.add('d', Doubler())
+        top.driver.workflow.add(['p', 's', 'd'])
+        top.connect('p.f', 's.a')
+        top.connect('p.g', 's.b')
+        top.connect('p.f', 'd.a')
+        top.run()
+
+        x, y, v = 2.0, 3.0, array([1.0, 2.0])
+        f, g = x*y, x**2
+        # Rows: s.h, d.k, p.g, p.w[0], p.w[1]
+        # Columns: p.x, p.y, p.v[0], p.v[1]
+        dh_df, dh_dg = 1.0 + 3.0*g, 3.0*f
+        expected = array([[dh_df*y + dh_dg*2.0*x, dh_df*x, 0.0, 0.0],
+                          [2.0*y, 2.0*x, 0.0, 0.0],
+                          [2.0*x, 0.0, 0.0, 0.0],
+                          [0.0, 1.0, 2.0*v[0], 0.0],
+                          [0.0, 1.0, 0.0, 2.0*v[1]]])
+
+        inputs = ['p.x', 'p.y', 'p.v']
+        outputs = ['s.h', 'd.k', 'p.g', 'p.w']
+        for mode in ('forward', 'adjoint', 'auto'):
+            J = top.driver.workflow.calc_gradient(inputs, outputs, mode=mode)
+            self.assertEqual(J.shape, (5, 4))
+            for i in range(5):
+                for j in range(4):
+                    self.assertAlmostEqual(J[i, j], expected[i, j], 6)
+
+        J = top.driver.workflow.calc_gradient([('p.x',)], ['d.k'],
+                                              mode='adjoint')
+        self.assertAlmostEqual(J[0, 0], 2.0*y, 6)
+
+        try:
+            top.driver.workflow.calc_gradient(inputs, outputs, mode='reverse')
+        except ValueError as err:
+            self.assertEqual(str(err), ": calc_gradient mode must be 'auto',"
+                                       " 'forward' or 'adjoint', not 'reverse'")
+        else:
+            self.fail('Expected ValueError')
+
+        # A bad pathname doesn't leave sections in the state vector.
+        wf = top.driver.workflow
+        self.assertRaises(AttributeError, wf.calc_gradient,
+                          inputs, ['s.h', 'p.nosuch'])
+        self.assertEqual(wf._grad_params, [])
+        self.assertEqual(wf._grad_outputs, [])
+        J = wf.calc_gradient(['p.x'], ['d.k'])
+        self.assertEqual(J.shape, (1, 1))
+        self.assertAlmostEqual(J[0, 0], 2.0*y, 6)
+
+
+    def test_matvec_transpose(self):
+
+        top = set_as_top(Assembly())
+        top.add('p', Paraboloid())
+        top.add('s', Summer())
+        top.add('d', Doubler())
+        top.driver.workflow.add(['p', 's', 'd'])
+        top.connect('p.f', 's.a')
+        top.connect('p.g', 's.b')
+        top.connect('p.f', 'd.a')
+        top.run()
+
+        wf = top.driver.workflow
+        wf.calc_derivatives(first=True)
+        num = wf.initialize_residual()
+        self.assertEqual(num, 3)
+
+        ident = identity(num)
+        A = zeros((num, num))
+        AT = zeros((num, num))
+        for i in range(num):
+            A[:, i] = wf.matvecFWD(ident[:, i])
+            AT[:, i] = wf.matvecREV(ident[:, i])
+        for i in range(num):
+            for j in range(num):
+                self.assertAlmostEqual(A[i, j], AT[j, i], 12)
+
+        # Each call returns a new result vector.
+        self.assertTrue(wf.matvecFWD(ident[:, 0]) is not
+                        wf.matvecFWD(ident[:, 1]))
+
+
 if __name__ == '__main__':
     import nose
     import sys
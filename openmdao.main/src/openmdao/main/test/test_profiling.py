@@ -0,0 +1,161 @@
+"""
+Test profiling of Component runs.
+"""
+
+import os
+import tempfile
+import unittest
+
+from openmdao.main.api import Assembly, Component, Driver, set_as_top, \
+                              enable_profiling, disable_profiling
+from openmdao.main.datatypes.api import Float, Int
+from openmdao.main import profiling
+from openmdao.main.test.test_workflow import Diamond
+
+
+class Doubler(Component):
+    """ Doubles its input. """
+
+    x = Float(0., iotype='in')
+    y = Float(0., iotype='out')
+
+    def execute(self):
+        self.y = 2. * self.x
+
+
+class Looper(Driver):
+    """ Runs its workflow `count` times. """
+
+    count = Int(3, iotype='in')
+
+    def start_iteration(self):
+        self._iter = 0
+
+    def continue_iteration(self):
+        return self._iter < self.count
+
+    def post_iteration(self):
+        self._iter += 1
+
+
+class Model(Assembly):
+
+    def configure(self):
+        sub = self.add('sub', Assembly())
+        sub.add('comp', Doubler())
+        sub.driver.workflow.add('comp')
+        sub.create_passthrough('comp.x')
+        sub.create_passthrough('comp.y')
+        self.add('comp1', Doubler())
+        self.connect('comp1.y', 'sub.x')
+        self.add('driver', Looper())
+        self.driver.workflow.add(['comp1', 'sub'])
+
+
+class ProfilerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = None
+
+    def tearDown(self):
+        disable_profiling()
+        if self.filename and os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_disabled(self):
+        self.assertEqual(profiling.PROFILER, None)
+        profiler = enable_profiling()
+        self.assertTrue(profiling.PROFILER is profiler)
+        self.assertTrue(disable_profiling() is profiler)
+        self.assertEqual(profiling.PROFILER, None)
+
+        top = set_as_top(Model())
+        top.run()
+        self.assertEqual(profiler.stats(), {})
+
+    def test_stats(self):
+        top = set_as_top(Model())
+        top.comp1.x = 1.
+        profiler = enable_profiling()
+        top.run()
+        disable_profiling()
+        self.assertEqual(top.sub.y, 4.)
+
+        stats = profiler.stats()
+        self.assertEqual(sorted(stats.keys()),
+                         ['', 'comp1', 'driver', 'sub', 'sub.comp',
+                          'sub.driver'])
+
+        # comp1 only executes on the first of the driver's iterations.
+        comp1 = profiler.stats('comp1')
+        self.assertEqual(comp1['calls'], 3)
+        self.assertEqual(comp1['executions'], 1)
+        self.assertEqual(profiler.stats('sub.comp')['executions'], 1)
+        self.assertEqual(profiler.stats('')['calls'], 1)
+
+        # Input transfers.
+        self.assertEqual(profiler.stats('sub')['transfers'], 1)
+        self.assertEqual(profiler.stats('sub.comp')['transfers'], 1)
+        self.assertEqual(comp1['transfers'], 0)
+
+        top_stats = profiler.stats('')
+        self.assertTrue(top_stats['wall'] >= profiler.stats('driver')['wall'])
+        self.assertTrue(top_stats['self_wall'] <= top_stats['wall'])
+        for data in stats.values():
+            self.assertTrue(data['wall'] >= 0.)
+            self.assertTrue(data['cpu'] >= 0.)
+            self.assertTrue(data['transfer_wall'] <= data['wall'])
+
+        iterations = profiler.iterations('driver')
+        self.assertEqual([item[0] for item in iterations],
+                         ['1', '2', '3'])
+        self.assertEqual([item[0] for item in
+                          profiler.iterations('sub.driver')],
+                         ['1-2.1', '2-2.1', '3-2.1'])
+        self.assertEqual(profiler.iterations('comp1'), [])
+
+        report = profiler.report(sort='calls', limit=2).split('\n')
+        self.assertEqual(len(report), 3)
+        self.assertEqual(report[1].split()[1], '3')
+
+        profiler.clear()
+        self.assertEqual(profiler.stats(), {})
+
+    def test_dump_collapsed(self):
+        top = set_as_top(Model())
+        profiler = enable_profiling()
+        top.run()
+        disable_profiling()
+
+        fd, self.filename = tempfile.mkstemp(suffix='.folded')
+        os.close(fd)
+        profiler.dump_collapsed(self.filename)
+        stacks = {}
+        with open(self.filename, 'r') as inp:
+            for line in inp:
+                stack, usecs = line.rsplit(' ', 1)
+                stacks[stack] = int(usecs)
+                self.assertTrue(stacks[stack] > 0)
+        self.assertTrue('<top>;driver;sub;sub.driver;sub.comp' in stacks)
+        self.assertTrue('<top>;driver;comp1' in stacks)
+        total = sum(stacks.values())
+        self.assertTrue(abs(total - profiler.stats('')['wall'] * 1e6)
+                        <= len(stacks))
+
+    def test_parallel_dataflow(self):
+        top = set_as_top(Diamond())
+        top.driver.workflow.parallel = True
+        profiler = enable_profiling()
+        top.run()
+        disable_profiling()
+        self.assertEqual(top.d.z, 0.)
+
+        stats = profiler.stats()
+        for name in 'abcdf':
+            self.assertEqual(stats[name]['calls'], 1)
+            self.assertEqual(stats[name]['executions'], 1)
+        self.assertEqual(len(profiler.iterations('driver')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Test restoring Component outputs from a ResultCache.
+"""
+
+import cPickle
+import os
+import tempfile
+import unittest
+
+from numpy import array
+
+from openmdao.main.api import Assembly, Component, VariableTree, set_as_top
+from openmdao.main.datatypes.api import Array, Float, Int, VarTree
+from openmdao.main.resultcache import ResultCache
+
+
+class Counter(Component):
+    """ Counts calls to execute. """
+
+    x = Float(0., iotype='in')
+    arr = Array(array([1., 2.]), iotype='in')
+    y = Float(0., iotype='out')
+    out_arr = Array(array([0., 0.]), iotype='out')
+    ncalls = Int(0, iotype='out')
+
+    def execute(self):
+        self.ncalls += 1
+        self.y = self.x * 2.
+        self.out_arr = self.arr * self.x
+
+
+class TreeComp(Component):
+    """ Has a VariableTree input. """
+
+    tree = VarTree(VariableTree(), iotype='in')
+    y = Float(0., iotype='out')
+
+    def execute(self):
+        self.y += 1.
+
+
+class ResultCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.top = set_as_top(Assembly())
+        self.top.add('comp', Counter())
+        self.top.driver.workflow.add('comp')
+        self.filename = None
+
+    def tearDown(self):
+        if self.filename and os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_hits(self):
+        comp = self.top.comp
+        comp.result_cache = ResultCache()
+
+        comp.x = 1.
+        self.top.run()
+        comp.x = 2.
+        self.top.run()
+        self.assertEqual(comp.ncalls, 2)
+        self.assertEqual(comp.exec_count, 2)
+
+        comp.x = 1.
+        self.top.run()
+        self.assertEqual(comp.ncalls, 1)  # Restored.
+        self.assertEqual(comp.exec_count, 2)
+        self.assertEqual(comp.y, 2.)
+        self.assertEqual(list(comp.out_arr), [1., 2.])
+        self.assertTrue(comp.is_valid())
+        self.assertEqual(comp.result_cache.stats(),
+                         dict(hits=1, misses=2, size=2))
+
+        # Array inputs are part of the key.
+        comp.arr = array([3., 4.])
+        self.top.run()
+        self.assertEqual(list(comp.out_arr), [3., 4.])
+        self.assertEqual(comp.result_cache.misses, 3)
+
+        # Restored values are copies.
+        comp.out_arr[0] = 42.
+        comp.arr = array([1., 2.])
+        self.top.run()
+        comp.arr = array([3., 4.])
+        self.top.run()
+        self.assertEqual(list(comp.out_arr), [3., 4.])
+        self.assertEqual(comp.result_cache.hits, 3)
+
+        comp.result_cache.clear()
+        self.assertEqual(comp.result_cache.stats(),
+                         dict(hits=0, misses=0, size=0))
+
+    def test_lru(self):
+        comp = self.top.comp
+        comp.result_cache = ResultCache(maxsize=2)
+        for x in (1., 2., 1., 3.):  # 2 is least recently used.
+            comp.x = x
+            self.top.run()
+        self.assertEqual(comp.result_cache.stats(),
+                         dict(hits=1, misses=3, size=2))
+
+        comp.x = 1.
+        self.top.run()
+        comp.x = 2.
+        self.top.run()
+        self.assertEqual(comp.exec_count, 4)
+        self.assertEqual(comp.result_cache.stats(),
+                         dict(hits=2, misses=4, size=2))
+
+    def test_persistence(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.cache')
+        os.close(fd)
+        comp = self.top.comp
+        comp.result_cache = ResultCache(maxsize=2, filename=self.filename)
+        for x in (1., 2., 3.):
+            comp.x = x
+            self.top.run()
+
+        cache = ResultCache(maxsize=2, filename=self.filename)
+        self.assertEqual(len(cache), 2)
+
+        top = set_as_top(Assembly())
+        top.add('comp', Counter())
+        top.driver.workflow.add('comp')
+        top.comp.result_cache = cache
+        top.comp.x = 3.
+        top.run()
+        self.assertEqual(top.comp.exec_count, 0)
+        self.assertEqual(top.comp.y, 6.)
+        self.assertEqual(cache.hits, 1)
+
+        # Discarded entries were dropped from the file.
+        self.assertEqual(len(ResultCache(filename=self.filename)), 2)
+
+    def _file_entries(self):
+        count = 0
+        with open(self.filename, 'rb') as inp:
+            while True:
+                try:
+                    cPickle.load(inp)
+                except EOFError:
+                    return count
+                count += 1
+
+    def test_file_bounded(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.cache')
+        os.close(fd)
+        comp = self.top.comp
+        comp.result_cache = ResultCache(maxsize=2, filename=self.filename)
+        for x in range(10):
+            comp.x = float(x)
+            self.top.run()
+            self.assertTrue(self._file_entries() <= 4)
+        cache = ResultCache(maxsize=2, filename=self.filename)
+        self.assertTrue(cache.make_key(comp) in cache)
+        self.assertEqual(self._file_entries(), 2)
+
+    def test_truncated_file(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.cache')
+        os.close(fd)
+        comp = self.top.comp
+        comp.result_cache = ResultCache(filename=self.filename)
+        for x in (1., 2., 3.):
+            comp.x = x
+            self.top.run()
+        # Simulate an interrupted write.
+        data = cPickle.dumps(('0'*40, [('y', 1.)]), cPickle.HIGHEST_PROTOCOL)
+        with open(self.filename, 'ab') as out:
+            out.write(data[:len(data)//2])
+
+        # The partial last entry is dropped from the file too, so entries
+        # can be appended again.
+        cache = ResultCache(filename=self.filename)
+        self.assertEqual(len(cache), 3)
+        comp.result_cache = cache
+        comp.x = 4.
+        self.top.run()
+        self.assertEqual(len(ResultCache(filename=self.filename)), 4)
+
+    def test_uncacheable(self):
+        self.top.add('tcomp', TreeComp())
+        self.top.driver.workflow.add('tcomp')
+        tcomp = self.top.tcomp
+        tcomp.result_cache = ResultCache()
+        self.top.run()
+        tcomp.force_execute = True
+        self.top.run()
+        self.assertEqual(tcomp.y, 2.)
+        self.assertEqual(tcomp.result_cache.stats(),
+                         dict(hits=0, misses=0, size=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
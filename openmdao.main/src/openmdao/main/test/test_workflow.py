@@ -2,11 +2,15 @@
 Test run/step/stop aspects of a simple workflow.
 """
 
+import os
+import threading
 import unittest
 
 from openmdao.main.api import Assembly, Component, set_as_top, Driver
 from openmdao.main.exceptions import RunStopped
-from openmdao.lib.datatypes.api import Int, Bool
+from openmdao.main.hasparameters import HasParameters
+from openmdao.util.decorators import add_delegate
+from openmdao.lib.datatypes.api import Int, Bool, Float
 
 # pylint: disable-msg=E1101,E1103
 # "Instance of <class> has no <attr> member"
@@ -53,6 +57,76 @@ class Model(Assembly):
         self.run()
 
 
+class Adder(Component):
+    """ Adds its inputs and records where it executed. """
+
+    x = Float(0., iotype='in')
+    y = Float(0., iotype='in')
+    fail = Bool(False, iotype='in')
+    z = Float(0., iotype='out')
+    pid = Int(0, iotype='out')
+
+    def execute(self):
+        if self.fail:
+            raise RuntimeError('%s failed' % self.name)
+        self.z = self.x + self.y
+        self.pid = os.getpid()
+
+
+class ThreadedAdder(Adder):
+    """ An Adder that is run in a thread by a parallel Dataflow. """
+
+    releases_gil = True
+    thread = None
+
+    def execute(self):
+        super(ThreadedAdder, self).execute()
+        self.thread = threading.current_thread().name
+
+
+class ProcessAdder(Adder):
+    """ An Adder that is run in a worker process by a parallel Dataflow. """
+
+    run_in_process = True
+
+
+class Accumulator(Component):
+    """ Keeps a history of its input outside of its outputs. """
+
+    x = Float(0., iotype='in')
+    y = Float(0., iotype='out')
+
+    def __init__(self):
+        super(Accumulator, self).__init__()
+        self.seen = []
+
+    def execute(self):
+        self.seen.append(self.x)
+        self.y = sum(self.seen)
+
+
+@add_delegate(HasParameters)
+class ParamDriver(Driver):
+    """ A Driver with parameters. """
+
+
+class Diamond(Assembly):
+    """ 'b', 'c' and 'f' depend on 'a', 'd' depends on 'b' and 'c'. """
+
+    def configure(self):
+        self.add('a', Adder())
+        self.add('b', ProcessAdder())
+        self.add('c', ThreadedAdder())
+        self.add('d', Adder())
+        self.add('f', Adder())
+        self.driver.workflow.add(['a', 'b', 'c', 'd', 'f'])
+        self.connect('a.z', 'b.x')
+        self.connect('a.z', 'c.x')
+        self.connect('a.z', 'f.x')
+        self.connect('b.z', 'd.x')
+        self.connect('c.z', 'd.y')
+
+
 class TestCase(unittest.TestCase):
     """ Test run/step/stop aspects of a simple workflow. """
 
@@ -224,6 +298,118 @@ class TestCase(unittest.TestCase):
             self.fail('Expected AttributeError')
 
 
+    def test_parallel_dataflow(self):
+        top = set_as_top(Diamond())
+        top.driver.workflow.parallel = True
+        self.assertEqual(top.driver.workflow._get_levels(),
+                         [['a'], ['b', 'c', 'f'], ['d']])
+        top.a.x = 1.
+        top.b.y = 2.
+        top.c.y = 3.
+        top.run()
+        self.assertEqual(top.d.z, 7.)
+        self.assertEqual(top.a.pid, os.getpid())
+        self.assertNotEqual(top.b.pid, os.getpid())  # Worker process.
+        self.assertEqual(top.c.pid, os.getpid())
+        self.assertNotEqual(top.c.thread, threading.current_thread().name)
+        self.assertEqual(top.f.pid, os.getpid())
+        self.assertEqual([top.get(name).exec_count for name in 'abcdf'],
+                         [1, 1, 1, 1, 1])
+        self.assertEqual(top.b.itername, '1-2')
+        self.assertEqual(top.f.itername, '1-4')
+        self.assertEqual(top.d.itername, '1-5')
+        self.assertTrue(top.d.is_valid())
+
+        # Worker pools are shut down at the end of the run.
+        workflow = top.driver.workflow
+        self.assertEqual(workflow._process_pool, None)
+        self.assertEqual(workflow._thread_pool, None)
+
+        # Only 'b' and its dependents are rerun.
+        top.b.y = 4.
+        top.run()
+        self.assertEqual(top.d.z, 9.)
+        self.assertEqual([top.get(name).exec_count for name in 'abcdf'],
+                         [1, 2, 1, 2, 1])
+
+        top.a.x = 2.
+        top.run()
+        self.assertEqual(top.d.z, 11.)
+        self.assertEqual([top.get(name).exec_count for name in 'abcdf'],
+                         [2, 3, 2, 3, 2])
+
+        # Errors are reported once the level has finished.
+        top.b.fail = True
+        top.a.x = 3.
+        try:
+            top.run()
+        except RuntimeError as err:
+            self.assertEqual(str(err), 'b failed')
+        else:
+            self.fail('Expected RuntimeError')
+        self.assertEqual(top.b._exec_state, 'INVALID')
+        self.assertEqual(top.c.z, 6.)
+        self.assertEqual(top.d.exec_count, 3)
+
+        top.b.fail = False
+        top.run()
+        self.assertEqual(top.d.z, 13.)
+
+        # Pools are also shut down on configuration changes and when
+        # parallel execution is turned off.
+        workflow._start(top.c, 0).get()
+        workflow._start(top.b, 0).get()
+        workflow.config_changed()
+        self.assertEqual(workflow._process_pool, None)
+        self.assertEqual(workflow._thread_pool, None)
+        workflow._start(top.c, 0).get()
+        self.assertNotEqual(workflow._thread_pool, None)
+
+        # Same results when run sequentially.
+        top.driver.workflow.parallel = False
+        self.assertEqual(workflow._thread_pool, None)
+        top.a.x = 4.
+        top.run()
+        self.assertEqual(top.d.z, 15.)
+
+    def test_parallel_parameters(self):
+        # Disciplines only fed by driver parameters are independent.
+        top = set_as_top(Assembly())
+        top.add('driver', ParamDriver())
+        for name in 'abc':
+            top.add(name, ThreadedAdder())
+        top.driver.workflow.add(['a', 'b', 'c'])
+        top.driver.add_parameter(['a.x', 'b.x', 'c.x'], -10., 10.)
+        top.driver.workflow.parallel = True
+        self.assertEqual(top.driver.workflow._get_levels(),
+                         [['a', 'b', 'c']])
+        top.driver.set_parameters([2.])
+        top.run()
+        for name in 'abc':
+            self.assertEqual(top.get(name).z, 2.)
+        main = threading.current_thread().name
+        self.assertNotEqual(top.a.thread, main)
+        self.assertNotEqual(top.b.thread, main)
+
+    def test_parallel_state(self):
+        # Components that don't opt in keep state changed by execute().
+        top = set_as_top(Assembly())
+        top.add('s', Adder())
+        top.add('a', Accumulator())
+        top.add('b', Accumulator())
+        top.driver.workflow.add(['s', 'a', 'b'])
+        top.connect('s.z', 'a.x')
+        top.connect('s.z', 'b.x')
+        top.driver.workflow.parallel = True
+        for x in (1., 2., 3.):
+            top.s.x = x
+            top.run()
+        for name in 'ab':
+            comp = top.get(name)
+            self.assertEqual(comp.seen, [1., 2., 3.])
+            self.assertEqual(comp.y, 6.)
+
+
 if __name__ == '__main__':
     import nose
     import sys
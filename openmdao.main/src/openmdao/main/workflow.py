@@ -1,6 +1,9 @@
 """ Base class for all workflows. """
 
 # pylint: disable-msg=E0611,F0401
+import time
+
+from openmdao.main import profiling
 from openmdao.main.exceptions import RunStopped
 
 __all__ = ['Workflow']
@@ -88,6 +91,10 @@ class Workflow(object):
         self._exec_count += 1
         self._comp_count = 0
         iterbase = self._iterbase(case_id)
+        profiler = profiling.PROFILER
+        if profiler is not None:
+            wall = time.time()
+            cpu = profiling.cpu_time()
         for comp in self._iterator:
             self._comp_count += 1
             comp.set_itername('%s-%d' % (iterbase, self._comp_count))
@@ -95,6 +102,20 @@ class Workflow(object):
             if self._stop:
                 raise RunStopped('Stop requested')
         self._iterator = None
+        if profiler is not None:
+            self._record_iteration(profiler, iterbase, wall, cpu)
+
+    def _record_iteration(self, profiler, iterbase, wall, cpu):
+        """ Record a run started at `wall` and `cpu` with `profiler`. """
+        if self._parent is not None:
+            profiler.record_iteration(self._parent.get_pathname(), iterbase,
+                                      time.time() - wall,
+                                      profiling.cpu_time() - cpu)
+
+    def close(self):
+        """Release any resources held between runs. Called at the end of a
+        top-level run."""
+        pass
 
     def _iterbase(self, case_id):
         """ Return base for 'iteration coordinates'. """
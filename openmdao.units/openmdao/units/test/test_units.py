@@ -3,6 +3,8 @@ import unittest
 import math
 import cStringIO
 
+import numpy
+
 from pkg_resources import resource_string, resource_stream
 
 #---------------------------------------------------------------------
@@ -525,6 +527,44 @@ class test__PhysicalQuantity(unittest.TestCase):
             self.fail("TypeError expected")
         
 
+    def test_array_values(self):
+        x = units.PhysicalQuantity([1., 2., 3.], 'ft')
+        self.assertTrue(isinstance(x.value, numpy.ndarray))
+
+        # conversion
+        y = x.in_units_of('inch')
+        self.assertTrue(numpy.allclose(y.value, [12., 24., 36.]))
+        t = units.PhysicalQuantity(numpy.array([0., 100.]), 'degC')
+        t.convert_to_unit('degF')
+        self.assertTrue(numpy.allclose(t.value, [32., 212.]))
+        self.assertTrue(numpy.allclose(x.in_base_units().value,
+                                       [.3048, .6096, .9144]))
+
+        # arithmetic
+        z = x + units.PhysicalQuantity(12., 'inch')
+        self.assertTrue(numpy.allclose(z.value, [2., 3., 4.]))
+        self.assertEqual(z.unit, x.unit)
+        z = x * x
+        self.assertTrue((z.value == [1., 4., 9.]).all())
+        self.assertEqual(z.get_unit_name(), 'ft**2')
+        z = numpy.array([2., 2., 2.]) * x
+        self.assertTrue(isinstance(z, units.PhysicalQuantity))
+        self.assertTrue((z.value == [2., 4., 6.]).all())
+        z = x / units.PhysicalQuantity(1., 'inch')
+        self.assertTrue(numpy.allclose(z, [12., 24., 36.]))
+
+        # comparisons are elementwise
+        self.assertTrue(((x < units.PhysicalQuantity(30., 'inch')) ==
+                         [True, True, False]).all())
+        self.assertTrue(((x != units.PhysicalQuantity([1., 5., 3.], 'ft')) ==
+                         [False, True, False]).all())
+        self.assertTrue(((x >= units.PhysicalQuantity(2., 'ft')) ==
+                         [False, True, True]).all())
+
+        a = units.PhysicalQuantity([0., 90.], 'deg')
+        self.assertTrue(numpy.allclose(a.sin(), [0., 1.]))
+        self.assertTrue(numpy.allclose(a.cos(), [1., 0.]))
+
     def test_nonzero(self):
         #__nonzero__ should return true in a boolean test
         
@@ -773,6 +813,61 @@ class test__PhysicalUnit(unittest.TestCase):
         else:
             self.fail("Expecting TypeError")
             
+    def test_get_conversion_tuple(self):
+        units.units._CONVERSION_CACHE.clear()
+        self.assertEqual(units.get_conversion_tuple('cm', 'm'), (1/100.0, 0))
+        self.assertTrue(('cm', 'm') in units.units._CONVERSION_CACHE)
+
+        result = units.get_conversion_tuple('degF', 'degC')
+        self.assertAlmostEqual(result[0], 0.556, 3)
+        self.assertAlmostEqual(result[1], -32.0, 3)
+        self.assertAlmostEqual(units.convert_units(212., 'degF', 'degC'), 100.)
+
+        try:
+            units.get_conversion_tuple('m', 'degC')
+        except TypeError, err:
+            self.assertEqual(str(err), "Incompatible units")
+        else:
+            self.fail("Expecting TypeError")
+        self.assertFalse(('m', 'degC') in units.units._CONVERSION_CACHE)
+
+        # the cache is bounded
+        old_size = units.units._CONVERSION_CACHE_SIZE
+        units.units._CONVERSION_CACHE_SIZE = 2
+        try:
+            for dst in ('mm', 'km', 'inch', 'ft'):
+                units.get_conversion_tuple('m', dst)
+                self.assertTrue(len(units.units._CONVERSION_CACHE) <= 2)
+        finally:
+            units.units._CONVERSION_CACHE_SIZE = old_size
+
+    def test_redefined_unit(self):
+        # cached units and conversions don't survive a redefinition
+        units.add_offset_unit('degQ', 'degK', 1, 10)
+        self.assertEqual(units.get_conversion_tuple('degQ', 'degK'), (1, 10))
+        self.assertEqual(units.convert_units(1., 'degQ', 'degK'), 11.)
+        units.add_unit('degQ', '1.*degK')
+        self.assertEqual(units.get_conversion_tuple('degQ', 'degK'), (1, 0))
+        self.assertEqual(units.convert_units(1., 'degQ', 'degK'), 1.)
+        self.assertEqual(units.units._find_unit('degQ').offset, 0)
+
+    def test_unit_cache(self):
+        # unit strings are cached as given and stripped
+        units.units._UNIT_CACHE.clear()
+        unit = units.units._find_unit(' cm ')
+        self.assertTrue(units.units._UNIT_CACHE[' cm '] is unit)
+        self.assertTrue(units.units._find_unit('cm') is unit)
+
+        # the cache is bounded
+        old_size = units.units._UNIT_CACHE_SIZE
+        units.units._UNIT_CACHE_SIZE = 3
+        try:
+            for name in ('m', ' m', 'km ', 'ft', ' inch', 'mm'):
+                units.units._find_unit(name)
+                self.assertTrue(len(units.units._UNIT_CACHE) <= 3)
+        finally:
+            units.units._UNIT_CACHE_SIZE = old_size
+
     def test_name(self):
         #name should return a mathematically correct representation of the unit
         x1=units.PhysicalQuantity('1m')
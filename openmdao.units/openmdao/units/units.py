@@ -19,6 +19,7 @@ Justin Gray."""
 import re, ConfigParser
 import os.path
 
+import math
 from math import sin, cos, tan, floor, pi
 
 # pylint: disable-msg=E0611,F0401, E1101
@@ -27,6 +28,12 @@ try:
 except ImportError: 
     pass
 
+# numpy is optional. Without it, quantities can only hold scalar values.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 #Class definitions
 
 class NumberDict(dict):
@@ -92,10 +99,18 @@ class PhysicalQuantity(object):
     Addition and subtraction check that the units of the two operands
     are compatible and return the result in the units of the first
     operand.
+
+    The value may also be a numpy array (lists and tuples are converted to
+    arrays), in which case conversion, arithmetic and comparisons operate
+    on the whole array at once and comparisons return arrays of bools.
     """
 
     #class attributes
     _number = re.compile('[+-]?[0-9]+(\\.[0-9]*)?([eE][+-]?[0-9]+)?')
+
+    # make numpy defer to our reflected operators, so that, e.g.,
+    # ndarray * PhysicalQuantity is a PhysicalQuantity.
+    __array_priority__ = 100.
   
     def __init__(self, *args):
         """
@@ -114,7 +129,10 @@ class PhysicalQuantity(object):
          """
 
         if len(args) == 2:
-            self.value = args[0]
+            value = args[0]
+            if numpy is not None and isinstance(value, (list, tuple)):
+                value = numpy.array(value)
+            self.value = value
             self.unit = _find_unit(args[1])
         else:
             s = args[0].strip()
@@ -156,6 +174,27 @@ class PhysicalQuantity(object):
     def __cmp__(self, other):
         diff = self._sum(other, 1, -1)
         return cmp(diff.value, 0)
+
+    # The rich comparisons give the same results as __cmp__ for scalar
+    # values, and elementwise results for array values.
+
+    def __eq__(self, other):
+        return self._sum(other, 1, -1).value == 0
+
+    def __ne__(self, other):
+        return self._sum(other, 1, -1).value != 0
+
+    def __lt__(self, other):
+        return self._sum(other, 1, -1).value < 0
+
+    def __le__(self, other):
+        return self._sum(other, 1, -1).value <= 0
+
+    def __gt__(self, other):
+        return self._sum(other, 1, -1).value > 0
+
+    def __ge__(self, other):
+        return self._sum(other, 1, -1).value >= 0
   
     def __mul__(self, other):
         if not isinstance(other, PhysicalQuantity):
@@ -308,30 +347,36 @@ class PhysicalQuantity(object):
     def sin(self):
         """Parsing Sine."""
         if self.unit.is_angle():
-            #return N.sin(self.value * \
-            return sin(self.value * \
-                self.unit.conversion_factor_to(PhysicalQuantity('1rad').unit))
+            return _math_func('sin', self.value)(self.value * \
+                self.unit.conversion_factor_to(_find_unit('rad')))
         else:
             raise TypeError('Argument of sin must be an angle')
 
     def cos(self):
         """Parsing Cosine."""
         if self.unit.is_angle():
-            #return N.cos(self.value * \
-            return cos(self.value * \
-                self.unit.conversion_factor_to(PhysicalQuantity('1rad').unit))
+            return _math_func('cos', self.value)(self.value * \
+                self.unit.conversion_factor_to(_find_unit('rad')))
         else:
             raise TypeError('Argument of cos must be an angle')
 
     def tan(self):
         """Parsing tangent."""
         if self.unit.is_angle():
-            #return N.tan(self.value * \
-            return tan(self.value * \
-                self.unit.conversion_factor_to(PhysicalQuantity('1rad').unit))
+            return _math_func('tan', self.value)(self.value * \
+                self.unit.conversion_factor_to(_find_unit('rad')))
         else:
             raise TypeError('Argument of tan must be an angle')
 
+def _math_func(name, value):
+    """Return the function *name* from numpy if *value* is an array,
+    otherwise from math.
+    """
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return getattr(numpy, name)
+    return getattr(math, name)
+
+
 class PhysicalUnit(object):
     """
     Physical unit.
@@ -537,59 +582,112 @@ class PhysicalUnit(object):
 
 #Helper Functions
 
+# Parsed units keyed on unit string.
+# This is cleared whenever it grows past _UNIT_CACHE_SIZE entries.
 _UNIT_CACHE = {}
+_UNIT_CACHE_SIZE = 1000
+
+def _parse_unit(name):
+    """Return the unit described by the unit string *name*, adding any
+    prefixed units it uses to the unit table.
+    """
+    try: 
+        return eval(name, {'__builtins__':None}, _UNIT_LIB.unit_table)
+    except Exception: 
+        
+        # This unit might include prefixed units that aren't in the
+        # unit_table. We must parse them ALL and add them to the
+        # unit_table.
+        
+        # First character of a unit is always alphabet or $.
+        # Remaining characters may include numbers.
+        regex = re.compile('[A-Z,a-z]{1}[A-Z,a-z,0-9]*')
+        
+        for item in regex.findall(name):
+            #check if this was a compound unit, so each substring might
+            # be a unit
+            try: 
+                eval(item, {'__builtins__':None}, _UNIT_LIB.unit_table)
+            except Exception: #maybe is a prefixed unit then
+                #check for single letter prefix before unit
+                if(item[0] in _UNIT_LIB.prefixes and \
+                   item[1:] in _UNIT_LIB.unit_table):
+                    add_unit(item, _UNIT_LIB.prefixes[item[0]]* \
+                             _UNIT_LIB.unit_table[item[1:]])
+                
+                #check for double letter prefix before unit
+                elif(item[0:2] in _UNIT_LIB.prefixes and \
+                     item[2:] in _UNIT_LIB.unit_table):
+                    add_unit(item, _UNIT_LIB.prefixes[item[0:2]]* \
+                              _UNIT_LIB.unit_table[item[2:]])
+                
+                #no prefixes found, unknown unit
+                else:
+                    raise ValueError("no unit named '%s' is defined"
+                                     % item)
+    
+        return eval(name, {'__builtins__':None}, _UNIT_LIB.unit_table)
+
 
 def _find_unit(unit):
-    """Find unit helper function."""
+    """Find unit helper function. Unit strings are interned in
+    _UNIT_CACHE, both as given and stripped, so each string is only
+    parsed once.
+    """
     if isinstance(unit, str):
-        name = unit.strip()
         try:
-            unit = _UNIT_CACHE[name]
+            unit = _UNIT_CACHE[unit]
         except KeyError:
-            try: 
-                unit = eval(name, {'__builtins__':None}, _UNIT_LIB.unit_table)
-            except Exception: 
-                
-                # This unit might include prefixed units that aren't in the
-                # unit_table. We must parse them ALL and add them to the
-                # unit_table.
-                
-                # First character of a unit is always alphabet or $.
-                # Remaining characters may include numbers.
-                regex = re.compile('[A-Z,a-z]{1}[A-Z,a-z,0-9]*')
-                
-                for item in regex.findall(name):
-                    #check if this was a compound unit, so each substring might
-                    # be a unit
-                    try: 
-                        eval(item, {'__builtins__':None}, _UNIT_LIB.unit_table)
-                    except Exception: #maybe is a prefixed unit then
-                        #check for single letter prefix before unit
-                        if(item[0] in _UNIT_LIB.prefixes and \
-                           item[1:] in _UNIT_LIB.unit_table):
-                            add_unit(item, _UNIT_LIB.prefixes[item[0]]* \
-                                     _UNIT_LIB.unit_table[item[1:]])
-                        
-                        #check for double letter prefix before unit
-                        elif(item[0:2] in _UNIT_LIB.prefixes and \
-                             item[2:] in _UNIT_LIB.unit_table):
-                            add_unit(item, _UNIT_LIB.prefixes[item[0:2]]* \
-                                      _UNIT_LIB.unit_table[item[2:]])
-                        
-                        #no prefixes found, unknown unit
-                        else:
-                            raise ValueError("no unit named '%s' is defined"
-                                             % item)
-            
-                unit = eval(name, {'__builtins__':None}, _UNIT_LIB.unit_table)
-        
-            _UNIT_CACHE[name] = unit
+            name = unit.strip()
+            try:
+                parsed = _UNIT_CACHE[name]
+            except KeyError:
+                parsed = _parse_unit(name)
+            if len(_UNIT_CACHE) >= _UNIT_CACHE_SIZE - 1:
+                _UNIT_CACHE.clear()
+            _UNIT_CACHE[name] = _UNIT_CACHE[unit] = parsed
+            unit = parsed
 
     if not isinstance(unit, PhysicalUnit):
         raise TypeError(str(unit) + ' is not a unit')
     return unit
 
 
+# (factor, offset) conversion tuples keyed on (src_units, target_units).
+# This is cleared whenever it grows past _CONVERSION_CACHE_SIZE entries.
+_CONVERSION_CACHE = {}
+_CONVERSION_CACHE_SIZE = 1000
+
+def get_conversion_tuple(src_units, target_units):
+    """Return the tuple (factor, offset) that converts a value from
+    *src_units* to *target_units* via ``(value + offset) * factor``.
+    Tuples are cached, so repeated conversions between the same pair of
+    units don't have to look up either unit again. Raises a TypeError if
+    the units are incompatible.
+    """
+    key = (src_units, target_units)
+    try:
+        return _CONVERSION_CACHE[key]
+    except (KeyError, TypeError):  # TypeError if a unit isn't hashable
+        pass
+
+    tup = _find_unit(src_units).conversion_tuple_to(_find_unit(target_units))
+
+    if isinstance(src_units, basestring) and \
+       isinstance(target_units, basestring):
+        if len(_CONVERSION_CACHE) >= _CONVERSION_CACHE_SIZE:
+            _CONVERSION_CACHE.clear()
+        _CONVERSION_CACHE[key] = tup
+    return tup
+
+
+def _clear_caches():
+    """Forget parsed units and conversion tuples, which may be stale after
+    a unit is (re)defined."""
+    _UNIT_CACHE.clear()
+    _CONVERSION_CACHE.clear()
+
+
 def _new_unit(name, factor, powers):
     """create new Unit"""
     _UNIT_LIB.unit_table[name] = PhysicalUnit(name, factor, powers)
@@ -611,6 +709,7 @@ def add_offset_unit(name, baseunit, factor, offset, comment=''):
                             "different factor or powers"
     _UNIT_LIB.unit_table[name] = unit
     _UNIT_LIB.set('units', name, unit)   
+    _clear_caches()
     if comment: 
         _UNIT_LIB.help.append((name, comment, unit))
         
@@ -631,6 +730,7 @@ def add_unit(name, unit, comment=''):
         
     _UNIT_LIB.unit_table[name] = unit
     _UNIT_LIB.set('units', name, unit)
+    _clear_caches()
 
 
 _UNIT_LIB = ConfigParser.ConfigParser()
@@ -645,8 +745,7 @@ _UNIT_LIB.optionxform = _do_nothing
 def import_library(libfilepointer):
     """Imports a units library, replacing any existing definitions."""
     global _UNIT_LIB 
-    global _UNIT_CACHE
-    _UNIT_CACHE = {}
+    _clear_caches()
     _UNIT_LIB = ConfigParser.ConfigParser()
     _UNIT_LIB.optionxform = _do_nothing
     _UNIT_LIB.readfp(libfilepointer)
@@ -760,9 +859,8 @@ def convert_units(value, units, convunits):
     """Return the given value (given in units) converted 
     to convunits.
     """
-    pq = PhysicalQuantity(value, units)
-    pq.convert_to_unit(convunits)
-    return pq.value
+    factor, offset = get_conversion_tuple(units, convunits)
+    return (value + offset) * factor
     
 
 try:
@@ -110,6 +110,10 @@ def get_key_pair(user_host, logger=None,
                         try:
                             with open(key_file, 'rb') as inp:
                                 key_pair = cPickle.load(inp)
+                            # PyCrypto 2.6.1 doesn't restore the random
+                            # function used for blinding when unpickling.
+                            if not hasattr(key_pair, '_randfunc'):
+                                key_pair._randfunc = get_random_bytes
                         except Exception:
                             generate = True
                         else: